@@ -1,5 +1,6 @@
 from .models import *
+from .ships import *
 from .transformers import *
 from .urls import *
 from .vortex import *
-from . import wg
+from . import decoders, http_cache, index, ladder, stale, wg
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+__all__ = ["AutocompleteEngine"]
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import functools
+import time
+
+import cachetools
+import discord
+
+
+Fetch = Callable[[str, str], Awaitable[List[Any]]]
+Match = Callable[[Any, str], bool]
+
+
+class AutocompleteEngine:
+    """
+    Caches and debounces API-backed autocompletes.
+
+    Results are cached per (region, prefix). A longer prefix is answered by
+    filtering a shorter cached prefix, as long as that result was not
+    truncated by the API. A new request from a user cancels their previous
+    in-flight one, and requests that cannot finish before Discord's response
+    deadline are dropped.
+    """
+
+    DEADLINE = 3.0  # Discord discards autocomplete responses after 3 seconds
+    MARGIN = 0.25  # time reserved for sending the response itself
+    CACHE_SIZE = 4096
+    CACHE_TTL = 600
+    LATENCY_WEIGHT = 0.2
+
+    def __init__(self, fetch: Fetch, match: Match, limit: int):
+        self.fetch: Fetch = fetch
+        self.match: Match = match
+        self.limit: int = limit
+
+        self.cache: cachetools.TTLCache = cachetools.TTLCache(
+            maxsize=self.CACHE_SIZE, ttl=self.CACHE_TTL
+        )
+        self.pending: Dict[int, asyncio.Task] = {}
+        self.latency: float = 0.5  # moving average, in seconds
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return value.strip().lower()
+
+    def lookup(self, region: str, prefix: str) -> Optional[List[Any]]:
+        if (cached := self.cache.get((region, prefix), None)) is not None:
+            return cached[0]
+
+        for end in range(len(prefix) - 1, 0, -1):
+            cached = self.cache.get((region, prefix[:end]), None)
+            if cached is None:
+                continue
+
+            results, truncated = cached
+            if truncated:
+                return None
+
+            filtered = [result for result in results if self.match(result, prefix)]
+            self.cache[(region, prefix)] = filtered, False
+            return filtered
+
+        return None
+
+    def remaining(self, interaction: discord.Interaction) -> float:
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        return self.DEADLINE - self.MARGIN - elapsed
+
+    async def _run(self, region: str, prefix: str, value: str) -> List[Any]:
+        start = time.perf_counter()
+        results = await self.fetch(region, value)
+
+        elapsed = time.perf_counter() - start
+        self.latency += self.LATENCY_WEIGHT * (elapsed - self.latency)
+        self.cache[(region, prefix)] = results, len(results) >= self.limit
+
+        return results
+
+    async def query(
+        self, interaction: discord.Interaction, region: str, value: str
+    ) -> Optional[List[Any]]:
+        prefix = self.normalize(value)
+        if not prefix:
+            return None
+
+        if (cached := self.lookup(region, prefix)) is not None:
+            return cached[: self.limit]
+
+        user_id = interaction.user.id
+        if (previous := self.pending.pop(user_id, None)) is not None:
+            previous.cancel()
+
+        remaining = self.remaining(interaction)
+        if remaining < self.latency:
+            return None
+
+        task = asyncio.create_task(self._run(region, prefix, value))
+        task.add_done_callback(functools.partial(self._done, user_id))
+        self.pending[user_id] = task
+
+        # a request that misses the deadline still completes and fills the cache
+        done, _ = await asyncio.wait({task}, timeout=remaining)
+
+        if task not in done or task.cancelled() or task.exception() is not None:
+            return None
+
+        return task.result()
+
+    def _done(self, user_id: int, task: asyncio.Task) -> None:
+        if self.pending.get(user_id, None) is task:
+            del self.pending[user_id]
+
+        # retrieve the exception so abandoned requests do not log it
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+__all__ = ["encode", "decode"]
+
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+import dataclasses
+
+import orjson
+
+from .decoders import (
+    decode_clan_member,
+    decode_clan_role,
+    decode_full_clan,
+    decode_player,
+)
+from .models import (
+    ClanMemberStatistics,
+    ClanRole,
+    FullClan,
+    FullPlayer,
+    PartialPlayer,
+    Player,
+)
+
+
+# Serialisation of the models cached by api.stale, for bot.utils.cache.
+# Models are written in the shape of the API responses and read back with the
+# hand-written decoders, so only these types can ever be created from cached
+# data. Timestamps are written as the API sends them, integer timestamps as
+# numbers and the others as ISO 8601 strings.
+
+
+def _timestamp(value: Optional[Any]) -> Optional[float]:
+    return None if value is None else value.timestamp()
+
+
+def _encode_clan_role(role: Optional[ClanRole]) -> Optional[Dict[str, Any]]:
+    if role is None:
+        return None
+
+    return {
+        "clan": dataclasses.asdict(role.clan),
+        "clan_id": role.clan_id,
+        "joined_at": role.joined_at.isoformat(),
+        "role": role.role,
+    }
+
+
+def _encode_clan_member(member: ClanMemberStatistics) -> Dict[str, Any]:
+    data = dataclasses.asdict(member)
+    data["last_battle_time"] = _timestamp(member.last_battle_time)
+    return data
+
+
+def _encode_player(player: Player) -> Dict[str, Any]:
+    return {
+        "region": player.region,
+        "id": player.id,
+        "name": player.name,
+        "hidden_profile": player.hidden_profile,
+        "clan_role": _encode_clan_role(player.clan_role),
+        "is_empty": player.is_empty,
+        "used_access_code": player.used_access_code,
+    }
+
+
+def _encode_partial_player(player: PartialPlayer) -> Dict[str, Any]:
+    return {
+        **_encode_player(player),
+        "statistics": {
+            battle_type: _encode_clan_member(member)
+            for battle_type, member in player.statistics.items()
+        },
+    }
+
+
+def _encode_full_player(player: FullPlayer) -> Dict[str, Any]:
+    return {
+        **_encode_player(player),
+        "statistics": {
+            battle_type: dict(block) for battle_type, block in player.statistics.items()
+        },
+        "activated_at": _timestamp(player.activated_at),
+        "created_at": _timestamp(player.created_at),
+        "last_battle_time": _timestamp(player.last_battle_time),
+        "karma": player.karma,
+        "leveling_points": player.leveling_points,
+        "leveling_tier": player.leveling_tier,
+    }
+
+
+def _encode_full_clan(clan: FullClan) -> Dict[str, Any]:
+    # every datetime of a clan is a string timestamp, serialised by orjson
+    data = dataclasses.asdict(clan)
+    del data["fetched_at"]
+    return data
+
+
+def _decode_player_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "region": data["region"],
+        "id": data["id"],
+        "name": data["name"],
+        "hidden_profile": data["hidden_profile"],
+        "clan_role": (
+            decode_clan_role(data["clan_role"]) if data["clan_role"] else None
+        ),
+        "is_empty": data["is_empty"],
+        "used_access_code": data["used_access_code"],
+    }
+
+
+def _decode_player(data: Dict[str, Any]) -> Player:
+    return Player(**_decode_player_fields(data))
+
+
+def _decode_partial_player(data: Dict[str, Any]) -> PartialPlayer:
+    return PartialPlayer(
+        statistics={
+            battle_type: decode_clan_member(member)
+            for battle_type, member in data["statistics"].items()
+        },
+        **_decode_player_fields(data),
+    )
+
+
+def _decode_full_player(data: Dict[str, Any]) -> FullPlayer:
+    return decode_player({**data, **_decode_player_fields(data)})
+
+
+# checked by exact type, subclasses have their own entries
+CODECS: Dict[str, Tuple[Type, Callable, Callable]] = {
+    "player": (Player, _encode_player, _decode_player),
+    "partial_player": (PartialPlayer, _encode_partial_player, _decode_partial_player),
+    "full_player": (FullPlayer, _encode_full_player, _decode_full_player),
+    "full_clan": (FullClan, _encode_full_clan, decode_full_clan),
+}
+
+
+def encode(value: Any) -> bytes:
+    for name, (model, encoder, _) in CODECS.items():
+        if type(value) is model:
+            return orjson.dumps(
+                {"type": name, "fetched_at": value.fetched_at, "data": encoder(value)}
+            )
+
+    raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+def decode(data: bytes) -> Any:
+    document = orjson.loads(data)
+    _, _, decoder = CODECS[document["type"]]
+
+    value = decoder(document["data"])
+    value.fetched_at = document["fetched_at"]
+    return value
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+__all__ = [
+    "loads",
+    "decode_player",
+    "decode_clan_role",
+    "decode_ladder_position",
+    "decode_clan_member",
+    "decode_clan_members",
+    "decode_full_clan",
+    "decode_seasons",
+    "decode_buildings",
+]
+
+from typing import Any, Dict, List, Optional
+import datetime
+
+import orjson
+
+from .models import (
+    Building,
+    BuildingsData,
+    BuildingType,
+    ClanAchievement,
+    ClanBuilding,
+    ClanInfo,
+    ClanMaxPosition,
+    ClanMemberStatistics,
+    ClanRole,
+    FullClan,
+    FullPlayer,
+    LadderPosition,
+    League,
+    MasterRating,
+    PartialClan,
+    Rating,
+    Season,
+    SeasonsData,
+    StatBlock,
+)
+
+
+# Hand-written decoders from parsed responses to the models. Unknown keys are
+# ignored and missing Optional keys become None. Fields annotated with SI, IT
+# and ST are converted from strings, integer timestamps and ISO 8601 strings.
+
+loads = orjson.loads
+_fromtimestamp = datetime.datetime.fromtimestamp
+_fromisoformat = datetime.datetime.fromisoformat
+
+
+def _optional_it(value: Optional[int]) -> Optional[datetime.datetime]:
+    return None if value is None else _fromtimestamp(value)
+
+
+def _optional_st(value: Optional[str]) -> Optional[datetime.datetime]:
+    return None if value is None else _fromisoformat(value)
+
+
+# --- Players ---
+
+
+def decode_player(data: Dict[str, Any]) -> FullPlayer:
+    return FullPlayer(
+        region=data["region"],
+        id=data["id"],
+        name=data["name"],
+        hidden_profile=data["hidden_profile"],
+        clan_role=data["clan_role"],
+        is_empty=data["is_empty"],
+        used_access_code=data["used_access_code"],
+        statistics={
+            battle_type: StatBlock(block)
+            for battle_type, block in data["statistics"].items()
+        },
+        activated_at=_fromtimestamp(data["activated_at"]),
+        created_at=_fromtimestamp(data["created_at"]),
+        last_battle_time=_fromtimestamp(data["last_battle_time"]),
+        karma=data["karma"],
+        leveling_points=data["leveling_points"],
+        leveling_tier=data["leveling_tier"],
+    )
+
+
+def decode_clan_role(data: Dict[str, Any]) -> ClanRole:
+    clan = data["clan"]
+
+    return ClanRole(
+        clan=PartialClan(
+            color=clan["color"],
+            name=clan["name"],
+            members_count=clan["members_count"],
+            tag=clan["tag"],
+        ),
+        clan_id=data["clan_id"],
+        joined_at=_fromisoformat(data["joined_at"]),
+        role=data["role"],
+    )
+
+
+# --- Clans ---
+
+
+def decode_ladder_position(data: Dict[str, Any]) -> LadderPosition:
+    return LadderPosition(
+        id=data["id"],
+        name=data["name"],
+        tag=data["tag"],
+        public_rating=data["public_rating"],
+        rank=data["rank"],
+    )
+
+
+def decode_clan_member(data: Dict[str, Any]) -> ClanMemberStatistics:
+    get = data.get
+
+    return ClanMemberStatistics(
+        id=data["id"],
+        name=data["name"],
+        last_battle_time=_optional_it(get("last_battle_time")),
+        days_in_clan=data["days_in_clan"],
+        battles_count=get("battles_count"),
+        battles_per_day=get("battles_per_day"),
+        damage_per_battle=get("damage_per_battle"),
+        frags_per_battle=get("frags_per_battle"),
+        exp_per_battle=get("exp_per_battle"),
+        wins_percentage=get("wins_percentage"),
+    )
+
+
+def decode_clan_members(items: List[Dict[str, Any]]) -> List[ClanMemberStatistics]:
+    return [decode_clan_member(data) for data in items]
+
+
+def _decode_rating_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    max_position = data["max_position"]
+
+    return {
+        "team_number": data["team_number"],
+        "league": data["league"],
+        "division": data["division"],
+        "season_number": data["season_number"],
+        "status": data["status"],
+        "is_qualified": data["is_qualified"],
+        "last_win_at": _optional_st(data.get("last_win_at")),
+        "battles_count": data["battles_count"],
+        "wins_count": data["wins_count"],
+        "current_winning_streak": data["current_winning_streak"],
+        "longest_winning_streak": data["longest_winning_streak"],
+        "initial_public_rating": data["initial_public_rating"],
+        "public_rating": data["public_rating"],
+        "division_rating": data["division_rating"],
+        "division_rating_max": data["division_rating_max"],
+        "max_position": ClanMaxPosition(
+            division_rating=max_position["division_rating"],
+            public_rating=max_position["public_rating"],
+            league=max_position["league"],
+            division=max_position["division"],
+        ),
+    }
+
+
+def _decode_master_rating(data: Optional[Dict[str, Any]]) -> Optional[MasterRating]:
+    if data is None:
+        return None
+
+    return MasterRating(
+        color=data["color"],
+        leading_team_number=data["leading_team_number"],
+        total_battles_count=data["total_battles_count"],
+        last_battle_at=_optional_st(data.get("last_battle_at")),
+        ratings=[Rating(**_decode_rating_fields(rating)) for rating in data["ratings"]],
+        **_decode_rating_fields(data),
+    )
+
+
+def decode_full_clan(data: Dict[str, Any]) -> FullClan:
+    clan = data["clan"]
+
+    return FullClan(
+        region=data["region"],
+        wows_ladder=_decode_master_rating(data["wows_ladder"]),
+        achievements=[
+            ClanAchievement(count=achievement["count"], cd=achievement["cd"])
+            for achievement in data["achievements"]
+        ],
+        buildings={
+            key: ClanBuilding(
+                id=building["id"],
+                name=building["name"],
+                level=building["level"],
+                modifiers=building["modifiers"],
+            )
+            for key, building in data["buildings"].items()
+        },
+        clan=ClanInfo(
+            id=clan["id"],
+            name=clan["name"],
+            tag=clan["tag"],
+            color=clan["color"],
+            description=clan["description"],
+            raw_description=clan["raw_description"],
+            created_at=_fromisoformat(clan["created_at"]),
+            members_count=clan["members_count"],
+            max_members_count=clan["max_members_count"],
+            recruiting_policy=clan["recruiting_policy"],
+            recruiting_restrictions=clan["recruiting_restrictions"],
+        ),
+    )
+
+
+# --- Seasons ---
+
+
+def decode_seasons(data: Dict[str, Any]) -> SeasonsData:
+    return SeasonsData(
+        data={
+            int(key): Season(
+                season_id=season["season_id"],
+                name=season["name"],
+                start_time=_fromtimestamp(season["start_time"]),
+                finish_time=_fromtimestamp(season["finish_time"]),
+                ship_tier_min=season["ship_tier_min"],
+                ship_tier_max=season["ship_tier_max"],
+                division_points=season["division_points"],
+                leagues=[
+                    League(
+                        name=league["name"],
+                        icon=league["icon"],
+                        color=league["color"],
+                    )
+                    for league in season["leagues"]
+                ],
+            )
+            for key, season in data["data"].items()
+        }
+    )
+
+
+# --- Buildings ---
+
+
+def decode_buildings(data: Dict[str, Any]) -> BuildingsData:
+    return BuildingsData(
+        building_types={
+            int(key): BuildingType(
+                building_type_id=building_type["building_type_id"],
+                name=building_type["name"],
+            )
+            for key, building_type in data["building_types"].items()
+        },
+        buildings={
+            int(key): Building(
+                building_id=building["building_id"],
+                building_type_id=building["building_type_id"],
+                name=building["name"],
+                cost=building["cost"],
+            )
+            for key, building in data["buildings"].items()
+        },
+        clans_roles=data["clans_roles"],
+    )
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+__all__ = ["CachedResponse", "HTTPCache", "cache"]
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import aiohttp
+import requests
+
+from bot.utils.logs import logger
+
+
+CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../bot/assets/private/http_cache.db"
+)
+EXPIRY = 30 * 24 * 60 * 60  # entries unused for this long are pruned on startup
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT
+)
+"""
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    status: int
+    body: Optional[bytes]
+    modified: bool = True  # False if the body is unchanged since it was last stored
+    stale: bool = False  # True if served from the cache because a request failed
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+
+@dataclass(slots=True)
+class _Entry:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+    digest: Optional[str]  # None if stored before digests were kept
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class HTTPCache:
+    """
+    Persistent response cache shared by the API clients and the scrapers.
+
+    Bodies are stored with their ETag and Last-Modified validators, which are
+    sent back as conditional headers so that unchanged resources are answered
+    with 304 Not Modified. If a request fails, the stored body is served
+    instead. The connection is opened lazily and may be used from executor
+    threads. The async interface runs its storage calls in threads, so large
+    bodies are never read or written on the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(SCHEMA)
+            columns = {
+                row[1] for row in connection.execute("PRAGMA table_info(responses)")
+            }
+            if "digest" not in columns:
+                connection.execute("ALTER TABLE responses ADD COLUMN digest TEXT")
+            connection.execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (time.time() - EXPIRY,)
+            )
+            connection.commit()
+
+            self._connection = connection
+
+        return self._connection
+
+    @staticmethod
+    def key(
+        method: str, url: str, params: Optional[Dict[str, Any]] = None, data: Any = None
+    ) -> str:
+        parts = json.dumps([method, url, params, data], sort_keys=True, default=str)
+        return hashlib.sha1(parts.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def digest(body: bytes) -> str:
+        return hashlib.sha1(body).hexdigest()
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified, body, digest, fetched_at FROM responses "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        return _Entry(*row) if row else None
+
+    def _store(
+        self,
+        key: str,
+        url: str,
+        body: bytes,
+        digest: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, etag, last_modified, body, fetched_at, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, body, time.time(), digest),
+            )
+            self.connection.commit()
+
+    def _revalidate(
+        self, key: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> None:
+        # the body is unchanged, only its validators are rewritten
+        with self._lock:
+            self.connection.execute(
+                "UPDATE responses SET etag = ?, last_modified = ?, fetched_at = ? "
+                "WHERE key = ?",
+                (etag, last_modified, time.time(), key),
+            )
+            self.connection.commit()
+
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            self.connection.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self.connection.commit()
+
+    def peek(
+        self, method: str, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[bytes]:
+        """
+        Returns the stored body for a request without revalidating it.
+        """
+
+        entry = self._get(self.key(method, url, params))
+        return entry.body if entry else None
+
+    def _resolve(
+        self,
+        key: str,
+        url: str,
+        entry: Optional[_Entry],
+        status: int,
+        body: Optional[bytes],
+        validators: Tuple[Optional[str], Optional[str]],
+    ) -> CachedResponse:
+        if status == 304 and entry is not None:
+            self._touch(key)
+            return CachedResponse(200, entry.body, modified=False)
+        elif status == 200:
+            digest = self.digest(body)
+            if entry is not None and entry.digest == digest:
+                self._revalidate(key, *validators)
+                return CachedResponse(200, entry.body, modified=False)
+
+            self._store(key, url, body, digest, *validators)
+            return CachedResponse(
+                200, body, modified=entry is None or entry.body != body
+            )
+        elif entry is not None:
+            logger.warning(f"Error code {status} for {url}, serving cached response")
+            return CachedResponse(200, entry.body, modified=False, stale=True)
+        else:
+            return CachedResponse(status, body)
+
+    def _stale(self, url: str, entry: Optional[_Entry], e: Exception) -> CachedResponse:
+        if entry is None:
+            raise e
+
+        logger.warning(f"Request to {url} failed, serving cached response", exc_info=e)
+        return CachedResponse(200, entry.body, modified=False, stale=True)
+
+    async def get(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_age: float = 0,
+    ) -> CachedResponse:
+        """
+        Sends a conditional GET request with aiohttp.
+
+        Stored bodies younger than max_age seconds are returned without a request.
+        """
+
+        key = self.key("GET", url, params)
+        entry = await asyncio.to_thread(self._get, key)
+
+        if entry is not None and entry.age < max_age:
+            return CachedResponse(200, entry.body, modified=False)
+
+        headers = entry.validators if entry else None
+
+        try:
+            async with session.get(url, params=params, headers=headers) as response:
+                body = await response.read()
+                validators = (
+                    response.headers.get("ETag", None),
+                    response.headers.get("Last-Modified", None),
+                )
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self._stale(url, entry, e)
+
+        return await asyncio.to_thread(
+            self._resolve, key, url, entry, status, body, validators
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_age: float = 0,
+    ) -> CachedResponse:
+        """
+        Sends a conditional request with requests, for use in executor threads.
+
+        Stored bodies younger than max_age seconds are returned without a request.
+        """
+
+        key = self.key(method, url, params, json)
+        entry = self._get(key)
+
+        if entry is not None and entry.age < max_age:
+            return CachedResponse(200, entry.body, modified=False)
+
+        headers = {**(headers or {}), **(entry.validators if entry else {})}
+
+        try:
+            response = requests.request(
+                method, url, params=params, json=json, headers=headers
+            )
+        except requests.RequestException as e:
+            return self._stale(url, entry, e)
+
+        validators = (
+            response.headers.get("ETag", None),
+            response.headers.get("Last-Modified", None),
+        )
+        return self._resolve(
+            key, url, entry, response.status_code, response.content, validators
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+cache = HTTPCache(CACHE_PATH)
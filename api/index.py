@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+__all__ = [
+    "NameIndex",
+    "ClanIndex",
+    "players",
+    "clans",
+    "load",
+    "save",
+    "prune",
+    "start",
+    "stop",
+]
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import bisect
+import heapq
+import os
+import pickle
+import time
+
+from bot.utils.logs import logger
+
+from .urls import VORTEX
+
+
+INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../bot/assets/private/index.pickle"
+)
+INDEX_VERSION = 3
+SAVE_INTERVAL = 5 * 60  # seconds
+PRUNE_INTERVAL = 24 * 60 * 60  # seconds
+MAX_AGE = 180  # days an entry is kept without being seen
+MAX_ENTRIES = 1_000_000  # per index, least recently seen entries are dropped
+
+# The indexes are saved periodically and on shutdown by start() and stop().
+# Each entry remembers the day it was last seen, so entries that are no longer
+# seen expire instead of growing the indexes forever.
+
+
+def _today() -> int:
+    return int(time.time() // (24 * 60 * 60))
+
+
+class NameIndex:
+    """
+    Maps normalized names to IDs, with a sorted key list for prefix lookups.
+    """
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.entries: Dict[str, Tuple[int, str]] = {}
+        self.ids: Dict[int, str] = {}
+        self.seen: Dict[int, int] = {}  # id -> day last seen
+        self.dirty: bool = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip().lower()
+
+    def add(self, entity_id: int, name: str) -> Optional[int]:
+        """
+        Returns the ID that previously had the name, if it was reused.
+        """
+
+        key = self.normalize(name)
+        if not key:
+            return None
+
+        if self.seen.get(entity_id, None) != (today := _today()):
+            self.seen[entity_id] = today
+            self.dirty = True
+
+        previous = self.ids.get(entity_id, None)
+        if previous == key:
+            if self.entries[key][1] != name:
+                self.entries[key] = entity_id, name
+                self.dirty = True
+            return None
+
+        if previous is not None:  # renamed
+            self._remove(previous)
+
+        if (other := self.entries.get(key, None)) is not None:  # name reused
+            del self.ids[other[0]]
+            del self.seen[other[0]]
+        else:
+            bisect.insort(self.keys, key)
+
+        self.entries[key] = entity_id, name
+        self.ids[entity_id] = key
+        self.dirty = True
+        return other[0] if other is not None else None
+
+    def update(self, pairs: Iterable[Tuple[int, str]]) -> None:
+        for entity_id, name in pairs:
+            self.add(entity_id, name)
+
+    def _remove(self, key: str) -> None:
+        del self.entries[key]
+        del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def expired(self, max_age: int, max_entries: int) -> Set[int]:
+        """
+        Returns IDs not seen for `max_age` days, and the least recently seen
+        IDs beyond `max_entries`.
+        """
+
+        cutoff = _today() - max_age
+        ids = {entity_id for entity_id, day in self.seen.items() if day < cutoff}
+
+        if (excess := len(self.seen) - len(ids) - max_entries) > 0:
+            kept = (item for item in self.seen.items() if item[1] >= cutoff)
+            ids.update(
+                entity_id
+                for entity_id, _ in heapq.nsmallest(excess, kept, key=lambda i: i[1])
+            )
+
+        return ids
+
+    def remove(self, ids: Iterable[int]) -> int:
+        count = 0
+        for entity_id in ids:
+            if (key := self.ids.pop(entity_id, None)) is not None:
+                del self.entries[key]
+                del self.seen[entity_id]
+                count += 1
+
+        if count:
+            self.keys = sorted(self.entries)  # cheaper than a deletion per key
+            self.dirty = True
+
+        return count
+
+    def prune(self, max_age: int, max_entries: int) -> int:
+        return self.remove(self.expired(max_age, max_entries))
+
+    def get(self, name: str) -> Optional[int]:
+        if entry := self.entries.get(self.normalize(name), None):
+            return entry[0]
+        return None
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        prefix = self.normalize(prefix)
+        results = []
+
+        for position in range(bisect.bisect_left(self.keys, prefix), len(self.keys)):
+            key = self.keys[position]
+            if not key.startswith(prefix) or len(results) == limit:
+                break
+
+            results.append(self.entries[key])
+
+        return results
+
+    def dump(self) -> List[Tuple[int, str, int]]:
+        return [
+            (entity_id, name, self.seen[entity_id])
+            for entity_id, name in self.entries.values()
+        ]
+
+    @classmethod
+    def from_dump(cls, triples: List[Tuple[int, str, int]]) -> NameIndex:
+        # bulk load, avoids an insort per entry
+        index = cls()
+        for entity_id, name, seen in triples:
+            key = cls.normalize(name)
+            if (other := index.entries.get(key, None)) is not None:
+                # the name was reused, keep the ID seen last
+                if index.seen[other[0]] > seen:
+                    continue
+                del index.ids[other[0]]
+                del index.seen[other[0]]
+
+            index.entries[key] = entity_id, name
+            index.ids[entity_id] = key
+            index.seen[entity_id] = seen
+        index.keys = sorted(index.entries)
+        return index
+
+
+class ClanIndex:
+    """
+    Clans by tag and by name, sharing IDs between both indexes.
+    """
+
+    def __init__(self):
+        self.tags = NameIndex()
+        self.names = NameIndex()
+        self.clans: Dict[int, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.clans)
+
+    @property
+    def dirty(self) -> bool:
+        return self.tags.dirty or self.names.dirty
+
+    @dirty.setter
+    def dirty(self, value: bool) -> None:
+        self.tags.dirty = self.names.dirty = value
+
+    def add(self, clan_id: int, tag: str, name: str) -> None:
+        self.clans[clan_id] = tag, name
+
+        # a clan whose tag and name were both reused can no longer be found
+        for other in (self.tags.add(clan_id, tag), self.names.add(clan_id, name)):
+            if other is not None and not self._indexed(other):
+                self.clans.pop(other, None)
+
+    def _indexed(self, clan_id: int) -> bool:
+        return clan_id in self.tags.ids or clan_id in self.names.ids
+
+    def update(self, triples: Iterable[Tuple[int, str, str]]) -> None:
+        for clan_id, tag, name in triples:
+            self.add(clan_id, tag, name)
+
+    def prune(self, max_age: int, max_entries: int) -> int:
+        # a clan may be missing from one index if its tag or name was reused
+        ids = self.tags.expired(max_age, max_entries)
+        ids.update(self.names.expired(max_age, max_entries))
+
+        self.tags.remove(ids)
+        self.names.remove(ids)
+        for clan_id in ids:
+            self.clans.pop(clan_id, None)
+
+        return len(ids)
+
+    def get(self, value: str) -> Optional[int]:
+        if (clan_id := self.tags.get(value)) is not None:
+            return clan_id
+        return self.names.get(value)
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, str, str]]:
+        results = {}
+
+        for clan_id, _ in self.tags.search(prefix, limit):
+            results[clan_id] = self.clans[clan_id]
+        for clan_id, _ in self.names.search(prefix, limit - len(results)):
+            if len(results) == limit:
+                break
+            results.setdefault(clan_id, self.clans[clan_id])
+
+        return [(clan_id, tag, name) for clan_id, (tag, name) in results.items()]
+
+    def dump(self) -> Dict[str, List[Tuple]]:
+        # each index separately, a clan may be missing from either
+        return {
+            "tags": self.tags.dump(),
+            "names": self.names.dump(),
+            "clans": [
+                (clan_id, tag, name) for clan_id, (tag, name) in self.clans.items()
+            ],
+        }
+
+    @classmethod
+    def from_dump(cls, data: Dict[str, List[Tuple]]) -> ClanIndex:
+        index = cls()
+        index.tags = NameIndex.from_dump(data["tags"])
+        index.names = NameIndex.from_dump(data["names"])
+        index.clans = {
+            clan_id: (tag, name)
+            for clan_id, tag, name in data["clans"]
+            if index._indexed(clan_id)
+        }
+        return index
+
+
+players: Dict[str, NameIndex] = {region: NameIndex() for region in VORTEX}
+clans: Dict[str, ClanIndex] = {region: ClanIndex() for region in VORTEX}
+task: Optional[asyncio.Task] = None
+
+
+def _indexes():
+    return [*players.values(), *clans.values()]
+
+
+def _mark_dirty() -> None:
+    for index in _indexes():
+        index.dirty = True
+
+
+def load() -> None:
+    try:
+        with open(INDEX_PATH, "rb") as fp:
+            data = pickle.load(fp)
+    except FileNotFoundError:
+        return
+
+    if (version := data.get("version", None)) not in (1, 2, INDEX_VERSION):
+        return
+
+    today = _today()
+    for region, entries in data["players"].items():
+        if region in players:
+            if version == 1:  # entries without the day last seen
+                entries = [(player_id, name, today) for player_id, name in entries]
+            players[region] = NameIndex.from_dump(entries)
+
+    for region, entries in data.get("clans", {}).items():
+        if region in clans:
+            if version == 1:
+                entries = [
+                    (clan_id, tag, name, today) for clan_id, tag, name in entries
+                ]
+            if version < 3:  # one row per clan, reused names resolved on load
+                entries = {
+                    "tags": [(c, tag, seen) for c, tag, _, seen in entries],
+                    "names": [(c, name, seen) for c, _, name, seen in entries],
+                    "clans": [(c, tag, name) for c, tag, name, _ in entries],
+                }
+            clans[region] = ClanIndex.from_dump(entries)
+
+
+def _dump(force: bool = False) -> Optional[Dict[str, Any]]:
+    if not force and not any(index.dirty for index in _indexes()):
+        return None
+
+    data = {
+        "version": INDEX_VERSION,
+        "players": {region: index.dump() for region, index in players.items()},
+        "clans": {region: index.dump() for region, index in clans.items()},
+    }
+
+    for index in _indexes():
+        index.dirty = False
+
+    return data
+
+
+def _write(data: Dict[str, Any]) -> None:
+    temp_path = f"{INDEX_PATH}.tmp"
+    with open(temp_path, "wb") as fp:
+        pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, INDEX_PATH)
+
+
+def save(force: bool = False) -> bool:
+    if (data := _dump(force)) is None:
+        return False
+
+    try:
+        _write(data)
+    except OSError:
+        _mark_dirty()  # retried by the next save
+        raise
+
+    return True
+
+
+def prune(max_age: int = MAX_AGE, max_entries: int = MAX_ENTRIES) -> int:
+    """
+    Drops expired entries and the least recently seen entries beyond
+    `max_entries` per index, returning the number of entries dropped.
+    """
+
+    return sum(index.prune(max_age, max_entries) for index in _indexes())
+
+
+async def run() -> None:
+    pruned_at = time.monotonic()
+
+    while True:
+        await asyncio.sleep(SAVE_INTERVAL)
+
+        if time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+            pruned_at = time.monotonic()
+            if count := prune():
+                logger.info(f"Pruned {count} index entries")
+
+        # dumped on the loop, since the indexes keep changing, written in a thread
+        if (data := _dump()) is None:
+            continue
+
+        try:
+            await asyncio.to_thread(_write, data)
+        except OSError as e:
+            _mark_dirty()
+            logger.warning("Failed to save name index", exc_info=e)
+
+
+def start() -> None:
+    """
+    Loads the indexes and saves them periodically until stop().
+    """
+
+    global task
+
+    if task is None:
+        load()
+        prune()
+        task = asyncio.create_task(run())
+
+
+def stop() -> None:
+    global task
+
+    if task is not None:
+        task.cancel()
+        task = None
+
+        try:
+            save()
+        except OSError as e:
+            logger.warning("Failed to save name index", exc_info=e)
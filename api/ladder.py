@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+__all__ = ["LadderCache", "cache"]
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import time
+
+from config import cfg
+from .models import LadderPosition
+
+
+Key = Tuple[str, int, str]  # region, season, realm
+
+
+class LadderCache:
+    """
+    Local index of ladder positions, fed by every fetched ladder segment.
+
+    Each position is stored with the time its segment was fetched, so any clan
+    seen in a segment younger than max_age resolves without a request. The
+    clans that segments were requested for are remembered as anchors, which
+    is what a background refresh fetches again.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age: float = max_age
+
+        self.positions: Dict[Key, Dict[int, Tuple[LadderPosition, float]]] = {}
+        self.anchors: Dict[Key, Dict[int, float]] = {}  # clan id -> last use
+
+    def age(self, key: Key, clan_id: int) -> float:
+        if (entry := self.positions.get(key, {}).get(clan_id, None)) is None:
+            return float("inf")
+
+        return time.time() - entry[1]
+
+    def get(self, key: Key, clan_id: int) -> Optional[LadderPosition]:
+        if self.age(key, clan_id) > self.max_age:
+            return None
+
+        return self.positions[key][clan_id][0]
+
+    def store(
+        self,
+        key: Key,
+        positions: Iterable[LadderPosition],
+        anchor: Optional[int] = None,
+    ) -> None:
+        now = time.time()
+        ranks = self.positions.setdefault(key, {})
+
+        for position in positions:
+            ranks[position.id] = position, now
+
+        # a segment that does not contain its clan is not worth refreshing
+        if anchor in ranks:
+            self.anchors.setdefault(key, {})[anchor] = now
+
+    def touch(self, key: Key, clan_id: int) -> None:
+        if (anchors := self.anchors.get(key, None)) and clan_id in anchors:
+            anchors[clan_id] = time.time()
+
+    def stale_anchors(self, active: float) -> List[Tuple[Key, int]]:
+        """
+        Returns anchors used within `active` seconds whose position is older
+        than half of max_age.
+        """
+
+        now = time.time()
+
+        return [
+            (key, clan_id)
+            for key, anchors in self.anchors.items()
+            for clan_id, used_at in anchors.items()
+            if now - used_at <= active and self.age(key, clan_id) > self.max_age / 2
+        ]
+
+    def prune(self, current_seasons: Dict[str, int]) -> None:
+        """
+        Drops positions from past seasons and anchors of expired positions.
+        """
+
+        now = time.time()
+
+        for key in list(self.positions):
+            region, season, _ = key
+
+            if current_seasons.get(region, season) != season:
+                self.positions.pop(key)
+                self.anchors.pop(key, None)
+                continue
+
+            ranks = self.positions[key]
+            for clan_id in [
+                clan_id
+                for clan_id, (_, fetched_at) in ranks.items()
+                if now - fetched_at > self.max_age
+            ]:
+                del ranks[clan_id]
+
+            if anchors := self.anchors.get(key, None):
+                for clan_id in [clan_id for clan_id in anchors if clan_id not in ranks]:
+                    del anchors[clan_id]
+
+
+cache = LadderCache(cfg.ladder.max_age)
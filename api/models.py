@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 __all__ = [
+    "StatBlock",
     "Player",
     "PartialPlayer",
     "FullPlayer",
@@ -12,17 +13,67 @@ __all__ = [
     "BuildingsData",
 ]
 
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from array import array
+from dataclasses import dataclass, field
+import sys
+import time
 
 from .urls import CLANS, URLS
 from .utils import *
 
 
+# --- Statistics ---
+
+
+class StatBlock(Mapping[str, int]):
+    """
+    Read-only mapping of statistic names to values.
+
+    Blocks with the same keys share one interned layout, and the values are
+    stored in a fixed-width array instead of a per-block dictionary.
+    """
+
+    __slots__ = ("_layout", "_values")
+
+    _layouts: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+    def __init__(self, data: Mapping[str, int]):
+        keys = tuple(data)
+
+        if (layout := self._layouts.get(keys, None)) is None:
+            layout = {sys.intern(key): index for index, key in enumerate(keys)}
+            self._layouts[tuple(layout)] = layout
+
+        self._layout: Dict[str, int] = layout
+        try:
+            self._values = array("q", data.values())
+        except (TypeError, OverflowError):  # not exclusively 64-bit integers
+            self._values = tuple(data.values())
+
+    def __getitem__(self, key: str) -> int:
+        return self._values[self._layout[key]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
 # --- Players ---
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     region: str
     id: int
@@ -31,6 +82,7 @@ class Player:
     clan_role: Optional[ClanRole]
     is_empty: bool
     used_access_code: Optional[str]
+    fetched_at: float = field(default_factory=time.time, kw_only=True)
 
     @property
     def profile_url(self) -> str:
@@ -42,14 +94,14 @@ class Player:
         return f"https://{self.region}.wows-numbers.com/player/{self.id},{self.name}"
 
 
-@dataclass
+@dataclass(slots=True)
 class PartialPlayer(Player):
     statistics: dict[str, ClanMemberStatistics]
 
 
-@dataclass
+@dataclass(slots=True)
 class FullPlayer(Player):
-    statistics: dict[str, dict[str, int]]
+    statistics: dict[str, StatBlock]
 
     activated_at: IT
     created_at: IT
@@ -63,7 +115,7 @@ class FullPlayer(Player):
 # --- Partial Clans ---
 
 
-@dataclass
+@dataclass(slots=True)
 class ClanRole:
     clan: PartialClan
     clan_id: int
@@ -71,7 +123,7 @@ class ClanRole:
     role: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PartialClan:
     color: int
     name: str
@@ -82,7 +134,7 @@ class PartialClan:
 # --- Clans ---
 
 
-@dataclass
+@dataclass(slots=True)
 class LadderPosition:
     id: int
     name: str
@@ -91,7 +143,7 @@ class LadderPosition:
     rank: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ClanMemberStatistics:
     id: int
     name: str
@@ -107,7 +159,7 @@ class ClanMemberStatistics:
     wins_percentage: Optional[float]
 
 
-@dataclass
+@dataclass(slots=True)
 class FullClan:
     region: str
 
@@ -115,13 +167,14 @@ class FullClan:
     achievements: list[ClanAchievement]
     buildings: dict[str, ClanBuilding]
     clan: ClanInfo
+    fetched_at: float = field(default_factory=time.time, kw_only=True)
 
     @property
     def profile_url(self):
         return f"{CLANS[self.region][:-3]}/clan-profile/{self.clan.id}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ClanMaxPosition:
     division_rating: int
     public_rating: int
@@ -129,7 +182,7 @@ class ClanMaxPosition:
     division: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Rating:
     team_number: int  # i.e. Alpha, Bravo "ratings"
     league: int
@@ -152,7 +205,7 @@ class Rating:
     max_position: ClanMaxPosition
 
 
-@dataclass
+@dataclass(slots=True)
 class MasterRating(Rating):
     color: int
     leading_team_number: int
@@ -161,13 +214,13 @@ class MasterRating(Rating):
     ratings: List[Rating]
 
 
-@dataclass
+@dataclass(slots=True)
 class ClanAchievement:
     count: int
     cd: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ClanBuilding:
     id: int
     name: str
@@ -175,7 +228,7 @@ class ClanBuilding:
     modifiers: list[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class ClanInfo:
     id: int
     name: str
@@ -195,7 +248,7 @@ class ClanInfo:
 # --- Seasons ---
 
 
-@dataclass
+@dataclass(slots=True)
 class SeasonsData:
     data: Dict[SI, Season]
 
@@ -204,7 +257,7 @@ class SeasonsData:
         return max(season_id for season_id in self.data if season_id < 100)
 
 
-@dataclass
+@dataclass(slots=True)
 class Season:
     season_id: int
     name: str
@@ -217,7 +270,7 @@ class Season:
     leagues: List[League]
 
 
-@dataclass
+@dataclass(slots=True)
 class League:
     name: str
     icon: str
@@ -227,35 +280,58 @@ class League:
 # --- Buildings ---
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildingsData:
     building_types: Dict[SI, BuildingType]
     buildings: Dict[SI, Building]
     clans_roles: Dict[str, str]
 
+    # indexes, built once per glossary
+    modifier_types: Dict[int, BuildingType] = field(init=False, repr=False)
+    upgrade_counts: Dict[int, int] = field(init=False, repr=False)
+    total_cost: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.modifier_types = {
+            building_id: self.building_types[building.building_type_id]
+            for building_id, building in self.buildings.items()
+            if building.building_type_id in self.building_types
+        }
+
+        # the first building of each type is the unupgraded one
+        self.upgrade_counts = {}
+        for building in self.buildings.values():
+            type_id = building.building_type_id
+            self.upgrade_counts[type_id] = self.upgrade_counts.get(type_id, -1) + 1
+
+        self.total_cost = sum(building.cost for building in self.buildings.values())
+
     def type_of(self, building_id: int):
-        if not (building := self.buildings.get(building_id, None)):
-            return None
-        return self.building_types[building.building_type_id]
+        return self.modifier_types.get(building_id, None)
 
     def upgrades_count(self, building_type: BuildingType):
-        return (
-            sum(
-                1
-                for building in self.buildings.values()
-                if building.building_type_id == building_type.building_type_id
-            )
-            - 1
+        return self.upgrade_counts[building_type.building_type_id]
+
+    def remaining_cost(self, building_ids: Iterable[int]) -> int:
+        """
+        Returns the cost of every building not in building_ids.
+        """
+
+        buildings = self.buildings
+        return self.total_cost - sum(
+            buildings[building_id].cost
+            for building_id in set(building_ids)
+            if building_id in buildings
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildingType:
     building_type_id: int
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Building:
     building_id: int
     building_type_id: int
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+__all__ = ["ShipsStatistics"]
+
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Tuple, Union
+
+import numpy as np
+
+
+class ShipsStatistics:
+    """
+    Columnar per-ship statistics of one player and battle type.
+
+    Each column is an int64 array aligned with the sorted `ship_ids` array, so
+    aggregates over all ships are single vectorised operations.
+    """
+
+    COLUMNS = (
+        "battles_count",
+        "wins",
+        "losses",
+        "survived",
+        "damage_dealt",
+        "frags",
+        "original_exp",
+        "planes_killed",
+        "ships_spotted",
+        "scouting_damage",
+        "art_agro",
+        "tpd_agro",
+        "max_damage_dealt",
+        "max_frags",
+        "max_exp",
+    )
+    # name -> (numerator, denominator), evaluated per ship
+    RATIOS = {
+        "winrate": ("wins", "battles_count"),
+        "survival": ("survived", "battles_count"),
+        "damage": ("damage_dealt", "battles_count"),
+        "frags": ("frags", "battles_count"),
+        "exp": ("original_exp", "battles_count"),
+        "spotting": ("scouting_damage", "battles_count"),
+    }
+
+    __slots__ = ("ship_ids", "columns")
+
+    def __init__(self, ship_ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.ship_ids: np.ndarray = ship_ids
+        self.columns: Dict[str, np.ndarray] = columns
+
+    @classmethod
+    def from_blocks(cls, blocks: Mapping[Union[int, str], Mapping[str, int]]):
+        """
+        Builds the columns from {ship_id: statistics}, skipping empty blocks.
+        """
+
+        items = sorted(
+            (int(ship_id), block) for ship_id, block in blocks.items() if block
+        )
+        count = len(items)
+
+        ship_ids = np.fromiter((ship_id for ship_id, _ in items), np.int64, count)
+        columns = {
+            column: np.fromiter(
+                (block.get(column, 0) for _, block in items), np.int64, count
+            )
+            for column in cls.COLUMNS
+        }
+
+        return cls(ship_ids, columns)
+
+    def __len__(self) -> int:
+        return len(self.ship_ids)
+
+    def __contains__(self, ship_id: int) -> bool:
+        return self._position(ship_id) is not None
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def _position(self, ship_id: int):
+        position = np.searchsorted(self.ship_ids, ship_id)
+        if position < len(self.ship_ids) and self.ship_ids[position] == ship_id:
+            return position
+        return None
+
+    def row(self, ship_id: int) -> Dict[str, int]:
+        if (position := self._position(ship_id)) is None:
+            raise KeyError(ship_id)
+
+        return {name: int(values[position]) for name, values in self.columns.items()}
+
+    def ratio(self, name: str) -> np.ndarray:
+        """
+        Returns a per-ship ratio from RATIOS, NaN for ships without battles.
+        """
+
+        numerator, denominator = self.RATIOS[name]
+        top, bottom = self.columns[numerator], self.columns[denominator]
+
+        result = np.full(len(self), np.nan)
+        np.divide(top, bottom, out=result, where=bottom > 0)
+        return result
+
+    def totals(self) -> Dict[str, int]:
+        return {name: int(values.sum()) for name, values in self.columns.items()}
+
+    def group_by(
+        self, key: Union[Mapping[int, Hashable], Callable[[int], Hashable]]
+    ) -> Dict[Hashable, Dict[str, int]]:
+        """
+        Sums every column per group, e.g. per tier, class or nation.
+
+        `key` maps ship IDs to groups. Ships it does not know are skipped.
+        """
+
+        get = key.get if isinstance(key, Mapping) else key
+        labels = [get(int(ship_id)) for ship_id in self.ship_ids]
+
+        groups: List[Hashable] = []
+        codes = np.empty(len(labels), np.int64)
+        seen: Dict[Hashable, int] = {}
+
+        for position, label in enumerate(labels):
+            if label is None:
+                codes[position] = -1
+            else:
+                if label not in seen:
+                    seen[label] = len(groups)
+                    groups.append(label)
+                codes[position] = seen[label]
+
+        known = codes >= 0
+        sums = {}
+
+        for name, values in self.columns.items():
+            sums[name] = np.zeros(len(groups), np.int64)
+            np.add.at(sums[name], codes[known], values[known])
+
+        return {
+            group: {name: int(column[code]) for name, column in sums.items()}
+            for code, group in enumerate(groups)
+        }
+
+    def top(
+        self,
+        values: Union[str, np.ndarray],
+        count: int = 10,
+        min_battles: int = 1,
+    ) -> List[Tuple[int, Any]]:
+        """
+        Returns the (ship_id, value) pairs with the highest values.
+
+        `values` is a column, a ratio name, or an array aligned with ship_ids.
+        """
+
+        if isinstance(values, str):
+            values = (
+                self.ratio(values) if values in self.RATIOS else self.columns[values]
+            )
+
+        eligible = np.flatnonzero(
+            (self.columns["battles_count"] >= min_battles) & ~np.isnan(values)
+        )
+        if not len(eligible):
+            return []
+
+        count = min(count, len(eligible))
+        best = eligible[np.argpartition(-values[eligible], count - 1)[:count]]
+        best = best[np.argsort(-values[best], kind="stable")]
+
+        return [(int(self.ship_ids[i]), values[i].item()) for i in best]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+__all__ = ["StaleCache", "players", "clans", "player_key", "clan_key"]
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import time
+
+from bot.utils.cache import MISSING, TwoLevelCache
+from bot.utils.logs import logger
+from config import cfg
+from . import codec
+
+
+Fetch = Callable[[], Awaitable[Any]]
+Watcher = Callable[[Any], Awaitable[None]]
+
+
+class StaleCache:
+    """
+    Stale-while-revalidate cache of fetched results.
+
+    Results younger than soft_ttl are served as is. Results younger than
+    hard_ttl are also served immediately, but trigger a background refetch,
+    and the new result is passed to every watcher of its key. Older or missing
+    results are fetched before returning. Cached values must carry a
+    `fetched_at` timestamp, and None results are not cached.
+    """
+
+    def __init__(self, namespace: str, soft_ttl: float, hard_ttl: float):
+        self.soft_ttl: float = soft_ttl
+        self.hard_ttl: float = hard_ttl
+
+        # shared with other processes, see bot.utils.cache
+        self.values: TwoLevelCache = TwoLevelCache(
+            namespace, hard_ttl, cfg.cache.local_bytes, codec.encode, codec.decode
+        )
+        self.fetches: Dict[Hashable, asyncio.Task] = {}
+        self.watchers: Dict[Hashable, List[Watcher]] = {}
+
+    async def get(self, key: Hashable, fetch: Fetch) -> Any:
+        if (value := await self.values.get(key)) is not MISSING:
+            age = time.time() - value.fetched_at
+
+            if age < self.soft_ttl:
+                return value
+            elif age < self.hard_ttl:
+                self._start(key, fetch)
+                return value
+
+        # concurrent misses share one request
+        return await asyncio.shield(self._start(key, fetch))
+
+    def watch(self, key: Hashable, watcher: Watcher, since: float) -> None:
+        """
+        Calls `watcher` with every refetched value of `key`, including one
+        fetched after `since` but before the watcher was registered.
+        """
+
+        self.watchers.setdefault(key, []).append(watcher)
+
+        if (value := self.values.peek(key)) is not MISSING:
+            if value.fetched_at > since:
+                asyncio.create_task(self._notify(watcher, value))
+
+    def unwatch(self, key: Hashable, watcher: Watcher) -> None:
+        if (watchers := self.watchers.get(key, None)) is None:
+            return
+
+        if watcher in watchers:
+            watchers.remove(watcher)
+        if not watchers:
+            del self.watchers[key]
+
+    def _start(self, key: Hashable, fetch: Fetch) -> asyncio.Task:
+        if (task := self.fetches.get(key, None)) is None:
+            task = asyncio.create_task(self._fetch(key, fetch))
+            self.fetches[key] = task
+
+        return task
+
+    async def _fetch(self, key: Hashable, fetch: Fetch) -> Any:
+        stale = self.values.peek(key)
+
+        try:
+            value = await fetch()
+        except Exception as e:
+            if stale is MISSING:
+                raise
+
+            logger.warning(f"Failed to refresh {key}, serving cached", exc_info=e)
+            return stale
+        finally:
+            del self.fetches[key]
+
+        if value is None:
+            await self.values.delete(key)
+            return None
+
+        await self.values.set(key, value)
+        if stale is not MISSING:
+            for watcher in list(self.watchers.get(key, ())):
+                asyncio.create_task(self._notify(watcher, value))
+
+        return value
+
+    @staticmethod
+    async def _notify(watcher: Watcher, value: Any) -> None:
+        try:
+            await watcher(value)
+        except Exception as e:
+            logger.warning("Failed to update watcher", exc_info=e)
+
+
+def player_key(
+    region: str, player_id: int, access_code: Optional[str]
+) -> Tuple[str, int, Optional[str]]:
+    return region, int(player_id), access_code
+
+
+def clan_key(region: str, clan_id: int) -> Tuple[str, int]:
+    return region, int(clan_id)
+
+
+players = StaleCache("players", cfg.stale.soft_ttl, cfg.stale.hard_ttl)
+clans = StaleCache("clans", cfg.stale.soft_ttl, cfg.stale.hard_ttl)
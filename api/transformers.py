@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 __all__ = [
     "PlayerTransformer",
@@ -12,6 +12,9 @@ from discord import app_commands
 import discord
 
 from bot.utils import db, wows
+from . import index
+from .autocomplete import AutocompleteEngine
+from .decoders import loads
 from .models import Player, FullClan
 from .urls import VORTEX, CLANS_API
 from .vortex import get_player, get_clan, vortex_limit, VortexError
@@ -20,6 +23,41 @@ from .vortex import get_player, get_clan, vortex_limit, VortexError
 autocomplete_limit = aiolimiter.AsyncLimiter(5, 1)
 
 
+async def autocomplete_players(region: str, value: str) -> List[Tuple[int, str]]:
+    async with vortex_limit:
+        async with autocomplete_limit:
+            async with aiohttp.ClientSession() as session:
+                url = f"{VORTEX[region]}/accounts/search/autocomplete/{value}/"
+
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        raise VortexError(response.status)
+
+                    data = loads(await response.read())["data"]
+
+    results = [(result["spa_id"], result["name"]) for result in data]
+    index.players[region].update(results)
+    return results
+
+
+async def autocomplete_clans(region: str, value: str) -> List[Tuple[int, str, str]]:
+    async with vortex_limit:
+        async with autocomplete_limit:
+            async with aiohttp.ClientSession() as session:
+                url = f"{CLANS_API[region]}/search/autocomplete/"
+                params = {"type": "clans", "search": value}
+
+                async with session.get(url, params=params) as response:
+                    if response.status != 200:
+                        raise VortexError(response.status)
+
+                    result = loads(await response.read())["search_autocomplete_result"]
+
+    results = [(clan["id"], clan["tag"], clan["name"]) for clan in result]
+    index.clans[region].update(results)
+    return results
+
+
 async def get_region(interaction: discord.Interaction) -> str:
     if (
         hasattr(interaction.namespace, "region")
@@ -39,26 +77,30 @@ async def get_region(interaction: discord.Interaction) -> str:
 
 
 class PlayerTransformer(app_commands.Transformer):
+    MAX_AC_RESULTS = 10
+
+    engine = AutocompleteEngine(
+        autocomplete_players,
+        lambda result, prefix: result[1].lower().startswith(prefix),
+        MAX_AC_RESULTS,
+    )
+
     async def autocomplete(
         self, interaction: discord.Interaction, value: str
     ) -> List[app_commands.Choice[str]]:
         await interaction.response.defer()
         region = await get_region(interaction)
 
-        async with vortex_limit:
-            async with autocomplete_limit:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{VORTEX[region]}/accounts/search/autocomplete/{value}/"
-
-                    async with session.get(url) as response:
-                        if response.status != 200:
-                            return []
-
-                        data = (await response.json())["data"]
+        # only query if the index could be hiding better matches
+        results = index.players[region].search(value, self.MAX_AC_RESULTS)
+        if len(results) < self.MAX_AC_RESULTS:
+            fetched = await self.engine.query(interaction, region, value)
+            if fetched is not None:
+                results = fetched
 
         return [
-            app_commands.Choice(name=result["name"], value=str(result["spa_id"]))
-            for result in data
+            app_commands.Choice(name=name, value=str(spa_id))
+            for spa_id, name in results
         ]
 
     async def transform(
@@ -69,8 +111,15 @@ class PlayerTransformer(app_commands.Transformer):
         user = await db.User.get_or_create(id=interaction.user.id)
         access_code = user.wg_ac
 
-        if player := await get_player(region, value, access_code):
-            return player
+        if value.isdigit():
+            if player := await get_player(region, value, access_code, allow_stale=True):
+                return player
+
+        if (player_id := index.players[region].get(value)) is not None:
+            if player := await get_player(
+                region, player_id, access_code, allow_stale=True
+            ):
+                return player
 
         async with vortex_limit:
             async with aiohttp.ClientSession() as session:
@@ -80,38 +129,44 @@ class PlayerTransformer(app_commands.Transformer):
                     if response.status != 200:
                         raise VortexError(response.status)
 
-                    data = (await response.json())["data"]
+                    data = loads(await response.read())["data"]
 
         if not data:
             return None
 
-        return await get_player(region, data[0]["spa_id"], access_code)
+        index.players[region].update(
+            (result["spa_id"], result["name"]) for result in data
+        )
+        return await get_player(
+            region, data[0]["spa_id"], access_code, allow_stale=True
+        )
 
 
 class ClanTransformer(app_commands.Transformer):
+    MAX_AC_RESULTS = 10
+
+    engine = AutocompleteEngine(
+        autocomplete_clans,
+        lambda result, prefix: result[1].lower().startswith(prefix)
+        or result[2].lower().startswith(prefix),
+        MAX_AC_RESULTS,
+    )
+
     async def autocomplete(
         self, interaction: discord.Interaction, value: str
     ) -> List[app_commands.Choice[str]]:
         await interaction.response.defer()
         region = await get_region(interaction)
 
-        async with vortex_limit:
-            async with autocomplete_limit:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{CLANS_API[region]}/search/autocomplete/"
-                    params = {"type": "clans", "search": value}
-
-                    async with session.get(url, params=params) as response:
-                        if response.status != 200:
-                            return []
-
-                        result = (await response.json())["search_autocomplete_result"]
+        results = index.clans[region].search(value, self.MAX_AC_RESULTS)
+        if len(results) < self.MAX_AC_RESULTS:
+            fetched = await self.engine.query(interaction, region, value)
+            if fetched is not None:
+                results = fetched
 
         return [
-            app_commands.Choice(
-                name=f"[{clan['tag']}] {clan['name']}", value=str(clan["id"])
-            )
-            for clan in result
+            app_commands.Choice(name=f"[{tag}] {name}", value=str(clan_id))
+            for clan_id, tag, name in results
         ]
 
     async def transform(
@@ -120,8 +175,13 @@ class ClanTransformer(app_commands.Transformer):
         await interaction.response.defer()
         region = await get_region(interaction)
 
-        if clan := await get_clan(region, value):
-            return clan
+        if value.isdigit():
+            if clan := await get_clan(region, value, allow_stale=True):
+                return clan
+
+        if (clan_id := index.clans[region].get(value)) is not None:
+            if clan := await get_clan(region, clan_id, allow_stale=True):
+                return clan
 
         async with vortex_limit:
             async with aiohttp.ClientSession() as session:
@@ -137,9 +197,12 @@ class ClanTransformer(app_commands.Transformer):
                     if response.status != 200:
                         raise VortexError(response.status)
 
-                    clans = (await response.json())["clans"]
+                    clans = loads(await response.read())["clans"]
 
         if not clans:
             return None
 
-        return await get_clan(region, clans[0]["id"])
+        index.clans[region].update(
+            (clan["id"], clan["tag"], clan["name"]) for clan in clans
+        )
+        return await get_clan(region, clans[0]["id"], allow_stale=True)
@@ -7,22 +7,27 @@ __all__ = [
     "VortexError",
     "get_player",
     "get_ship_statistics",
+    "get_ships_statistics",
     "get_partial_statistics",
     "get_clan_members",
     "get_clan",
     "get_ladder_position",
+    "get_ladder_clans",
+    "refresh_ladder",
 ]
 
 from typing import List, Optional, Union
+import functools
 
 import aiohttp
 import aiolimiter
-import dacite
 
+from .decoders import *
 from .models import *
+from .ships import *
 from .urls import CLANS_API, VORTEX
 from .utils import *
-from . import wg
+from . import index, ladder, stale, wg
 
 DEFAULT_BATTLE_TYPE = "pvp"
 BATTLE_TYPES = {
@@ -47,7 +52,19 @@ async def get_player(
     region: str,
     player_id: Union[int, str],
     access_code: Optional[str] = None,
+    allow_stale: bool = False,
 ) -> Optional[Player]:
+    """
+    If allow_stale is True, a recently fetched player may be returned instead,
+    see api.stale.StaleCache.
+    """
+
+    if allow_stale:
+        return await stale.players.get(
+            stale.player_key(region, player_id, access_code),
+            functools.partial(get_player, region, player_id, access_code),
+        )
+
     player_id = str(player_id)
 
     async with vortex_limit:
@@ -61,8 +78,9 @@ async def get_player(
                 elif response.status != 200:
                     raise VortexError(response.status)
 
-                data = (await response.json())["data"][player_id]
+                data = loads(await response.read())["data"][player_id]
 
+    index.players[region].add(int(player_id), data["name"])
     hidden_profile = "hidden_profile" in data
     clan_role = await get_clan_role(region, player_id)
     kwargs = {
@@ -87,8 +105,7 @@ async def get_player(
         return Player(is_empty=False, **kwargs)
 
     try:
-        return dacite.from_dict(
-            FullPlayer,
+        return decode_player(
             {
                 "statistics": {
                     index: data["statistics"][index]
@@ -99,8 +116,7 @@ async def get_player(
                 "activated_at": data["activated_at"],
                 "is_empty": False,
                 **kwargs,
-            },
-            config,
+            }
         )
     except KeyError:
         return Player(
@@ -123,12 +139,14 @@ async def get_clan_role(
                 elif response.status != 200:
                     raise VortexError(response.status)
 
-                data = (await response.json())["data"]
+                data = loads(await response.read())["data"]
 
     if "clan_id" in data and data["clan_id"] is None:
         return None
     else:
-        return dacite.from_dict(ClanRole, data, config)
+        clan = data["clan"]
+        index.clans[region].add(data["clan_id"], clan["tag"], clan["name"])
+        return decode_clan_role(data)
 
 
 async def get_ship_statistics(
@@ -137,7 +155,7 @@ async def get_ship_statistics(
     ship_id: Union[int, str],
     battle_type: str = DEFAULT_BATTLE_TYPE,
     access_code: Optional[str] = None,
-) -> Optional[dict[str, int]]:
+) -> Optional[StatBlock]:
     player_id = str(player_id)
     ship_id = str(ship_id)
 
@@ -154,12 +172,44 @@ async def get_ship_statistics(
                 elif response.status != 200:
                     raise VortexError(response.status)
 
-                data = (await response.json())["data"][player_id]
+                data = loads(await response.read())["data"][player_id]
 
     if "hidden_profile" in data or not data["statistics"]:
         return None
 
-    return data["statistics"][ship_id][battle_type]
+    return StatBlock(data["statistics"][ship_id][battle_type])
+
+
+async def get_ships_statistics(
+    region: str,
+    player_id: Union[int, str],
+    battle_type: str = DEFAULT_BATTLE_TYPE,
+    access_code: Optional[str] = None,
+) -> Optional[ShipsStatistics]:
+    player_id = str(player_id)
+
+    async with vortex_limit:
+        async with aiohttp.ClientSession() as session:
+            url = f"{VORTEX[region]}/accounts/{player_id}/ships/{battle_type}/"
+            params = {"ac": access_code} if access_code else None
+
+            async with session.get(url, params=params) as response:
+                if response.status == 404:
+                    return None
+                elif response.status != 200:
+                    raise VortexError(response.status)
+
+                data = loads(await response.read())["data"][player_id]
+
+    if "hidden_profile" in data or not data["statistics"]:
+        return None
+
+    return ShipsStatistics.from_blocks(
+        {
+            ship_id: ship_data.get(battle_type, None)
+            for ship_id, ship_data in data["statistics"].items()
+        }
+    )
 
 
 async def get_partial_statistics(
@@ -200,17 +250,31 @@ async def get_clan_members(
                 elif response.status != 200:
                     raise VortexError(response.status)
 
-                items = (await response.json())["items"]
+                items = loads(await response.read())["items"]
 
-    return [dacite.from_dict(ClanMemberStatistics, data, config) for data in items]
+    index.players[region].update((data["id"], data["name"]) for data in items)
+    return decode_clan_members(items)
 
 
-async def get_clan(region: str, clan_id: Union[int, str]):
+async def get_clan(
+    region: str, clan_id: Union[int, str], allow_stale: bool = False
+) -> Optional[FullClan]:
+    """
+    If allow_stale is True, a recently fetched clan may be returned instead,
+    see api.stale.StaleCache.
+    """
+
     try:
         clan_id = int(clan_id)
     except ValueError:
         return None
 
+    if allow_stale:
+        return await stale.clans.get(
+            stale.clan_key(region, clan_id),
+            functools.partial(get_clan, region, clan_id),
+        )
+
     async with vortex_limit:
         async with aiohttp.ClientSession() as session:
             url = f"{CLANS_API[region]}/clanbase/{clan_id}/claninfo/"
@@ -221,7 +285,7 @@ async def get_clan(region: str, clan_id: Union[int, str]):
                 elif response.status != 200:
                     raise VortexError(response.status)
 
-                view = (await response.json())["clanview"]
+                view = loads(await response.read())["clanview"]
 
     if "id" not in view["clan"]:  # bad id
         return None
@@ -230,7 +294,33 @@ async def get_clan(region: str, clan_id: Union[int, str]):
         view["wows_ladder"] = None
 
     view["region"] = region
-    return dacite.from_dict(FullClan, view, config)
+    index.clans[region].add(clan_id, view["clan"]["tag"], view["clan"]["name"])
+    return decode_full_clan(view)
+
+
+async def _get_ladder_segment(
+    region: str, clan_id: int, season: int, realm: str
+) -> Optional[List[LadderPosition]]:
+    async with vortex_limit:
+        async with aiohttp.ClientSession() as session:
+            url = f"{CLANS_API[region]}/ladder/structure/"
+            params = {"clan_id": clan_id, "season": season, "realm": realm}
+
+            async with session.get(url, params=params) as response:
+                if response.status == 404:
+                    return None
+                elif response.status != 200:
+                    raise VortexError(response.status)
+
+                segment = loads(await response.read())
+
+    index.clans[region].update(
+        (data["id"], data["tag"], data["name"]) for data in segment
+    )
+    positions = [decode_ladder_position(data) for data in segment]
+    ladder.cache.store((region, season, realm), positions, anchor=clan_id)
+
+    return positions
 
 
 async def get_ladder_position(
@@ -239,12 +329,58 @@ async def get_ladder_position(
     if season is None:
         season = wg.seasons[region].last_clan_season
 
+    clan_id = int(clan_id)
     realm = REALMS[region] if local else "global"
+    key = (region, season, realm)
+
+    if (position := ladder.cache.get(key, clan_id)) is not None:
+        ladder.cache.touch(key, clan_id)
+        return position
+
+    if await _get_ladder_segment(region, clan_id, season, realm) is None:
+        return None
+
+    return ladder.cache.get(key, clan_id)
+
+
+async def refresh_ladder(active: float) -> int:
+    """
+    Refetches cached ladder segments used within `active` seconds that are
+    about to expire, returning the number of segments fetched.
+    """
+
+    count = 0
+
+    for key, clan_id in ladder.cache.stale_anchors(active):
+        # an earlier segment may have refreshed this clan already
+        if ladder.cache.age(key, clan_id) <= ladder.cache.max_age / 2:
+            continue
+
+        region, season, realm = key
+        await _get_ladder_segment(region, clan_id, season, realm)
+        count += 1
+
+    return count
+
+
+async def get_ladder_clans(
+    region: str,
+    league: int,
+    division: int,
+    season: Optional[int] = None,
+) -> Optional[List[LadderPosition]]:
+    if season is None:
+        season = wg.seasons[region].last_clan_season
 
     async with vortex_limit:
         async with aiohttp.ClientSession() as session:
-            url = f"{CLANS_API[region]}/ladder/structure/"
-            params = {"clan_id": clan_id, "season": season, "realm": realm}
+            url = f"{CLANS_API[region]}/ladder/clans/"
+            params = {
+                "league": league,
+                "division": division,
+                "season": season,
+                "realm": "global",
+            }
 
             async with session.get(url, params=params) as response:
                 if response.status == 404:
@@ -252,10 +388,10 @@ async def get_ladder_position(
                 elif response.status != 200:
                     raise VortexError(response.status)
 
-                segment = await response.json()
+                page = loads(await response.read())
 
-    for data in segment:
-        if data["id"] == clan_id:
-            return dacite.from_dict(LadderPosition, data, config)
+    index.clans[region].update((data["id"], data["tag"], data["name"]) for data in page)
+    positions = [decode_ladder_position(data) for data in page]
+    ladder.cache.store((region, season, "global"), positions)
 
-    return None
+    return positions
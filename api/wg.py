@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-__all__ = ["seasons", "get_seasons", "buildings", "get_buildings"]
+__all__ = ["seasons", "get_seasons", "buildings", "get_buildings", "load_cached"]
 
-from typing import Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
 
 import aiohttp
 
-import dacite
-
 from config import cfg
+from .decoders import *
+from .http_cache import cache
 from .models import *
 from .utils import *
 
@@ -29,37 +30,94 @@ class WGAPIError(APIError):
     pass
 
 
-async def get_seasons():
-    temp = {}
+async def _refresh(
+    path: str, current: Dict[str, Any], decode: Callable[[bytes], Any]
+) -> Tuple[Dict[str, Any], int, List[BaseException]]:
+    """
+    Fetches `path` for every region concurrently, decoding only changed regions.
+
+    Returns the merged data, the number of changed regions and the errors of
+    failed regions, which keep their current data.
+    """
+
+    async def fetch(region: str, api: str) -> Optional[Any]:
+        response = await cache.get(session, f"{api}{path}", params=PARAMS)
+
+        if response.status != 200:
+            raise WGAPIError(response.status)
+
+        if not response.modified and region in current:
+            return None
+
+        return decode(response.body)
 
     async with aiohttp.ClientSession() as session:
-        for region, api in API.items():
-            url = f"{api}/clans/season/"
+        results = await asyncio.gather(
+            *(fetch(region, api) for region, api in API.items()),
+            return_exceptions=True,
+        )
+
+    changed = {
+        region: result
+        for region, result in zip(API, results)
+        if result is not None and not isinstance(result, BaseException)
+    }
+    errors = [result for result in results if isinstance(result, BaseException)]
 
-            async with session.get(url, params=PARAMS) as response:
-                if response.status != 200:
-                    raise WGAPIError(response.status)
+    # unchanged data keeps its identity, changed data is swapped in one assignment
+    return {**current, **changed} if changed else current, len(changed), errors
 
-                data = await response.json()
-                temp[region] = dacite.from_dict(SeasonsData, data, config)
+
+async def get_seasons() -> int:
+    """
+    Refreshes seasons, returning the number of regions that changed.
+    """
 
     global seasons
-    seasons = temp
 
+    seasons, changed, errors = await _refresh(
+        "/clans/season/", seasons, lambda body: decode_seasons(loads(body))
+    )
 
-async def get_buildings():
-    temp = {}
+    if errors:
+        raise errors[0]
 
-    async with aiohttp.ClientSession() as session:
-        for region, api in API.items():
-            url = f"{api}/clans/glossary/"
+    return changed
 
-            async with session.get(url=url, params=PARAMS) as response:
-                if response.status != 200:
-                    raise WGAPIError(response.status)
 
-                data = (await response.json())["data"]
-                temp[region] = dacite.from_dict(BuildingsData, data, config)
+async def get_buildings() -> int:
+    """
+    Refreshes buildings, returning the number of regions that changed.
+    """
 
     global buildings
-    buildings = temp
+
+    buildings, changed, errors = await _refresh(
+        "/clans/glossary/",
+        buildings,
+        lambda body: decode_buildings(loads(body)["data"]),
+    )
+
+    if errors:
+        raise errors[0]
+
+    return changed
+
+
+def load_cached():
+    """
+    Loads seasons and buildings from the HTTP cache, without any requests.
+    """
+
+    global seasons, buildings
+    temp_seasons, temp_buildings = {}, {}
+
+    for region, api in API.items():
+        if body := cache.peek("GET", f"{api}/clans/season/", PARAMS):
+            temp_seasons[region] = decode_seasons(loads(body))
+
+        if body := cache.peek("GET", f"{api}/clans/glossary/", PARAMS):
+            temp_buildings[region] = decode_buildings(loads(body)["data"])
+
+    seasons = {**temp_seasons, **seasons}
+    buildings = {**temp_buildings, **buildings}
@@ -9,6 +9,7 @@ from discord import app_commands
 from discord.ext import commands, tasks
 
 from bot.track import Track
+from bot.utils import snapshots
 from bot.utils.logs import logger
 
 GUILD_IDS = [
@@ -20,6 +21,7 @@ GUILD_IDS = [
     789203100308602920,  # Bukis4Ever
     908749316989022260,  # Bukis4TheRoad
 ]
+SNAPSHOT_VERSION = 1
 
 
 _PASTAS_PATH = os.path.join(
@@ -32,7 +34,8 @@ with open(_PASTAS_PATH, "r") as fp:
 class BukiCog(commands.Cog):
     def __init__(self, bot: Track):
         self.bot: Track = bot
-        self.emojis: Optional[dict] = None
+        # emoji name -> message content, e.g. "<:bukitears:1234>"
+        self.emojis: Optional[dict] = snapshots.load("buki", SNAPSHOT_VERSION)
 
         self.load_emojis.start()
 
@@ -46,13 +49,14 @@ class BukiCog(commands.Cog):
                 guild = await self.bot.fetch_guild(guild_id)
                 emojis.update(
                     {
-                        emoji.name.lower(): emoji
+                        emoji.name.lower(): str(emoji)
                         for emoji in guild.emojis
                         if emoji.name.startswith("buki")
                     }
                 )
 
             self.emojis = emojis
+            snapshots.save("buki", SNAPSHOT_VERSION, emojis)
             logger.info("Buki Emojis Loaded")
         except (discord.Forbidden, discord.HTTPException):
             logger.warning("Failed to load Buki Emojis")
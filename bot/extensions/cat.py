@@ -8,6 +8,7 @@ from discord import app_commands
 import discord
 import tweepy
 
+from bot.utils import snapshots
 from bot.utils.logs import logger
 from config import cfg
 
@@ -26,6 +27,7 @@ GUILD_IDS = [
 CATS_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../assets/public/cats.json"
 )
+SNAPSHOT_VERSION = 1
 
 
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
@@ -79,12 +81,14 @@ class CatCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot: commands.Bot = bot
 
+        global images
+        if pairs := snapshots.load("cat", SNAPSHOT_VERSION):
+            images.update((tweet_id, media_url) for tweet_id, media_url in pairs)
+
         if not cfg.twitter.token:
             logger.warn("No twitter token found, loading backup data")
 
             with open(CATS_PATH) as fp:
-                global images
-
                 for tweet_id, media_url in json.load(fp):
                     images.add((int(tweet_id), media_url))
         else:
@@ -96,6 +100,7 @@ class CatCog(commands.Cog):
 
         logger.info("Loading Cats...")
         await self.bot.loop.run_in_executor(executor, scrape)
+        snapshots.save("cat", SNAPSHOT_VERSION, sorted(images))
         logger.info("Cats loaded")
 
     @app_commands.command(name="cat", description="cat", extras={"category": "fun"})
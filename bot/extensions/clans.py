@@ -1,5 +1,7 @@
 from typing import Dict, List, Optional
+import functools
 import html
+import time
 
 from discord.ext import commands, tasks
 from discord import app_commands, ui
@@ -10,7 +12,9 @@ import api
 from bot.extensions.stats import BattleTypeSelect
 from bot.track import Track
 from bot.utils import assets, db, wows
+from bot.utils.functions import data_age
 from bot.utils.logs import logger
+from bot.utils.prefetch import Prefetcher
 
 
 class ClanEmbedCommon(discord.Embed):
@@ -140,6 +144,59 @@ class ClanView(ui.View):
         self.selected_battle_type: str = api.DEFAULT_BATTLE_TYPE
         self.seasons_select: Optional[SeasonsSelect] = None
         self.selected_season: int = api.wg.seasons[clan.region].last_clan_season
+        self.prefetcher: Prefetcher = Prefetcher()
+        self.mode: str = "overview"
+        self.key = api.stale.clan_key(clan.region, clan.clan.id)
+
+    def prefetch(self):
+        region, clan_id = self.clan.region, self.clan.clan.id
+        jobs = []
+
+        for type_data in api.BATTLE_TYPES.values():
+            battle_type = type_data["sizes"][type_data["default"]]
+            if battle_type != api.DEFAULT_BATTLE_TYPE:
+                jobs.append(
+                    (
+                        self.members_data,
+                        battle_type,
+                        functools.partial(
+                            api.get_clan_members, region, clan_id, battle_type
+                        ),
+                    )
+                )
+
+        last_season = api.wg.seasons[region].last_clan_season
+        for season in (last_season, last_season - 1):
+            if season in api.wg.seasons[region].data:
+                jobs.append(
+                    (
+                        self.seasons_data,
+                        season,
+                        functools.partial(
+                            api.get_clan_members, region, clan_id, "cvc", season
+                        ),
+                    )
+                )
+
+        self.prefetcher.start(jobs)
+
+    def watch(self):
+        api.stale.clans.watch(self.key, self.refresh, self.clan.fetched_at)
+
+    async def refresh(self, clan: api.FullClan):
+        self.clan = clan
+
+        match self.mode:
+            case "overview":
+                embed = ClanEmbed(self.clan, self.members_data)
+            case "ratings":
+                embed = ClanRatingsEmbed(
+                    self.clan, self.global_position, self.local_position
+                )
+            case _:
+                return  # members are fetched separately
+
+        await self.message.edit(embed=embed, view=self)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.user_id:
@@ -163,6 +220,7 @@ class ClanView(ui.View):
             self.remove_item(self.seasons_select)
             self.seasons_select = None
 
+        self.mode = new_mode
         match new_mode:
             case "overview":
                 embed = ClanEmbed(self.clan, self.members_data)
@@ -187,6 +245,8 @@ class ClanView(ui.View):
 
     async def update_members_embed(self):
         if self.selected_battle_type == "cvc":
+            await self.prefetcher.wait(self.selected_season)
+
             if self.selected_season not in self.seasons_data:
                 if statistics := await api.get_clan_members(
                     self.clan.region, self.clan.clan.id, "cvc", self.selected_season
@@ -231,6 +291,8 @@ class ClanView(ui.View):
                 self.remove_item(self.seasons_select)
                 self.seasons_select = None
 
+            await self.prefetcher.wait(battle_type)
+
             if battle_type not in self.members_data:
                 if statistics := await api.get_clan_members(
                     self.clan.region,
@@ -255,6 +317,9 @@ class ClanView(ui.View):
         await self.update_members_embed()
 
     async def on_timeout(self):
+        api.stale.clans.unwatch(self.key, self.refresh)
+        self.prefetcher.cancel()
+
         for item in self.children:
             item.disabled = True
 
@@ -287,14 +352,15 @@ class ClanEmbed(ClanEmbedCommon):
             inline=True,
         )
 
-        all_modifiers = set()
+        glossary = api.wg.buildings[clan.region]
+        all_modifiers = []
         strings = []
         for building in clan.buildings.values():
-            all_modifiers.update(building.modifiers)
+            all_modifiers.extend(building.modifiers)
 
             building_id = building.modifiers[0]
-            building_type = api.wg.buildings[clan.region].type_of(building_id)
-            total = api.wg.buildings[clan.region].upgrades_count(building_type)
+            building_type = glossary.type_of(building_id)
+            total = glossary.upgrades_count(building_type)
             remaining = total - building.level
             name = building.name.replace(
                 "_", " "
@@ -307,10 +373,7 @@ class ClanEmbed(ClanEmbedCommon):
                     f"{self.PROGRESS_BACKGROUND * remaining}"
                 )
 
-        oil_remaining = 0
-        for building in api.wg.buildings[clan.region].buildings.values():
-            if building.building_id not in all_modifiers:
-                oil_remaining += building.cost
+        oil_remaining = glossary.remaining_cost(all_modifiers)
 
         self.add_field(
             name="Base",
@@ -326,6 +389,8 @@ class ClanEmbed(ClanEmbedCommon):
                 name="Description", value=self.truncate(description), inline=False
             )
 
+        self.set_footer(text=data_age(clan.fetched_at))
+
     def truncate(self, string: str):
         n = self.DESCRIPTION_MAX_LINES
         start = string.find("\n")
@@ -378,11 +443,8 @@ class ClanMembersEmbed(ClanEmbedCommon):
         start = page * self.PER_PAGE
         end = (page + 1) * self.PER_PAGE
         # end is not inclusive
-        data = [
-            [getattr(member, key) for key in self.KEYS]
-            for count, member in enumerate(members)
-            if start <= count < end
-        ]
+        page_members = members[start:end]
+        data = [[getattr(member, key) for key in self.KEYS] for member in page_members]
 
         return tabulate.tabulate(data, headers=self.HEADERS, floatfmt=self.FLOAT_FMT)
 
@@ -418,6 +480,7 @@ class ClanRatingsEmbed(ClanEmbedCommon):
         self.set_author(
             icon_url=assets.get("WG_LOGO"), name=f"[{clan.clan.tag}] {clan.clan.name}"
         )
+        self.set_footer(text=data_age(clan.fetched_at))
 
         current = []
 
@@ -455,25 +518,84 @@ class ClanRatingsEmbed(ClanEmbedCommon):
 
 
 class ClansCog(commands.Cog):
+    # Hurricane has a single division
+    LADDER_PAGES = [(0, 1)] + [
+        (league, division) for league in range(1, 5) for division in range(1, 4)
+    ]
+
     def __init__(self, bot: Track):
         self.bot: Track = bot
 
         self.load_seasons.start()
+        self.refresh_index.start()
+        self.refresh_ladder.start()
+
+    async def cog_unload(self) -> None:
+        self.load_seasons.cancel()
+        self.refresh_index.cancel()
+        self.refresh_ladder.cancel()
 
     @tasks.loop(hours=1)
     async def load_seasons(self):
         logger.info("Loading Buildings...")
 
         try:
-            await api.wg.get_buildings()
-            logger.info("Buildings Loaded")
+            start = time.perf_counter()
+            changed = await api.wg.get_buildings()
+            elapsed = time.perf_counter() - start
+            logger.info(f"Buildings Loaded ({changed} regions changed, {elapsed:.2f}s)")
+            self.load_seasons.change_interval(hours=1)
         except Exception as e:
             logger.warning("Failed to load Buildings", exc_info=e)
 
+            # nothing cached to fall back on, retry sooner
             if not api.wg.buildings:
-                import sys
+                self.load_seasons.change_interval(minutes=5)
+
+    @tasks.loop(hours=6)
+    async def refresh_index(self):
+        if not api.wg.seasons:
+            return
+
+        logger.info("Refreshing Clan Index...")
+        count = 0
+
+        for region in api.wg.seasons:
+            for league, division in self.LADDER_PAGES:
+                try:
+                    if clans := await api.get_ladder_clans(region, league, division):
+                        count += len(clans)
+                except Exception as e:
+                    logger.warning(
+                        f'Failed to refresh clan index (region "{region}")', exc_info=e
+                    )
+                    break
+
+        logger.info(f"Clan Index Refreshed ({count} clans seen)")
 
-                sys.exit(1)
+    @refresh_index.before_loop
+    async def before_refresh_index(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=5)
+    async def refresh_ladder(self):
+        if not api.wg.seasons:
+            return
+
+        api.ladder.cache.prune(
+            {region: data.last_clan_season for region, data in api.wg.seasons.items()}
+        )
+
+        try:
+            # keep segments of clans looked up in the last hour warm
+            if count := await api.refresh_ladder(active=3600):
+                logger.info(f"Ladder Cache Refreshed ({count} segments)")
+        except Exception as e:
+            logger.warning("Failed to refresh ladder cache", exc_info=e)
+
+    @refresh_ladder.before_loop
+    async def before_refresh_ladder(self):
+        await self.bot.wait_until_ready()
 
     @staticmethod
     async def send_clan(interaction: discord.Interaction, clan: api.FullClan):
@@ -500,6 +622,8 @@ class ClansCog(commands.Cog):
         view.message = await interaction.followup.send(
             embed=ClanEmbed(clan, members_data), view=view
         )
+        view.prefetch()
+        view.watch()
 
     # noinspection PyUnusedLocal
     @app_commands.command(
@@ -532,13 +656,17 @@ class ClansCog(commands.Cog):
             )
             return
 
-        player = await api.get_player(user.wg_region, user.wg_id, user.wg_ac)
+        player = await api.get_player(
+            user.wg_region, user.wg_id, user.wg_ac, allow_stale=True
+        )
 
         if not player.clan_role:
             await interaction.followup.send("You aren't in a clan.")
             return
 
-        clan = await api.get_clan(player.region, player.clan_role.clan_id)
+        clan = await api.get_clan(
+            player.region, player.clan_role.clan_id, allow_stale=True
+        )
         await self.send_clan(interaction, clan)
 
 
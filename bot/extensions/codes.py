@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set
 
 import collections
 import csv
@@ -9,16 +9,20 @@ import os
 import re
 import time
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands, ui
 import discord
 
+from bot.utils import journal
+
 
 DATA_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../assets/private/cc_data.json"
-)
+)  # replaced by the codes journal, only read once to import data
 CODES_PATTERN = re.compile("(CC[A-Z0-9]{5,6}-[A-Z0-9]{5,6}-[A-Z0-9]{5,6})")
 GUILD_ID = 395502204695609345
+COMPACT_MINUTES = 10
+COMPACT_MIN_ENTRIES = 100
 
 
 class CodesModal(ui.Modal):
@@ -170,20 +174,94 @@ class CodesCog(commands.GroupCog, name="codes"):
         self.pools_updated: Optional[float] = None
         self.contributors_updated: Optional[float] = None
         self.definitions: List[List[int]] = CodesCog.DEFAULT_DEFINITIONS
+        self.journal = journal.Journal("codes")
+
+        # every change is journaled as the codes or settings it touches, and
+        # the journal is periodically compacted to a snapshot of the state
+        if os.path.exists(self.journal.path):
+            for entry in self.journal.replay():
+                self.apply(entry)
+        else:
+            self.import_legacy()
 
+    async def cog_load(self) -> None:
+        self.compact_journal.start()
+
+    async def cog_unload(self) -> None:
+        self.compact_journal.cancel()
+        self.journal.compact(self.snapshot())
+        self.journal.close()
+
+    def import_legacy(self):
         try:
             with open(DATA_PATH) as fp:
                 data = json.load(fp)
+        except FileNotFoundError:
+            return
 
-                for t, codes in data["pools"].items():
-                    self.pools[t].update(codes)
+        for t, codes in data["pools"].items():
+            self.pools[t].update(codes)
 
-                self.contributors.update(data["contributors"])
-                self.pools_updated = data["pools_updated"]
-                self.contributors_updated = data["contributors_updated"]
-                self.definitions = data["definitions"]
-        except FileNotFoundError:
-            pass
+        self.contributors = {
+            int(user_id): tuple(tiers)
+            for user_id, tiers in data["contributors"].items()
+        }
+        self.pools_updated = data["pools_updated"]
+        self.contributors_updated = data["contributors_updated"]
+        self.definitions = data["definitions"]
+
+        self.journal.compact(self.snapshot())
+
+    def apply(self, entry: List):
+        kind, *args = entry
+
+        if kind == "add":
+            category, codes, self.pools_updated = args
+            self.pools[category].update(codes)
+        elif kind == "remove":
+            category, codes, self.pools_updated = args
+            self.pools[category].difference_update(codes)
+        elif kind == "clear":
+            (category,) = args
+            self.pools[category].clear()
+        elif kind == "contributors":
+            contributors, self.contributors_updated = args
+            self.contributors = {
+                user_id: (tier, multi_tier)
+                for user_id, tier, multi_tier in contributors
+            }
+        elif kind == "definitions":
+            (self.definitions,) = args
+
+    def snapshot(self) -> Iterator[List]:
+        yield ["definitions", self.definitions]
+        yield [
+            "contributors",
+            [[user_id, *tiers] for user_id, tiers in self.contributors.items()],
+            self.contributors_updated,
+        ]
+        for t, pool in self.pools.items():
+            yield ["add", t, sorted(pool), self.pools_updated]
+
+    def write(self, entry: List):
+        self.apply(entry)
+        self.journal.append(entry)
+
+    def remove_sent(self, codes: Dict[str, List[str]]):
+        updated = time.time()
+        entries = [
+            ["remove", t, sorted(sent), updated] for t, sent in codes.items() if sent
+        ]
+
+        for entry in entries:
+            self.apply(entry)
+        self.journal.extend(entries)
+
+    @tasks.loop(minutes=COMPACT_MINUTES)
+    async def compact_journal(self):
+        # a snapshot is a few entries, compact once changes pile up
+        if self.journal.entries > COMPACT_MIN_ENTRIES:
+            self.journal.compact(self.snapshot())
 
     # noinspection SpellCheckingInspection
     async def interaction_check(self, interaction: discord.Interaction):
@@ -225,23 +303,14 @@ class CodesCog(commands.GroupCog, name="codes"):
             "definitions": self.definitions,
         }
 
-    def save(self):
-        with open(DATA_PATH, "w") as fp:
-            json.dump(
-                self.data,
-                fp,
-                cls=SetEncoder,
-            )
-
     async def process_codes(
         self, interaction: discord.Interaction, category: str, string: str
     ):
         matches = re.findall(CODES_PATTERN, string)
 
         before = len(self.pools[category])
-        self.pools[category].update(matches)
-        self.pools_updated = time.time()
-        self.save()
+        added = set(matches).difference(self.pools[category])
+        self.write(["add", category, sorted(added), time.time()])
         after = len(self.pools[category])
 
         await interaction.response.send_message(
@@ -255,9 +324,13 @@ class CodesCog(commands.GroupCog, name="codes"):
         contributors: Dict[int, List[int, int]],
     ):
         before = len(self.contributors)
-        self.contributors = contributors
-        self.contributors_updated = time.time()
-        self.save()
+        self.write(
+            [
+                "contributors",
+                [[user_id, *tiers] for user_id, tiers in contributors.items()],
+                time.time(),
+            ]
+        )
         after = len(self.contributors)
 
         await interaction.response.send_message(
@@ -283,8 +356,7 @@ class CodesCog(commands.GroupCog, name="codes"):
             except ValueError as e:
                 await interaction.response.send_message(str(e))
 
-        self.definitions = definitions
-        self.save()
+        self.write(["definitions", definitions])
 
         await interaction.response.send_message(f"Definitions updated.")
 
@@ -325,18 +397,12 @@ class CodesCog(commands.GroupCog, name="codes"):
                         with io.BytesIO(bytes(message, encoding="utf-8")) as fp:
                             file = discord.File(fp, filename="codes.txt")
                             await user.send(file=file)
-            except (discord.HTTPException, discord.Forbidden):
-                failed.append(user_id)
-
-        for t in CodesCog.CODE_TYPES:
-            pools[t] = pools[t][prefix[t] :]
 
-            for user_id in failed:
-                pools[t].extend(assigned_codes[user_id][t])
-
-        self.pools = {t: set(pool) for t, pool in pools.items()}
-        self.pools_updated = time.time()
-        self.save()
+                    # written as soon as they are sent, so a crash partway
+                    # through never hands them out again
+                    self.remove_sent(codes)
+            except (discord.HTTPException, discord.Forbidden):
+                failed.append(user_id)  # their codes stay pooled
 
         results = {"assigned_codes": assigned_codes, "failed": failed}
 
@@ -385,8 +451,7 @@ class CodesCog(commands.GroupCog, name="codes"):
     @app_commands.command(description="Clear all codes from a pool.")
     @app_commands.choices(category=CODE_TYPES_CHOICES)
     async def clear(self, interaction: discord.Interaction, category: str) -> None:
-        self.pools[category].clear()
-        self.save()
+        self.write(["clear", category])
         await interaction.response.send_message(f'Pool "{category}" cleared.')
 
     @app_commands.command(description="Add codes to a pool with a paste.")
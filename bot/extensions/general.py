@@ -56,16 +56,16 @@ class GeneralCog(commands.Cog):
         if not user:
             user = interaction.user
 
-        result = await db.User.get(id=user.id)
+        user_profile = await db.User.get(id=user.id)
 
-        if not result:
+        if not user_profile:
             await interaction.response.send_message(
                 "No profile found for this user.", ephemeral=True
             )
             return
 
         await interaction.response.send_message(
-            embed=UserDataEmbed(result[0][0]), ephemeral=True
+            embed=UserDataEmbed(user_profile), ephemeral=True
         )
 
     @app_commands.command(
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 import asyncio
 import io
 import os
@@ -8,13 +8,16 @@ import random
 import toml
 from unidecode import unidecode
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands, ui
 import discord
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
 
 from bot.track import Track
-from bot.utils import assets, db, errors, wows
+from bot.utils import assets, db, errors, journal, leaderboard, wows
+from bot.utils.logs import logger
 
 
 CONFIG_PATH = os.path.join(
@@ -23,6 +26,8 @@ CONFIG_PATH = os.path.join(
 SILHOUETTES_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../assets/public/ships_silhouettes"
 )
+LEADERBOARD_SIZE = 10
+FLUSH_SECONDS = 10
 
 
 class InspectEmbed(discord.Embed):
@@ -86,6 +91,40 @@ class InspectView(ui.View):
         # self.add_item(ui.Button(label="WoWSFT", url=self.WOWSFT_URL.format(ship.index)))
 
 
+class LeaderboardEmbed(discord.Embed):
+    TITLES = {
+        leaderboard.RECORD: "Fastest Guesses",
+        leaderboard.COUNT: "Most Guesses",
+    }
+
+    def __init__(
+        self,
+        board: str,
+        scope_name: str,
+        entries: List[Tuple[int, float]],
+        own: Optional[Tuple[int, float]],
+    ):
+        super().__init__(title=f"{self.TITLES[board]} ({scope_name})")
+
+        lines = [
+            f"`{position:>2}.` <@{user_id}> `{self.format_score(board, score)}`"
+            for position, (user_id, score) in enumerate(entries, start=1)
+        ]
+        self.description = "\n".join(lines) if lines else "No guesses yet."
+
+        if own is not None:
+            position, score = own
+            self.set_footer(
+                text=f"Your rank: #{position} ({self.format_score(board, score)})"
+            )
+        else:
+            self.set_footer(text="You are not ranked yet.")
+
+    @staticmethod
+    def format_score(board: str, score: float) -> str:
+        return f"{score:.3f}s" if board == leaderboard.RECORD else f"{score:.0f}"
+
+
 class GuessEmbed(discord.Embed):
     def __init__(
         self,
@@ -227,34 +266,198 @@ class GuessGame:
 
             time = (discord.utils.snowflake_time(message.id) - start).total_seconds()
 
-            # cheap trick to ensure user exists
-            await db.User.get_or_create(id=message.author.id)
-
             result_msg = f"Well done! Time taken: `{time:.3f}s`.\n"
-            async with db.async_session() as session:
-                user = (
-                    await session.execute(
-                        select(db.User).filter_by(id=message.author.id)
+            if await self.cog.results.record(message.author.id, time):
+                result_msg += "A new record!"
+
+            await leaderboard.add(self.interaction.guild_id, message.author.id, time)
+
+            await message.channel.send(result_msg, reference=message)
+
+
+class GuessResults:
+    """
+    Accumulates guess results in memory and writes them to the users table in
+    periodic batches, one upsert per user however many guesses they made.
+
+    Every result is journaled before it is acknowledged. The position of the
+    last result written is committed with the batch, so results journaled
+    before a crash are replayed on load, and never applied twice. Journals
+    and checkpoints are kept per process, see bot.utils.journal.
+    """
+
+    JOURNAL = "guess"
+
+    def __init__(self):
+        self.journal: journal.Journal = journal.Journal(self.JOURNAL)
+        self.pending: Dict[int, List] = {}  # user ID -> [count, best time]
+        self.position: int = 0  # of the last journaled result
+        # results being written, up to a position, kept until known committed
+        self.batch: Optional[Tuple[int, Dict[int, List]]] = None
+        # guards the results and journal, never held while writing to the database
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.flush_lock: asyncio.Lock = asyncio.Lock()
+
+    def _add(self, user_id: int, time: float) -> None:
+        entry = self.pending.setdefault(user_id, [0, None])
+        entry[0] += 1
+        if entry[1] is None or time < entry[1]:
+            entry[1] = time
+
+    async def load(self) -> None:
+        async with db.async_session() as session:
+            statement = select(db.Checkpoint.position).where(
+                db.Checkpoint.name == self.journal.name
+            )
+            applied = (await session.execute(statement)).scalar() or 0
+
+        self.position = applied
+        for position, user_id, time in self.journal.replay():
+            if position > applied:
+                self._add(user_id, time)
+            self.position = max(self.position, position)
+
+        if self.pending:
+            logger.info(f"Replayed guess results of {len(self.pending)} users")
+
+    async def record(self, user_id: int, time: float) -> bool:
+        """
+        Records a correct guess, returning whether it is the user's new record.
+        """
+
+        async with self.lock:
+            user = await db.User.get(id=user_id)
+            best = user.guess_record if user is not None else None
+
+            unwritten = [self.pending]
+            if self.batch is not None:
+                unwritten.append(self.batch[1])
+
+            for results in unwritten:
+                if (entry := results.get(user_id, None)) is not None:
+                    if best is None or entry[1] < best:
+                        best = entry[1]
+
+            self.position += 1
+            self.journal.append([self.position, user_id, time])
+            self._add(user_id, time)
+
+        return best is None or time < best
+
+    async def flush(self) -> int:
+        """
+        Writes pending results, returning the number of users updated.
+        """
+
+        async with self.flush_lock:
+            async with self.lock:
+                # a batch whose flush failed or was cancelled is retried as is
+                if self.batch is None:
+                    if not self.pending:
+                        return 0
+
+                    self.batch = self.position, self.pending
+                    self.pending = {}
+
+                position, batch = self.batch
+
+            table = db.User.__table__
+            rows = [
+                {
+                    **db.User.defaults(),
+                    "id": user_id,
+                    "guess_count": count,
+                    "guess_record": best,
+                }
+                for user_id, (count, best) in batch.items()
+            ]
+
+            async def write(conn: AsyncConnection):
+                # an interrupted flush may have been committed regardless
+                statement = select(db.Checkpoint.position).where(
+                    db.Checkpoint.name == self.journal.name
+                )
+                if ((await conn.execute(statement)).scalar() or 0) >= position:
+                    return
+
+                statement = insert(table)
+                await conn.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[table.c.id],
+                        set_={
+                            "guess_count": table.c.guess_count
+                            + statement.excluded.guess_count,
+                            "guess_record": func.min(
+                                func.coalesce(
+                                    table.c.guess_record,
+                                    statement.excluded.guess_record,
+                                ),
+                                statement.excluded.guess_record,
+                            ),
+                        },
+                    ),
+                    rows,
+                )
+
+                checkpoint = insert(db.Checkpoint.__table__).values(
+                    name=self.journal.name, position=position
+                )
+                await conn.execute(
+                    checkpoint.on_conflict_do_update(
+                        index_elements=["name"], set_={"position": position}
                     )
-                ).scalar_one()
+                )
 
-                if user.guess_record is None or time < user.guess_record:
-                    result_msg += "A new record!"
-                    user.guess_record = time
+            await db.writer.submit(write)
+            # records compare with the batch until the cached users are dropped
+            await db.User.evict(list(batch))
 
-                user.guess_count += 1
-                await session.commit()
-            db.User.invalidate(id=message.author.id)
+            async with self.lock:
+                self.batch = None
+                if not self.pending:
+                    # results recorded since a failed flush are only journaled,
+                    # and the lock keeps appends out of the replaced file
+                    await asyncio.to_thread(self.journal.compact, ())
 
-            await message.channel.send(result_msg, reference=message)
+            return len(batch)
 
 
 class GuessCog(commands.Cog):
     def __init__(self, bot: Track):
         self.bot: Track = bot
+        self.results: GuessResults = GuessResults()
         with open(CONFIG_PATH) as fp:
             self.config = toml.load(fp)
 
+    async def cog_load(self) -> None:
+        await self.results.load()
+        self.flush_results.start()
+
+        try:
+            if count := await leaderboard.rebuild():
+                logger.info(f"Rebuilt guess leaderboards with {count} users")
+        except Exception as e:
+            logger.warning("Failed to rebuild guess leaderboards", exc_info=e)
+
+    async def cog_unload(self) -> None:
+        # let a flush in progress finish, then cut the sleep until the next
+        self.flush_results.stop()
+        async with self.results.flush_lock:
+            self.flush_results.cancel()
+
+        try:
+            await self.results.flush()
+        except Exception as e:
+            logger.warning("Failed to flush guess results, kept in journal", exc_info=e)
+        self.results.journal.close()
+
+    @tasks.loop(seconds=FLUSH_SECONDS)
+    async def flush_results(self):
+        try:
+            await self.results.flush()
+        except Exception as e:
+            logger.warning("Failed to flush guess results, retrying", exc_info=e)
+
     def is_allowed(self, ship: wows.Ship) -> bool:
         return (
             ship.group in self.config["groups"]
@@ -382,6 +585,37 @@ class GuessCog(commands.Cog):
             game.run(), name=f"guess_{interaction.channel_id}"
         )
 
+    @app_commands.command(
+        name="leaderboard",
+        description="Shows the fastest and most active guess players.",
+        extras={"category": "wows"},
+    )
+    @app_commands.describe(
+        board="Whether to rank by fastest guess or by number of guesses.",
+        scope="Whether to rank players of this server or of every server.",
+    )
+    async def leaderboard(
+        self,
+        interaction: discord.Interaction,
+        board: Literal["record", "count"] = "record",
+        scope: Literal["server", "global"] = "server",
+    ):
+        if scope == "server" and interaction.guild_id is not None:
+            key, scope_name = interaction.guild_id, interaction.guild.name
+        else:
+            key, scope_name = leaderboard.GLOBAL, "Global"
+
+        try:
+            entries = await leaderboard.top(board, key, LEADERBOARD_SIZE)
+            own = await leaderboard.rank(board, key, interaction.user.id)
+        except Exception as e:
+            logger.warning("Failed to read guess leaderboards", exc_info=e)
+            raise errors.CustomError("Leaderboards are unavailable right now.")
+
+        await interaction.response.send_message(
+            embed=LeaderboardEmbed(board, scope_name, entries, own)
+        )
+
     @app_commands.command(
         name="inspect", description="View ship details.", extras={"category": "wows"}
     )
@@ -0,0 +1,179 @@
+from typing import Dict, Tuple
+import asyncio
+import time
+
+from discord.ext import commands, tasks
+from discord import app_commands
+import discord
+from sqlalchemy import select
+
+import api
+from bot.extensions.stats import BATTLE_TYPES
+from bot.track import Track
+from bot.utils import assets, db, history, ratings
+from bot.utils.logs import logger
+from config import cfg
+
+
+PERIODS = {
+    "day": ("Last 24 Hours", 24 * 60 * 60),
+    "week": ("Last 7 Days", 7 * 24 * 60 * 60),
+}
+REQUESTS_PER_PLAYER = 2  # profile and clan role
+COLLECT_MINUTES = 10
+
+
+class HistoryEmbed(discord.Embed):
+    def __init__(
+        self,
+        label: str,
+        start: int,
+        end: int,
+        change: Dict[str, Dict[str, int]],
+    ):
+        super().__init__(
+            title=label,
+            description=f"From <t:{start}:f> to <t:{end}:f>",
+        )
+        self.set_author(name="History", icon_url=assets.get("WG_LOGO"))
+
+        for battle_type, block in change.items():
+            if not (battles := block["battles_count"]):
+                continue
+
+            name, _, _ = BATTLE_TYPES[battle_type]
+            rating = ratings.block_rating(block)
+            self.add_field(
+                name=name,
+                value=(
+                    f"Battles: `{battles}`\n"
+                    f"Wins: `{block['wins'] / battles * 100:.2f}%`\n"
+                    f"Survival: `{block['survived'] / battles * 100:.2f}%`\n"
+                    f"Damage: `{block['damage_dealt'] / battles:.0f}`\n"
+                    f"Kills: `{block['frags'] / battles:.2f}`\n"
+                    f"Rating: `{rating:.0f}`"
+                ),
+                inline=True,
+            )
+
+        if not self.fields:
+            self.description += "\nNo battles played in this period."
+
+
+class HistoryCog(commands.Cog):
+    def __init__(self, bot: Track):
+        self.bot: Track = bot
+
+        # (region, player_id) -> last collection time
+        self.collected: Dict[Tuple[str, int], float] = {}
+        self.collect.start()
+
+    async def cog_unload(self) -> None:
+        self.collect.cancel()
+
+    async def record(self, player: api.FullPlayer) -> None:
+        """
+        Stores a snapshot of a player fetched elsewhere, at no request cost.
+        """
+
+        key = (player.region, player.id)
+        if player.fetched_at <= self.collected.get(key, 0):
+            return  # served from cache, already recorded
+
+        self.collected[key] = player.fetched_at
+        await asyncio.to_thread(
+            history.append,
+            player.region,
+            player.id,
+            player.statistics,
+            player.fetched_at,
+        )
+
+    @tasks.loop(minutes=COLLECT_MINUTES)
+    async def collect(self):
+        budget = cfg.history.budget * COLLECT_MINUTES // 60 // REQUESTS_PER_PLAYER
+        now = time.time()
+
+        async with db.async_session() as session:
+            statement = select(db.User.wg_region, db.User.wg_id, db.User.wg_ac).where(
+                db.User.wg_id.is_not(None)
+            )
+            linked = (await session.execute(statement)).all()
+
+        due = sorted(
+            (
+                (self.collected.get((region, player_id), 0), region, player_id, ac)
+                for region, player_id, ac in linked
+            ),
+        )
+        due = [entry for entry in due if now - entry[0] >= cfg.history.interval]
+
+        count = 0
+        for _, region, player_id, access_code in due[:budget]:
+            self.collected[(region, player_id)] = now
+
+            try:
+                player = await api.get_player(region, player_id, access_code)
+            except Exception as e:
+                logger.warning(
+                    f'Failed to collect history (region "{region}", id "{player_id}")',
+                    exc_info=e,
+                )
+                continue
+
+            if isinstance(player, api.FullPlayer):
+                count += await asyncio.to_thread(
+                    history.append, region, player_id, player.statistics
+                )
+
+        if due:
+            logger.info(
+                f"History Collected ({count} changed, "
+                f"{max(len(due) - budget, 0)} deferred)"
+            )
+
+    @collect.before_loop
+    async def before_collect(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(
+        name="history",
+        description="Shows your statistics over a recent period.",
+        extras={"category": "wows"},
+    )
+    @app_commands.describe(period="The period to show statistics for.")
+    @app_commands.choices(
+        period=[
+            app_commands.Choice(name=label, value=period)
+            for period, (label, _) in PERIODS.items()
+        ]
+    )
+    async def history(self, interaction: discord.Interaction, period: str = "day"):
+        user = await db.User.get_or_create(id=interaction.user.id)
+
+        if not user.wg_id:
+            await interaction.response.send_message(
+                "You must be linked to use this command! See `/link`."
+            )
+            return
+
+        label, seconds = PERIODS[period]
+        result = await asyncio.to_thread(
+            history.delta, user.wg_region, user.wg_id, time.time() - seconds
+        )
+
+        if result is None or result[0] == result[1]:
+            await interaction.response.send_message(
+                "Not enough history yet, check back later! "
+                "Snapshots are taken a few times a day."
+            )
+            return
+
+        start, end, change = result
+        await interaction.response.send_message(
+            embed=HistoryEmbed(label, start, end, change)
+        )
+
+
+async def setup(bot: Track):
+    await bot.add_cog(HistoryCog(bot))
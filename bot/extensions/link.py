@@ -5,7 +5,6 @@ import re
 from discord.ext import commands
 from discord import app_commands, ui
 import discord
-from sqlalchemy import select
 
 import api
 from bot.track import Track
@@ -80,18 +79,12 @@ class LinkModal(ui.Modal):
                         )
                         return
 
-                    async with db.async_session() as session:
-                        user = (
-                            await session.execute(
-                                select(db.User).filter_by(id=interaction.user.id)
-                            )
-                        ).scalar_one()
-
-                        user.wg_region = region
-                        user.wg_id = player_id
-                        user.wg_ac = access_code
-                        await session.commit()
-                    db.User.invalidate(id=interaction.user.id)
+                    await db.User.update(
+                        interaction.user.id,
+                        wg_region=region,
+                        wg_id=player_id,
+                        wg_ac=access_code,
+                    )
 
                     await interaction.followup.send(
                         "Link successful!\n"
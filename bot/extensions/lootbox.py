@@ -11,10 +11,10 @@ import bs4
 from discord.ext import commands, tasks
 from discord import app_commands
 import discord
-import requests
 
+import api
 from bot.track import Track
-from bot.utils import errors
+from bot.utils import errors, snapshots
 from bot.utils.logs import logger
 
 
@@ -65,45 +65,65 @@ query {
 """
 
 
+SNAPSHOT_VERSION = 1
+
+
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 box_names, obj_data = {}, {}
 
 
+def load_snapshot():
+    global box_names, obj_data
+
+    if data := snapshots.load("lootbox", SNAPSHOT_VERSION):
+        box_names, obj_data = data["box_names"], data["obj_data"]
+
+
+def save_snapshot():
+    snapshots.save(
+        "lootbox", SNAPSHOT_VERSION, {"box_names": box_names, "obj_data": obj_data}
+    )
+
+
 def scrape():
     global box_names, obj_data
     try:
-        response = requests.get(
+        response = api.http_cache.cache.request(
+            "GET",
             "https://worldofwarships.com/en/content/contents-and-drop-rates-of-containers/",
             headers={"x-requested-with": "XMLHttpRequest"},
         )
 
-        if response.status_code != 200:
-            logger.error(f"Error code {response.status_code} while fetching boxes")
+        if response.status != 200:
+            logger.error(f"Error code {response.status} while fetching boxes")
             return
 
-        soup = bs4.BeautifulSoup(response.text, "html.parser")
-        box_names = {
-            tag["box-id"]: {
-                "name": tag["preview-title"],
-                "clean": LootboxTransformer.clean(tag["preview-title"]),
+        if response.modified or not box_names:
+            soup = bs4.BeautifulSoup(response.text, "html.parser")
+            box_names = {
+                tag["box-id"]: {
+                    "name": tag["preview-title"],
+                    "clean": LootboxTransformer.clean(tag["preview-title"]),
+                }
+                for tag in soup.find_all(lambda t: t.has_attr("box-id"))
             }
-            for tag in soup.find_all(lambda t: t.has_attr("box-id"))
-        }
 
-        response = requests.post(
+        response = api.http_cache.cache.request(
+            "POST",
             "https://vortex.worldofwarships.com/api/graphql/glossary/",
             json=[{"query": QUERY, "variables": {"languageCode": "en"}}],
         )
 
-        if response.status_code != 200:
-            logger.error(
-                f"Error code {response.status_code} while fetching box rewards"
-            )
+        if response.status != 200:
+            logger.error(f"Error code {response.status} while fetching box rewards")
             return
 
+        if not response.modified and obj_data:
+            return True
+
         temp = {}
 
-        for category, objects in response.json()[0]["data"].items():
+        for category, objects in api.decoders.loads(response.body)[0]["data"].items():
             for obj in objects:
                 obj["category"] = category
 
@@ -221,6 +241,8 @@ class LootboxCog(commands.Cog):
 
         self.box_names = {}
         self.data = {}
+
+        load_snapshot()
         self.task_scrape.start()
 
     @tasks.loop(hours=1)
@@ -231,6 +253,7 @@ class LootboxCog(commands.Cog):
         if not result:
             logger.warning("Failed to load Lootboxes")
         else:
+            save_snapshot()
             logger.info("Lootboxes loaded")
 
     @app_commands.command(
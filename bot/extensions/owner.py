@@ -2,8 +2,10 @@ from typing import Literal, Optional
 
 from discord.ext import commands
 import discord
+import tabulate
 
 from bot.track import Track
+from bot.utils import cache
 
 
 class OwnerCog(commands.Cog):
@@ -16,6 +18,27 @@ class OwnerCog(commands.Cog):
         self.bot.stopping = True
         await ctx.send("Done. Don't forget to `)jsk shutdown`.")
 
+    @commands.command(name="cache")
+    @commands.is_owner()
+    async def cache_metrics(self, ctx: commands.Context):
+        data = [
+            [namespace, tier, *values]
+            for namespace, namespace_cache in cache.caches.items()
+            for tier, values in namespace_cache.metrics().items()
+        ]
+        headers = [
+            "Namespace",
+            "Tier",
+            "Entries",
+            "Bytes",
+            "Hits",
+            "Misses",
+            "Rate",
+            "Errors",
+        ]
+        table = tabulate.tabulate(data, headers=headers, floatfmt=".2f")
+        await ctx.send(f"```{table}```")
+
     @commands.command()
     @commands.guild_only()
     @commands.is_owner()
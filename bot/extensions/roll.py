@@ -1,45 +1,95 @@
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 
 import asyncio
+import collections
 import json
 import os
 import secrets
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands, ui
 import discord
 
+from bot.utils import journal
+
 
 DATA_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../assets/private/roll_data.json"
-)
+)  # replaced by the roll journal, only read once to import sessions
+COMPACT_MINUTES = 10
+COMPACT_FACTOR = 2
+COMPACT_MIN_ENTRIES = 1000
 
 
 @app_commands.guild_only()
 class RollCog(commands.GroupCog, name="roll"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.data = {}
-        self.lock = asyncio.Lock()
-
-        # HACK: maybe don't use JSON
-        def int_keys(x):
-            if isinstance(x, dict):
-                d = {}
-                for k, v in x.items():
-                    try:
-                        d[int(k)] = v
-                    except ValueError:
-                        d[k] = v
-
-                return d
-            return x
-
+        self.data: Dict[int, Dict] = {}  # channel ID -> session
+        self.locks: Dict[int, asyncio.Lock] = collections.defaultdict(asyncio.Lock)
+        self.journal = journal.Journal("roll")
+
+        # sessions are journaled as a start entry followed by one entry per
+        # roll, and dropped by a close entry
+        if os.path.exists(self.journal.path):
+            for entry in self.journal.replay():
+                self.apply(entry)
+        else:
+            self.import_legacy()
+
+    async def cog_load(self) -> None:
+        self.compact_journal.start()
+
+    async def cog_unload(self) -> None:
+        self.compact_journal.cancel()
+        self.journal.compact(self.snapshot())
+        self.journal.close()
+
+    def import_legacy(self):
         try:
             with open(DATA_PATH) as fp:
-                self.data = json.load(fp, object_hook=int_keys)
+                data = json.load(fp)
         except FileNotFoundError:
-            pass
+            return
+
+        for channel_id, session in data.items():
+            self.data[int(channel_id)] = {
+                "max": session["max"],
+                "roles": session["roles"],
+                "rolls": {int(k): v for k, v in session["rolls"].items()},
+            }
+
+        self.journal.compact(self.snapshot())
+
+    def apply(self, entry: List):
+        kind, channel_id, *args = entry
+
+        if kind == "start":
+            maximum, roles = args
+            self.data[channel_id] = {"max": maximum, "roles": roles, "rolls": {}}
+        elif kind == "roll":
+            user_id, roll = args
+            if (session := self.data.get(channel_id, None)) is not None:
+                session["rolls"][user_id] = roll
+        elif kind == "close":
+            self.data.pop(channel_id, None)
+
+    def snapshot(self) -> Iterator[List]:
+        for channel_id, session in self.data.items():
+            yield ["start", channel_id, session["max"], session["roles"]]
+            for user_id, roll in session["rolls"].items():
+                yield ["roll", channel_id, user_id, roll]
+
+    def write(self, entry: List):
+        self.apply(entry)
+        self.journal.append(entry)
+
+    @tasks.loop(minutes=COMPACT_MINUTES)
+    async def compact_journal(self):
+        # closed sessions only take space, compact once they dominate
+        live = sum(1 + len(session["rolls"]) for session in self.data.values())
+        if self.journal.entries > COMPACT_FACTOR * live + COMPACT_MIN_ENTRIES:
+            self.journal.compact(self.snapshot())
 
     @app_commands.command(description="Opens a group roll session.")
     @app_commands.describe(
@@ -69,7 +119,7 @@ class RollCog(commands.GroupCog, name="roll"):
             await interaction.followup.send(f"maximum ({maximum}) should be > 1.")
             return
 
-        async with self.lock:
+        async with self.locks[interaction.channel_id]:
             if interaction.channel_id in self.data:
                 await interaction.followup.send(
                     "There is already a session active in this channel.\n"
@@ -78,11 +128,7 @@ class RollCog(commands.GroupCog, name="roll"):
                 return
 
             require = list(set(r.id for r in [role1, role2, role3, role4, role5] if r is not None))
-            self.data[interaction.channel_id] = {
-                "max": maximum,
-                "roles": require,
-                "rolls": {},
-            }
+            self.write(["start", interaction.channel_id, maximum, require])
             embed = discord.Embed(
                 title="Group Roll Session",
                 description=f"Values: `0` to `{maximum}`\n"
@@ -93,19 +139,18 @@ class RollCog(commands.GroupCog, name="roll"):
             embed.set_footer(text="Type \"roll\" to roll")
             await interaction.followup.send(embed=embed)
 
-            self.save()
-
     @app_commands.command(description="Closes the group roll session in this channel.")
     @app_commands.checks.has_permissions(manage_guild=True, manage_messages=True)
     async def close(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        async with self.lock:
+        async with self.locks[interaction.channel_id]:
             if interaction.channel_id not in self.data:
                 await interaction.followup.send("No active session?")
                 return
 
-            rolls = self.data.pop(interaction.channel_id)["rolls"]
+            rolls = self.data[interaction.channel_id]["rolls"]
+            self.write(["close", interaction.channel_id])
 
             if not rolls:
                 await interaction.followup.send("Session cancelled.")
@@ -127,35 +172,34 @@ class RollCog(commands.GroupCog, name="roll"):
                 f"<@{winners[0]}> wins with a roll of `{high}`."
             )
 
-            self.save()
-
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot or message.content != "roll":
             return
 
-        async with self.lock:
-            if message.channel.id in self.data:
-                data = self.data[message.channel.id]
-                if message.author.id in data["rolls"]:
-                    return
+        if message.channel.id not in self.data:
+            return
 
-                if data["roles"]:
-                    for role_id in data["roles"]:
-                        if message.author.get_role(role_id):
-                            break
-                    else:
-                        return
+        # only rolls in the same channel wait for each other
+        async with self.locks[message.channel.id]:
+            if message.channel.id not in self.data:
+                return
 
-                roll = secrets.randbelow(data["max"] + 1)
-                await message.reply(f"You rolled a `{roll}`.")
-                data["rolls"][message.author.id] = roll
+            data = self.data[message.channel.id]
+            if message.author.id in data["rolls"]:
+                return
+
+            if data["roles"]:
+                for role_id in data["roles"]:
+                    if message.author.get_role(role_id):
+                        break
+                else:
+                    return
 
-                self.save()
+            roll = secrets.randbelow(data["max"] + 1)
+            self.write(["roll", message.channel.id, message.author.id, roll])
 
-    def save(self):
-        with open(DATA_PATH, "w") as fp:
-            json.dump(self.data, fp)
+        await message.reply(f"You rolled a `{roll}`.")
 
 
 async def setup(bot: commands.Bot):
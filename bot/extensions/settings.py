@@ -4,10 +4,9 @@ import json
 from discord.ext import commands
 from discord import app_commands
 import discord
-from sqlalchemy import select
 
 from bot.track import Track
-from bot.utils import db, wows
+from bot.utils import db, policy, wows
 
 
 CATEGORIES = [
@@ -21,11 +20,13 @@ COMMANDS = [
     "myclan",
     "dualrender",
     "guess",
+    "leaderboard",
     "inspect",
     "link",
     "render",
     "stats",
     "mystats",
+    "history",
     "update",
     "aah",
     "buki",
@@ -57,14 +58,7 @@ class SettingsCog(commands.Cog):
     async def set_user_language(
         self, interaction: discord.Interaction, wows_locale: str
     ):
-        async with db.async_session() as session:
-            user = (
-                await session.execute(select(db.User).filter_by(id=interaction.user.id))
-            ).scalar_one()
-
-            user.wows_locale = wows_locale
-            await session.commit()
-        db.User.invalidate(id=interaction.user.id)
+        await db.User.update(interaction.user.id, locale=wows_locale)
 
         await interaction.response.send_message(
             f"Language set to `{wows_locale}`.", ephemeral=True
@@ -82,16 +76,7 @@ class SettingsCog(commands.Cog):
     async def set_guild_region(
         self, interaction: discord.Interaction, region: wows.Regions
     ):
-        async with db.async_session() as session:
-            guild = (
-                await session.execute(
-                    select(db.Guild).filter_by(id=interaction.guild_id)
-                )
-            ).scalar_one()
-
-            guild.wg_region = region.value
-            await session.commit()
-        db.Guild.invalidate(id=interaction.guild_id)
+        await db.Guild.update(interaction.guild_id, wg_region=region.value)
 
         await interaction.response.send_message(
             f"Server default region set to `{region.value}`."
@@ -133,48 +118,39 @@ class SettingsCog(commands.Cog):
         target: Optional[str],
         channel: Optional[discord.TextChannel],
     ):
-        async with db.async_session() as session:
-            guild = (
-                await session.execute(
-                    select(db.Guild).filter_by(id=interaction.guild_id)
-                )
-            ).scalar_one()
-
-            data = json.loads(guild.disabled)
-
-            if not target:
-                if not data:
-                    await interaction.response.send_message(
-                        "Everything is enabled.", ephemeral=True
-                    )
-                else:
-                    await interaction.response.send_message(
-                        f"Disabled commands/categories:\n{self.format_structure(data)}",
-                        ephemeral=True,
-                    )
-                return
-
-            target_channel = 0 if not channel else channel.id
-            channel_message = (
-                "globally" if not target_channel else f"in {channel.mention}"
-            )
+        guild = await db.Guild.get_or_create(id=interaction.guild_id)
+        data = json.loads(guild.disabled)
 
-            if target not in data:
-                data[target] = [target_channel]
-                message = f"`{target}` disabled {channel_message}."
-            elif target_channel not in data[target]:
-                data[target].append(target_channel)
-                message = f"`{target}` disabled {channel_message}."
+        if not target:
+            if not data:
+                await interaction.response.send_message(
+                    "Everything is enabled.", ephemeral=True
+                )
             else:
-                data[target].remove(target_channel)
-                if not data[target]:
-                    del data[target]
-
-                message = f"`{target}` enabled {channel_message}."
-
-            guild.disabled = json.dumps(data)
-            await session.commit()
-        db.Guild.invalidate(id=interaction.guild_id)
+                await interaction.response.send_message(
+                    f"Disabled commands/categories:\n{self.format_structure(data)}",
+                    ephemeral=True,
+                )
+            return
+
+        target_channel = 0 if not channel else channel.id
+        channel_message = "globally" if not target_channel else f"in {channel.mention}"
+
+        if target not in data:
+            data[target] = [target_channel]
+            message = f"`{target}` disabled {channel_message}."
+        elif target_channel not in data[target]:
+            data[target].append(target_channel)
+            message = f"`{target}` disabled {channel_message}."
+        else:
+            data[target].remove(target_channel)
+            if not data[target]:
+                del data[target]
+
+            message = f"`{target}` enabled {channel_message}."
+
+        await db.Guild.update(interaction.guild_id, disabled=json.dumps(data))
+        policy.set_disabled(interaction.guild_id, data)
 
         await interaction.response.send_message(
             f"{message} New structure:\n{self.format_structure(data)}"
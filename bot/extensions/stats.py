@@ -1,16 +1,22 @@
 from __future__ import annotations
-from typing import List, Optional, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
+import dataclasses
 import datetime
+import functools
+import time
 
 
 from discord.ext import commands, tasks
 from discord import app_commands, ui
 import discord
+import tabulate
 
 import api
 from bot.track import Track
-from bot.utils import assets, db, wows
+from bot.utils import assets, db, ratings, wows
+from bot.utils.functions import data_age
 from bot.utils.logs import logger
+from bot.utils.prefetch import Prefetcher
 
 
 RESOURCES = {
@@ -25,6 +31,13 @@ BATTLE_TYPES = {
     for index in t_data["sizes"].values()
 }
 EPOCH = datetime.datetime.fromtimestamp(0)
+SPECIES = {
+    "AirCarrier": "Aircraft Carriers",
+    "Battleship": "Battleships",
+    "Cruiser": "Cruisers",
+    "Destroyer": "Destroyers",
+    "Submarine": "Submarines",
+}
 
 
 class BattleTypeSelect(ui.Select):
@@ -77,11 +90,54 @@ class PartialPlayerView(ui.View):
         super().__init__(**kwargs)
 
         self.user_id: int = user_id
-        self.player: api.PartialPlayer = player
+        # players are shared through api.stale, fetched battle types and
+        # prefetches go to a copy owned by this view
+        self.statistics: dict[str, api.ClanMemberStatistics] = dict(player.statistics)
+        self.player: api.PartialPlayer = dataclasses.replace(
+            player, statistics=self.statistics
+        )
+        self.battle_type: str = api.DEFAULT_BATTLE_TYPE
         self.message: Optional[discord.Message] = None
 
         self.select = BattleTypeSelect(default_only=True)
         self.add_item(self.select)
+        self.prefetcher: Prefetcher = Prefetcher()
+        self.key = api.stale.player_key(
+            player.region, player.id, player.used_access_code
+        )
+
+    def watch(self):
+        api.stale.players.watch(self.key, self.refresh, self.player.fetched_at)
+
+    async def refresh(self, player: api.Player):
+        if not isinstance(player, api.PartialPlayer):
+            return
+
+        # keep the battle types fetched so far, prefetches still write here
+        self.statistics.update(player.statistics)
+        self.player = dataclasses.replace(player, statistics=self.statistics)
+
+        await self.message.edit(
+            embed=PartialPlayerEmbed(self.player, self.battle_type), view=self
+        )
+
+    def prefetch(self):
+        self.prefetcher.start(
+            (
+                self.statistics,
+                option.value,
+                functools.partial(self.fetch, option.value),
+            )
+            for option in self.select.options
+        )
+
+    async def fetch(self, battle_type: str) -> Optional[api.ClanMemberStatistics]:
+        return await api.get_partial_statistics(
+            self.player.region,
+            self.player.id,
+            self.player.clan_role.clan_id,
+            battle_type,
+        )
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.user_id:
@@ -92,14 +148,11 @@ class PartialPlayerView(ui.View):
         return True
 
     async def update_battle_type(self, battle_type: str):
-        if battle_type not in self.player.statistics:
-            if statistics := await api.get_partial_statistics(
-                self.player.region,
-                self.player.id,
-                self.player.clan_role.clan_id,
-                battle_type,
-            ):
-                self.player.statistics[battle_type] = statistics
+        await self.prefetcher.wait(battle_type)
+
+        if battle_type not in self.statistics:
+            if statistics := await self.fetch(battle_type):
+                self.statistics[battle_type] = statistics
             else:
                 logger.error(
                     "Failed to update partial player "
@@ -109,11 +162,14 @@ class PartialPlayerView(ui.View):
                 )
                 return
 
+        self.battle_type = battle_type
         await self.message.edit(
             embed=PartialPlayerEmbed(self.player, battle_type), view=self
         )
 
     async def on_timeout(self):
+        api.stale.players.unwatch(self.key, self.refresh)
+        self.prefetcher.cancel()
         self.select.disabled = True
         await self.message.edit(view=self)
 
@@ -159,7 +215,7 @@ class PartialPlayerEmbed(discord.Embed):
             inline=False,
         )
 
-        self.set_footer(text="Last battle")
+        self.set_footer(text=f"{data_age(player.fetched_at)} • Last battle")
 
 
 class FullPlayerView(ui.View):
@@ -169,10 +225,45 @@ class FullPlayerView(ui.View):
         self.message: Optional[discord.Message] = None
         self.user_id = user_id
         self.player = player
+        self.battle_type: str = api.DEFAULT_BATTLE_TYPE
+        self.show_ships: bool = False
+        # battle type -> statistics of every ship, fetched on demand
+        self.ships: Dict[str, Optional[api.ShipsStatistics]] = {}
 
         self.select = BattleTypeSelect()
         self.add_item(self.select)
-        self.add_item(ui.Button(label="WoWS Numbers", url=player.wows_numbers_url))
+        self.add_item(
+            ui.Button(label="WoWS Numbers", url=player.wows_numbers_url, row=1)
+        )
+        self.key = api.stale.player_key(
+            player.region, player.id, player.used_access_code
+        )
+
+    def watch(self):
+        api.stale.players.watch(self.key, self.refresh, self.player.fetched_at)
+
+    async def refresh(self, player: api.Player):
+        if not isinstance(player, api.FullPlayer):
+            return
+
+        self.player = player
+        await self.message.edit(embed=await self.embed(), view=self)
+
+    async def embed(self) -> discord.Embed:
+        if not self.show_ships:
+            return FullPlayerEmbed(self.player, self.battle_type)
+
+        if self.battle_type not in self.ships:
+            self.ships[self.battle_type] = await api.get_ships_statistics(
+                self.player.region,
+                self.player.id,
+                self.battle_type,
+                access_code=self.player.used_access_code,
+            )
+
+        return TopShipsEmbed(
+            self.player, self.ships[self.battle_type], self.battle_type
+        )
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.user_id:
@@ -182,13 +273,21 @@ class FullPlayerView(ui.View):
             return False
         return True
 
+    @ui.button(label="Top Ships", style=discord.ButtonStyle.secondary, row=1)
+    async def toggle_ships(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.defer()
+        self.show_ships = not self.show_ships
+        button.label = "Overview" if self.show_ships else "Top Ships"
+        await self.message.edit(embed=await self.embed(), view=self)
+
     async def update_battle_type(self, battle_type: str):
-        await self.message.edit(
-            embed=FullPlayerEmbed(self.player, battle_type), view=self
-        )
+        self.battle_type = battle_type
+        await self.message.edit(embed=await self.embed(), view=self)
 
     async def on_timeout(self):
+        api.stale.players.unwatch(self.key, self.refresh)
         self.select.disabled = True
+        self.toggle_ships.disabled = True
         await self.message.edit(view=self)
 
 
@@ -211,12 +310,12 @@ class StatisticsEmbedCommon(discord.Embed):
         "ram": "Rams",
     }
 
-    def __init__(self, statistics: dict[str, int], **kwargs):
+    def __init__(self, statistics: Mapping[str, int], **kwargs):
         if not statistics:
             super().__init__(description="No statistics for this gamemode.", **kwargs)
             return
 
-        self.stats = statistics
+        self.stats = dict(statistics)  # statistics may be cached, do not mutate
 
         self.stats["total_agro"] = self.stats["art_agro"] + self.stats["tpd_agro"]
         self.stats["base_exp"] = self.stats["original_exp"]
@@ -228,14 +327,15 @@ class StatisticsEmbedCommon(discord.Embed):
         survived, survived_rate = self.rate("survived")
         died = self.battles - survived
 
-        super().__init__(
-            description=(
-                f"Battles: `{self.battles}`\n"
-                f"Wins: `{wins_rate * 100:.2f}%` (`{wins}`/`{losses}`/`{ties}`)\n"
-                f"Survival: `{survived_rate * 100:.2f}%` (`{survived}`/`{died}`)"
-            ),
-            **kwargs,
+        description = (
+            f"Battles: `{self.battles}`\n"
+            f"Wins: `{wins_rate * 100:.2f}%` (`{wins}`/`{losses}`/`{ties}`)\n"
+            f"Survival: `{survived_rate * 100:.2f}%` (`{survived}`/`{died}`)"
         )
+        if self.battles:
+            description += f"\nRating: `{ratings.block_rating(self.stats):.0f}`"
+
+        super().__init__(description=description, **kwargs)
 
     @property
     def battles(self) -> int:
@@ -359,7 +459,77 @@ class FullPlayerEmbed(StatisticsEmbedCommon):
         label, _, icon_id = BATTLE_TYPES[battle_type]
         self.set_author(name=label, icon_url=assets.get(icon_id))
 
-        self.set_footer(text="Last battle")
+        self.set_footer(text=f"{data_age(player.fetched_at)} • Last battle")
+
+
+class TopShipsEmbed(discord.Embed):
+    COUNT = 10
+    MIN_BATTLES = 10
+    HEADERS = ["Ship", "BTL", "W/B", "D/B", "PR"]
+    FLOAT_FMT = ["", ".0f", ".1f", ".0f", ".0f"]
+
+    def __init__(
+        self,
+        player: api.FullPlayer,
+        statistics: Optional[api.ShipsStatistics],
+        battle_type: str = api.DEFAULT_BATTLE_TYPE,
+    ):
+        cleaned = discord.utils.escape_markdown(player.name)
+        super().__init__(
+            title=f"{cleaned}'s Top Ships ({player.region.upper()})",
+            url=player.profile_url,
+        )
+
+        top = []
+        if statistics is not None:
+            top = statistics.top(
+                ratings.ship_ratings(statistics), self.COUNT, self.MIN_BATTLES
+            )
+
+        if top:
+            self.description = f"```{self.get_table(statistics, top)}```"
+            self.add_classes(statistics)
+        else:
+            self.description = f"No ships with at least {self.MIN_BATTLES} battles."
+
+        label, _, icon_id = BATTLE_TYPES[battle_type]
+        self.set_author(name=label, icon_url=assets.get(icon_id))
+        self.set_footer(text=f"By rating, minimum {self.MIN_BATTLES} battles")
+
+    def get_table(
+        self, statistics: api.ShipsStatistics, top: List[Tuple[int, float]]
+    ) -> str:
+        data = []
+        for ship_id, rating in top:
+            row = statistics.row(ship_id)
+            battles = row["battles_count"]
+            ship = wows.ships_by_id.get(ship_id, None)
+
+            data.append(
+                [
+                    ship.translations["en"]["short"] if ship else ship_id,
+                    battles,
+                    row["wins"] / battles * 100,
+                    row["damage_dealt"] / battles,
+                    rating,
+                ]
+            )
+
+        return tabulate.tabulate(data, headers=self.HEADERS, floatfmt=self.FLOAT_FMT)
+
+    def add_classes(self, statistics: api.ShipsStatistics):
+        def species(ship_id: int) -> Optional[str]:
+            ship = wows.ships_by_id.get(ship_id, None)
+            return SPECIES.get(ship.species, None) if ship else None
+
+        lines = [
+            f"{name}: `{totals['battles_count']}` battles, "
+            f"`{totals['wins'] / totals['battles_count']:.1%}` wins"
+            for name, totals in sorted(statistics.group_by(species).items())
+            if totals["battles_count"]
+        ]
+        if lines:
+            self.add_field(name="Classes", value="\n".join(lines), inline=False)
 
 
 class HiddenEmbed(discord.Embed):
@@ -401,10 +571,31 @@ class ShipStatisticsView(ui.View):
         self.ship_id: int = ship_id
         self.ship_name: str = ship_name
         self.message: Optional[discord.Message] = None
-        self.statistics: dict[str, dict[str, int]] = {}
+        self.statistics: dict[str, api.StatBlock] = {}
 
         self.select = BattleTypeSelect()
         self.add_item(self.select)
+        self.prefetcher: Prefetcher = Prefetcher()
+
+    def prefetch(self):
+        # the default size of each battle type is the most likely next pick
+        indexes = [
+            type_data["sizes"][type_data["default"]]
+            for type_data in api.BATTLE_TYPES.values()
+        ]
+        self.prefetcher.start(
+            (self.statistics, index, functools.partial(self.fetch, index))
+            for index in indexes
+            if index != api.DEFAULT_BATTLE_TYPE
+        )
+
+    async def fetch(self, battle_type: str) -> Optional[api.StatBlock]:
+        return await api.get_ship_statistics(
+            self.player.region,
+            self.player.id,
+            self.ship_id,
+            battle_type,
+        )
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.user_id:
@@ -415,15 +606,10 @@ class ShipStatisticsView(ui.View):
         return True
 
     async def update_battle_type(self, battle_type: str):
+        await self.prefetcher.wait(battle_type)
+
         if battle_type not in self.statistics:
-            if (
-                stats := await api.get_ship_statistics(
-                    self.player.region,
-                    self.player.id,
-                    self.ship_id,
-                    battle_type,
-                )
-            ) is not None:
+            if (stats := await self.fetch(battle_type)) is not None:
                 self.statistics[battle_type] = stats
             else:
                 logger.error(
@@ -442,6 +628,7 @@ class ShipStatisticsView(ui.View):
         )
 
     async def on_timeout(self):
+        self.prefetcher.cancel()
         self.select.disabled = True
         await self.message.edit(view=self)
 
@@ -450,7 +637,7 @@ class ShipStatisticsEmbed(StatisticsEmbedCommon):
     def __init__(
         self,
         player: api.FullPlayer,
-        stats: dict[str, int],
+        stats: api.StatBlock,
         ship_name: str,
         battle_type: str = api.DEFAULT_BATTLE_TYPE,
     ):
@@ -473,22 +660,28 @@ class StatsCog(commands.Cog):
     def __init__(self, bot: Track):
         self.bot: Track = bot
 
+        api.wg.load_cached()
         self.load_seasons.start()
 
+    async def cog_unload(self) -> None:
+        self.load_seasons.cancel()
+
     @tasks.loop(hours=1)
     async def load_seasons(self):
         logger.info("Loading Seasons...")
 
         try:
-            await api.wg.get_seasons()
-            logger.info("Seasons Loaded")
+            start = time.perf_counter()
+            changed = await api.wg.get_seasons()
+            elapsed = time.perf_counter() - start
+            logger.info(f"Seasons Loaded ({changed} regions changed, {elapsed:.2f}s)")
+            self.load_seasons.change_interval(hours=1)
         except Exception as e:
             logger.warning("Failed to load Seasons", exc_info=e)
 
+            # nothing cached to fall back on, retry sooner
             if not api.wg.seasons:
-                import sys
-
-                sys.exit(1)
+                self.load_seasons.change_interval(minutes=5)
 
     # noinspection PyUnusedLocal
     @app_commands.command(
@@ -521,6 +714,8 @@ class StatsCog(commands.Cog):
                 embed = PartialPlayerEmbed(player)
                 view = PartialPlayerView(interaction.user.id, player)
                 view.message = await interaction.followup.send(embed=embed, view=view)
+                view.prefetch()
+                view.watch()
         elif isinstance(player, api.FullPlayer):
             if player.last_battle_time == EPOCH:
                 await interaction.followup.send(
@@ -549,10 +744,12 @@ class StatsCog(commands.Cog):
                     view.message = await interaction.followup.send(
                         embed=embed, view=view
                     )
+                    view.prefetch()
             else:
                 embed = FullPlayerEmbed(player)
                 view = FullPlayerView(interaction.user.id, player)
                 view.message = await interaction.followup.send(embed=embed, view=view)
+                view.watch()
         elif isinstance(player, api.Player):
             if ship:
                 await interaction.followup.send(
@@ -589,7 +786,9 @@ class StatsCog(commands.Cog):
             )
             return
 
-        player = await api.get_player(user.wg_region, user.wg_id, user.wg_ac)
+        player = await api.get_player(
+            user.wg_region, user.wg_id, user.wg_ac, allow_stale=True
+        )
 
         if not isinstance(player, api.FullPlayer):
             await interaction.followup.send(
@@ -597,6 +796,9 @@ class StatsCog(commands.Cog):
             )
             return
 
+        if history_cog := self.bot.get_cog("HistoryCog"):
+            await history_cog.record(player)
+
         # Duplicated code
 
         if player.last_battle_time == EPOCH:
@@ -620,10 +822,12 @@ class StatsCog(commands.Cog):
                     interaction.user.id, player, ship.id, ship_name
                 )
                 view.message = await interaction.followup.send(embed=embed, view=view)
+                view.prefetch()
         else:
             embed = FullPlayerEmbed(player)
             view = FullPlayerView(interaction.user.id, player)
             view.message = await interaction.followup.send(embed=embed, view=view)
+            view.watch()
 
 
 async def setup(bot: Track):
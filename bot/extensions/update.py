@@ -5,14 +5,15 @@ import bs4
 from discord.ext import commands, tasks
 from discord import app_commands
 import discord
-import requests
 
 import api
 from bot.track import Track
+from bot.utils import snapshots
 from bot.utils.logs import logger
 
 
 PATTERN = re.compile(r'\[{"title":".+","date":(\d+)},{"title":".+","date":(\d+)}]')
+SNAPSHOT_VERSION = 1
 
 
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
@@ -25,27 +26,28 @@ def scrape():
         for region, url in api.URLS.items():
             route = url + "/en/news"
 
-            response = requests.get(
+            response = api.http_cache.cache.request(
+                "GET",
                 route,
                 params={"category": "game-updates", "pjax": "1", "multi": "true"},
                 headers={"X-Requested-With": "XMLHttpRequest"},
             )
 
-            if response.status_code != 200:
-                logger.error(
-                    f"Error code {response.status_code} while fetching articles"
-                )
+            if response.status != 200:
+                logger.error(f"Error code {response.status} while fetching articles")
                 return
 
             soup = bs4.BeautifulSoup(response.text, "html.parser")
             link = soup.find("article").find("vue-news-link")
             article_url = url + link.get("link")
 
-            response = requests.get(article_url, params={"pjax": "1"})
+            response = api.http_cache.cache.request(
+                "GET", article_url, params={"pjax": "1"}
+            )
 
-            if response.status_code != 200:
+            if response.status != 200:
                 logger.error(
-                    f"Error code {response.status_code} while fetching update article"
+                    f"Error code {response.status} while fetching update article"
                 )
                 return
 
@@ -72,7 +74,7 @@ class UpdateCog(commands.Cog):
     def __init__(self, bot: Track):
         self.bot = bot
 
-        self.update_data = {}
+        self.update_data = snapshots.load("update", SNAPSHOT_VERSION) or {}
         self.task_scrape.start()
 
     @tasks.loop(hours=1)
@@ -82,13 +84,9 @@ class UpdateCog(commands.Cog):
 
         if not result:
             logger.warning("Failed to load Updates")
-            #
-            # if not self.update_data:
-            #     import sys
-            #
-            #     sys.exit(1)
         else:
             self.update_data = result
+            snapshots.save("update", SNAPSHOT_VERSION, result)
             logger.info("Updates loaded")
 
     @app_commands.command(
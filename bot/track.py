@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 import traceback
@@ -10,7 +9,7 @@ from discord.ext import commands
 
 import api
 from config import cfg
-from bot.utils import db, errors, functions, logs
+from bot.utils import bus, db, errors, functions, logs, policy
 
 intents = discord.Intents.default()
 intents.message_content = True  # required for guess
@@ -33,50 +32,29 @@ class CustomTree(app_commands.CommandTree):
             )
             return False
 
-        user = await db.User.get_or_create(id=interaction.user.id)
-        if user.is_blacklisted:
+        if interaction.user.id in policy.blacklisted_users:
             return False
 
         if interaction.guild is not None:
-            guild = await db.Guild.get_or_create(id=interaction.guild.id)
-            if guild.is_blacklisted:
+            if interaction.guild.id in policy.blacklisted_guilds:
                 return False
 
             if interaction.type == discord.InteractionType.application_command:
-                data = json.loads(guild.disabled)
-                if targets := data.get(interaction.command.name, None):
-                    if 0 in targets:
+                command = interaction.command
+                targets = {"command": command.name}
+                if category := command.extras.get("category", None):
+                    targets["category"] = category
+
+                for kind, target in targets.items():
+                    if scope := policy.disabled_in(
+                        interaction.guild.id, interaction.channel_id, target
+                    ):
                         await functions.reply(
                             interaction,
-                            "This command is disabled in this server.",
+                            f"This {kind} is disabled in this {scope}.",
                             ephemeral=True,
                         )
                         return False
-                    elif interaction.channel_id in targets:
-                        await functions.reply(
-                            interaction,
-                            "This command is disabled in this channel.",
-                            ephemeral=True,
-                        )
-                        return False
-                try:
-                    if targets := data.get(interaction.command.extras["category"], None):
-                        if 0 in targets:
-                            await functions.reply(
-                                interaction,
-                                "This category is disabled in this server.",
-                                ephemeral=True,
-                            )
-                            return False
-                        elif interaction.channel_id in targets:
-                            await functions.reply(
-                                interaction,
-                                "This category is disabled in this channel.",
-                                ephemeral=True,
-                            )
-                            return False
-                except KeyError:
-                    pass
 
         return True
 
@@ -132,6 +110,11 @@ class Track(commands.AutoShardedBot):
         self.online_since: datetime = datetime.now(timezone.utc)
 
     async def setup_hook(self) -> None:
+        await policy.load()
+        db.writer.start()
+        bus.start()
+        api.index.start()
+
         try:
             await self.load_extensions()
         except commands.ExtensionError as error:
@@ -146,6 +129,12 @@ class Track(commands.AutoShardedBot):
             await self.tree.sync()
             logs.logger.info(f"Tree Synced")
 
+    async def close(self) -> None:
+        await super().close()
+        await db.writer.stop()
+        bus.stop()
+        api.index.stop()
+
     async def load_extensions(self) -> None:
         for root, dirs, files in os.walk(EXTENSIONS_PATH):
             for file in files:
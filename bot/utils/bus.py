@@ -0,0 +1,183 @@
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+import asyncio
+import json
+import os
+import uuid
+
+# aioredis does not import on Python 3.11, redis.asyncio is its successor
+import redis.asyncio
+
+from bot.utils.logs import logger
+from config import cfg
+
+# Cache invalidation bus shared by every process using the database: bot
+# processes, shard clusters and maintenance scripts. A process that writes a
+# cached row publishes its key, and every other process drops it.
+#
+# Each process numbers its messages. A subscriber that sees a gap in an
+# origin's numbers, or (re)connects, may have missed invalidations and drops
+# everything instead.
+#
+# Commands time out after cfg.redis.socket_timeout, so a stalled Redis fails
+# like an unreachable one and callers fall back to the local cache and the
+# database. The subscriber has its own connection, which waits for messages
+# without a timeout.
+
+CHANNEL = "track:invalidate"
+RECONNECT_DELAY = 5  # seconds
+
+Listener = Callable[[List[int]], Awaitable[None]]
+ResetListener = Callable[[], Awaitable[None]]
+
+_url = f"redis://:{cfg.redis.password}@{cfg.redis.host}:{cfg.redis.port}/"
+_redis: Optional[redis.asyncio.Redis] = None
+_subscriber: Optional[redis.asyncio.Redis] = None
+
+enabled = False  # publishing is a no-op until enable() is called
+origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+version = 0  # of the last message published by this process
+versions: Dict[str, int] = {}  # origin -> last version seen
+
+listeners: Dict[str, List[Listener]] = {}  # namespace -> listeners
+reset_listeners: List[ResetListener] = []
+task: Optional[asyncio.Task] = None
+
+
+def connection() -> redis.asyncio.Redis:
+    global _redis
+
+    if _redis is None:
+        _redis = redis.asyncio.from_url(
+            _url,
+            socket_timeout=cfg.redis.socket_timeout,
+            socket_connect_timeout=cfg.redis.connect_timeout,
+        )
+
+    return _redis
+
+
+def _subscriber_connection() -> redis.asyncio.Redis:
+    global _subscriber
+
+    if _subscriber is None:
+        _subscriber = redis.asyncio.from_url(
+            _url, socket_connect_timeout=cfg.redis.connect_timeout
+        )
+
+    return _subscriber
+
+
+def enable() -> None:
+    """
+    Enables publishing, for processes that write but do not subscribe.
+    """
+
+    global enabled
+    enabled = True
+
+
+def listen(namespace: str, listener: Listener) -> None:
+    """
+    Calls `listener` with the keys of every remote invalidation in `namespace`.
+    """
+
+    listeners.setdefault(namespace, []).append(listener)
+
+
+def listen_reset(listener: ResetListener) -> None:
+    """
+    Calls `listener` whenever invalidations may have been missed.
+    """
+
+    reset_listeners.append(listener)
+
+
+async def publish(namespace: str, keys: Iterable[int]) -> bool:
+    """
+    Publishes invalidated keys, returning False if Redis is unreachable.
+    """
+
+    global version
+
+    if not enabled or not (keys := list(keys)):
+        return True
+
+    version += 1
+    message = {
+        "origin": origin,
+        "version": version,
+        "namespace": namespace,
+        "keys": keys,
+    }
+
+    try:
+        await connection().publish(CHANNEL, json.dumps(message))
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to publish invalidation of {namespace}", exc_info=e)
+        return False
+
+
+async def _reset() -> None:
+    versions.clear()
+
+    for listener in reset_listeners:
+        try:
+            await listener()
+        except Exception as e:
+            logger.warning("Failed to reset after invalidation gap", exc_info=e)
+
+
+async def handle(data: bytes) -> None:
+    message = json.loads(data)
+
+    if (sender := message["origin"]) == origin:
+        return
+
+    last = versions.get(sender, None)
+    versions[sender] = message["version"]
+
+    if last is not None and message["version"] != last + 1:
+        logger.warning(f"Missed invalidations from {sender}, resetting caches")
+        await _reset()
+        return
+
+    for listener in listeners.get(message["namespace"], []):
+        try:
+            await listener(message["keys"])
+        except Exception as e:
+            logger.warning("Failed to apply invalidation", exc_info=e)
+
+
+async def run() -> None:
+    while True:
+        try:
+            pubsub = _subscriber_connection().pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(CHANNEL)
+            # anything published while disconnected is lost
+            await _reset()
+
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    await handle(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Invalidation bus disconnected, reconnecting", exc_info=e)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+def start() -> None:
+    global task
+
+    enable()
+    if task is None:
+        task = asyncio.create_task(run())
+
+
+def stop() -> None:
+    global task
+
+    if task is not None:
+        task.cancel()
+        task = None
@@ -0,0 +1,214 @@
+from typing import Any, Callable, Dict, Hashable, Tuple
+import time
+import zlib
+
+import cachetools
+
+from bot.utils import bus
+from bot.utils.logs import logger
+
+MISSING = object()  # unlike None, which is a cacheable value
+
+COMPRESS_MIN = 512  # bytes, smaller payloads are stored as is
+RAW, COMPRESSED = b"\x00", b"\x01"
+SHARED_RETRY_DELAY = 30  # seconds the shared tier is skipped after an error
+
+# Two-level cache: a process-local LRU with a byte budget, backed by a tier in
+# Redis shared by every bot process, so a restarted process or another shard
+# starts warm. Values are serialised by the codec of each cache, never
+# pickled, since anyone able to write to Redis could otherwise run code in
+# every process. Large values are compressed. The shared tier is only used
+# once bus.enable() has been called, and is skipped for a while whenever
+# Redis errors.
+
+Encode = Callable[[Any], bytes]
+Decode = Callable[[bytes], Any]  # raises on invalid data
+
+caches: Dict[str, "TwoLevelCache"] = {}  # namespace -> cache
+_shared_down_until: float = 0
+
+
+class TierMetrics:
+    __slots__ = ("hits", "misses", "errors", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.errors: int = 0
+        self.bytes_read: int = 0
+        self.bytes_written: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+
+def pack(data: bytes) -> bytes:
+    if len(data) >= COMPRESS_MIN:
+        return COMPRESSED + zlib.compress(data)
+    return RAW + data
+
+
+def unpack(data: bytes) -> bytes:
+    if data[:1] == COMPRESSED:
+        return zlib.decompress(data[1:])
+    elif data[:1] == RAW:
+        return data[1:]
+    raise ValueError("Unknown cache payload")
+
+
+def _shared_available() -> bool:
+    return bus.enabled and time.time() >= _shared_down_until
+
+
+def _shared_failed(namespace: str, e: Exception) -> None:
+    global _shared_down_until
+
+    _shared_down_until = time.time() + SHARED_RETRY_DELAY
+    logger.warning(f"Shared cache failed in {namespace}, using local only", exc_info=e)
+
+
+class TwoLevelCache:
+    """
+    Cache of one namespace, whose entries expire after `ttl` seconds in both
+    tiers. The local tier holds at most `local_bytes` of serialised values.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        local_bytes: int,
+        encode: Encode,
+        decode: Decode,
+    ):
+        self.namespace: str = namespace
+        self.ttl: float = ttl
+        self.encode: Encode = encode
+        self.decode: Decode = decode
+
+        # value, serialised size
+        self.local: cachetools.TTLCache = cachetools.TTLCache(
+            local_bytes, ttl, getsizeof=lambda entry: entry[1]
+        )
+        self.local_metrics: TierMetrics = TierMetrics()
+        self.shared_metrics: TierMetrics = TierMetrics()
+
+        caches[namespace] = self
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"track:cache:{self.namespace}:{key!r}"
+
+    def _store_local(self, key: Hashable, value: Any, size: int) -> None:
+        if size <= self.local.maxsize:
+            self.local[key] = value, size
+
+    def peek(self, key: Hashable) -> Any:
+        """
+        Returns a value from the local tier only, or MISSING.
+        """
+
+        if (entry := self.local.get(key, None)) is None:
+            return MISSING
+        return entry[0]
+
+    async def get(self, key: Hashable) -> Any:
+        if (entry := self.local.get(key, None)) is not None:
+            self.local_metrics.hits += 1
+            return entry[0]
+
+        self.local_metrics.misses += 1
+
+        if not _shared_available():
+            return MISSING
+
+        try:
+            data = await bus.connection().get(self._shared_key(key))
+        except Exception as e:
+            self.shared_metrics.errors += 1
+            _shared_failed(self.namespace, e)
+            return MISSING
+
+        if data is None:
+            self.shared_metrics.misses += 1
+            return MISSING
+
+        try:
+            value = self.decode(unpack(data))
+        except Exception as e:
+            self.shared_metrics.errors += 1
+            logger.warning(f"Ignored invalid entry in {self.namespace}", exc_info=e)
+            return MISSING
+
+        self.shared_metrics.hits += 1
+        self.shared_metrics.bytes_read += len(data)
+
+        self._store_local(key, value, len(data))
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        data = pack(self.encode(value))
+        self._store_local(key, value, len(data))
+
+        if not _shared_available():
+            return
+
+        try:
+            await bus.connection().set(self._shared_key(key), data, ex=int(self.ttl))
+            self.shared_metrics.bytes_written += len(data)
+        except Exception as e:
+            self.shared_metrics.errors += 1
+            _shared_failed(self.namespace, e)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Drops a value from the local tier only.
+        """
+
+        self.local.pop(key, None)
+
+    async def delete(self, key: Hashable) -> None:
+        self.discard(key)
+
+        if not _shared_available():
+            return
+
+        try:
+            await bus.connection().delete(self._shared_key(key))
+        except Exception as e:
+            self.shared_metrics.errors += 1
+            _shared_failed(self.namespace, e)
+
+    def clear(self) -> None:
+        """
+        Clears the local tier only.
+        """
+
+        self.local.clear()
+
+    def metrics(self) -> Dict[str, Tuple]:
+        """
+        Returns (entries, bytes, hits, misses, hit rate, errors) per tier.
+        Shared bytes are the bytes written by this process.
+        """
+
+        local, shared = self.local_metrics, self.shared_metrics
+        return {
+            "local": (
+                len(self.local),
+                self.local.currsize,
+                local.hits,
+                local.misses,
+                local.hit_rate,
+                local.errors,
+            ),
+            "shared": (
+                None,
+                shared.bytes_written,
+                shared.hits,
+                shared.misses,
+                shared.hit_rate,
+                shared.errors,
+            ),
+        }
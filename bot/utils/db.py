@@ -1,64 +1,383 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
 import os
 
-import cachetools
-import cachetools.keys
+import orjson
 from sqlalchemy import Boolean, Column, Float, Integer, JSON, String
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from bot.utils import bus
+from bot.utils.cache import MISSING, TwoLevelCache
+from bot.utils.logs import logger
+from config import cfg
+
 # _DB_PATH = ":memory:"
 _DB_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../assets/private/bot.db"
 )
-engine = create_async_engine(f"sqlite+aiosqlite:///{_DB_PATH}", future=True)
+
+Operation = Callable[[AsyncConnection], Awaitable[Any]]
+
+
+def create_engine(path: str) -> AsyncEngine:
+    """
+    Creates an engine whose connections use the cfg.database storage profile.
+    """
+
+    new_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", future=True)
+
+    # noinspection PyUnusedLocal
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # readers never block the writer and the other way around
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={cfg.database.synchronous}")
+        cursor.execute(f"PRAGMA cache_size={cfg.database.cache_size}")
+        cursor.execute(f"PRAGMA mmap_size={cfg.database.mmap_size}")
+        cursor.execute(f"PRAGMA busy_timeout={cfg.database.busy_timeout}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    return new_engine
+
+
+engine = create_engine(_DB_PATH)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 
+class Writer:
+    """
+    Single task that performs every write, so writes never contend for the
+    database lock and are grouped into short transactions.
+
+    Rows created by CachedMixin.get_or_create are buffered and inserted with
+    INSERT OR IGNORE. Other writes are submitted as operations, which wait for
+    the commit of their transaction. Writes arriving within
+    cfg.database.commit_delay milliseconds share one transaction.
+
+    Buffered rows that fail to insert stay buffered and are retried. If a
+    transaction fails, its operations are retried one by one, so one bad
+    operation only fails itself.
+    """
+
+    RETRY_DELAY = 5  # seconds, after a failed flush
+    STOP_ATTEMPTS = 3
+
+    def __init__(self):
+        self.pending: Dict[Any, Dict[Tuple, Dict[str, Any]]] = {}  # table -> key -> row
+        self.operations: List[Tuple[Operation, asyncio.Future]] = []
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.wakeup: asyncio.Event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def add(self, table, key: Tuple, values: Dict[str, Any]) -> None:
+        self.pending.setdefault(table, {})[key] = values
+        self.wakeup.set()
+
+    async def submit(self, operation: Operation) -> Any:
+        """
+        Runs `operation` with the writer's connection, returning its result
+        once its transaction is committed.
+        """
+
+        self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self.operations.append((operation, future))
+        self.wakeup.set()
+        return await future
+
+    async def flush(self) -> int:
+        """
+        Commits buffered rows and up to cfg.database.max_batch operations,
+        returning the number of writes.
+        """
+
+        async with self.lock:
+            rows, self.pending = self.pending, {}
+            batch = self.operations[: cfg.database.max_batch]
+            del self.operations[: len(batch)]
+
+            if not rows and not batch:
+                return 0
+
+            try:
+                async with engine.begin() as conn:
+                    await self._insert(conn, rows)
+                    results = [await operation(conn) for operation, _ in batch]
+            except Exception:
+                await self._retry(rows, batch)
+                raise
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+        # published without the lock, so a slow bus does not hold up writes
+        for table, table_rows in rows.items():
+            await bus.publish(table.name, [row["id"] for row in table_rows.values()])
+
+        return sum(len(table_rows) for table_rows in rows.values()) + len(batch)
+
+    @staticmethod
+    async def _insert(conn: AsyncConnection, rows) -> None:
+        for table, table_rows in rows.items():
+            statement = insert(table).prefix_with("OR IGNORE")
+            await conn.execute(statement, list(table_rows.values()))
+
+    async def _retry(self, rows, batch) -> None:
+        # rows buffered meanwhile are newer, keep them over the failed ones
+        for table, table_rows in rows.items():
+            self.pending[table] = {**table_rows, **self.pending.get(table, {})}
+
+        for operation, future in batch:
+            try:
+                async with engine.begin() as conn:
+                    result = await operation(conn)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def run(self):
+        while True:
+            await self.wakeup.wait()
+            await asyncio.sleep(cfg.database.commit_delay / 1000)  # gather writes
+            self.wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Failed to flush buffered rows, retrying", exc_info=e)
+                await asyncio.sleep(self.RETRY_DELAY)
+
+            if self.pending or self.operations:
+                self.wakeup.set()
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            # never cancel the task in the middle of a transaction
+            async with self.lock:
+                self.task.cancel()
+                self.task = None
+
+        for attempt in range(self.STOP_ATTEMPTS):
+            try:
+                while await self.flush():
+                    pass
+                return
+            except Exception as e:
+                logger.warning("Failed to flush buffered rows on stop", exc_info=e)
+                await asyncio.sleep(attempt + 1)
+
+        logger.error(
+            f"Dropped {sum(len(rows) for rows in self.pending.values())} buffered rows"
+        )
+
+
+writer = Writer()
+
+
+class Record:
+    """
+    Compact, detached and read-only copy of a row, as cached by CachedMixin.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{self.__class__.__name__} is read-only, use update()")
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({values})"
+
+    def replace(self, **fields) -> "Record":
+        return self.__class__(**{**self.to_dict(), **fields})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _key(**kwargs) -> Tuple:
+    return tuple(sorted(kwargs.items()))
+
+
 class CachedMixin:
-    CACHE_SIZE = 1000
-    cache = None
+    models: Dict[str, type] = {}  # table name -> model
+    cache: Optional[TwoLevelCache] = None
+    record_type = None
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        cls.cache = cachetools.LRUCache(maxsize=cls.CACHE_SIZE)
+
+        # noinspection PyUnresolvedReferences
+        name = cls.__tablename__
+        cls.models[name] = cls
+        cls.cache = TwoLevelCache(
+            name,
+            cfg.cache.entity_ttl,
+            cfg.cache.local_bytes,
+            cls.encode_record,
+            cls.decode_record,
+        )
+
+        # drop rows written by other processes, see bot.utils.bus
+        # noinspection PyUnresolvedReferences
+        bus.listen(cls.__tablename__, cls.invalidate_remote)
+        bus.listen_reset(cls.clear_cache)
+
+    @classmethod
+    async def invalidate_remote(cls, keys: List[int]):
+        for key in keys:
+            cls.invalidate(id=key)
+
+    @classmethod
+    async def clear_cache(cls):
+        # the shared tier is kept current by the writing processes
+        cls.cache.clear()
+
+    @classmethod
+    def to_record(cls, values: Dict[str, Any]) -> Record:
+        # the table only exists once the subclass is mapped
+        if cls.record_type is None:
+            # noinspection PyUnresolvedReferences
+            columns = tuple(column.name for column in cls.__table__.columns)
+            # noinspection PyUnresolvedReferences
+            cls.record_type = type(
+                f"{cls.__name__}Record",
+                (Record,),
+                {"__slots__": columns, "table_name": cls.__tablename__},
+            )
+
+        return cls.record_type(**values)
+
+    @staticmethod
+    def encode_record(record: Optional[Record]) -> bytes:
+        return orjson.dumps(record.to_dict() if record is not None else None)
+
+    @classmethod
+    def decode_record(cls, data: bytes) -> Optional[Record]:
+        if (values := orjson.loads(data)) is None:
+            return None  # a cached miss
+
+        # noinspection PyUnresolvedReferences
+        columns = {column.name for column in cls.__table__.columns}
+        if set(values) != columns:
+            raise ValueError(f"Cached row does not match {cls.__name__}")
+
+        return cls.to_record(values)
 
     @classmethod
     def invalidate(cls, **kwargs):
-        try:
-            del cls.cache[cachetools.keys.hashkey(**kwargs)]
-        except KeyError:
-            pass
+        cls.cache.discard(_key(**kwargs))
 
     @classmethod
-    async def get(cls, **kwargs):
-        key = cachetools.keys.hashkey(**kwargs)
-        if (cached := cls.cache.get(key)) is not None:
-            return cached
+    async def evict(cls, ids: List[int]):
+        """
+        Drops rows from every tier and process, after writing them directly.
+        """
+
+        for id in ids:
+            await cls.cache.delete(_key(id=id))
 
         # noinspection PyUnresolvedReferences
-        clauses = [cls.__table__.columns[key] == value for key, value in kwargs.items()]
+        await bus.publish(cls.__tablename__, ids)
+
+    @classmethod
+    async def get(cls, **kwargs) -> Optional[Record]:
+        key = _key(**kwargs)
+        if (record := await cls.cache.get(key)) is not MISSING:
+            return record
+
+        # noinspection PyUnresolvedReferences
+        table = cls.__table__
+        clauses = [table.columns[name] == value for name, value in kwargs.items()]
 
         async with async_session() as session:
-            statement = select(cls).where(*clauses)
-            result = (await session.execute(statement)).all()
-            cls.cache[key] = result
-            return result
+            statement = select(table).where(*clauses)
+            row = (await session.execute(statement)).first()
+
+        record = cls.to_record(row._asdict()) if row is not None else None
+        await cls.cache.set(key, record)  # misses are cached too
+        return record
+
+    @classmethod
+    def defaults(cls) -> Dict[str, Any]:
+        # noinspection PyUnresolvedReferences
+        return {
+            column.name: column.default.arg if column.default is not None else None
+            for column in cls.__table__.columns
+            if not column.primary_key
+        }
+
+    @classmethod
+    async def get_or_create(cls, **kwargs) -> Record:
+        """
+        Returns the matching row, or creates one with default values.
+
+        New rows are cached and returned immediately, but only written to the
+        database by the next writer flush.
+        """
+
+        if (record := await cls.get(**kwargs)) is not None:
+            return record
+
+        key = _key(**kwargs)
+        values = {**cls.defaults(), **kwargs}
+        record = cls.to_record(values)
+        await cls.cache.set(key, record)
+        # noinspection PyUnresolvedReferences
+        writer.add(cls.__table__, key, values)
+        return record
 
     @classmethod
-    async def get_or_create(cls, **kwargs):
-        if result := await cls.get(**kwargs):
-            return result[0][0]
-        else:
-            async with async_session() as session:
-                # noinspection PyArgumentList
-                obj = cls(**kwargs)
-                session.add(obj)
-                await session.commit()
-            cls.invalidate(**kwargs)
-            return obj
+    async def update(cls, id: int, **fields) -> Record:
+        """
+        Sets the given columns of a row, creating it if needed, with a single
+        statement, and returns the row as committed.
+        """
+
+        key = _key(id=id)
+        # noinspection PyUnresolvedReferences
+        table = cls.__table__
+
+        async def upsert(conn: AsyncConnection) -> Dict[str, Any]:
+            statement = (
+                sqlite_insert(table)
+                .values({**cls.defaults(), "id": id, **fields})
+                .on_conflict_do_update(index_elements=[table.c.id], set_=fields)
+                .returning(*table.c)
+            )
+            return (await conn.execute(statement)).one()._asdict()
+
+        # the committed row, so concurrent writers never merge into stale values
+        record = cls.to_record(await writer.submit(upsert))
+        await cls.cache.set(key, record)
+        await bus.publish(table.name, [id])
+
+        return record
 
 
 class User(Base, CachedMixin):
@@ -87,12 +406,23 @@ class Guild(Base, CachedMixin):
     is_premium = Column(Boolean, default=False)
 
 
+class Checkpoint(Base):
+    """
+    Position of the last journal entry applied to the database, committed in
+    the same transaction as the entries, so a replay never applies one twice.
+    """
+
+    __tablename__ = "checkpoints"
+
+    name = Column(String, primary_key=True)
+    position = Column(Integer, default=0)
+
+
 if __name__ == "__main__":
+    # run as `python -m bot.utils.db`, creates the tables that do not exist yet
 
     async def create_tables():
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
-    import asyncio
-
     asyncio.run(create_tables())
@@ -1,4 +1,5 @@
 import math
+import time
 
 import discord
 
@@ -17,12 +18,30 @@ def rating(battles: int, wins: int, survived: int, damage: float, exp: float):
     https://wiki.wargaming.net/en/Player_Ratings_(WoT)#Personal_Rating
     """
     avg_damage, avg_exp = damage / battles, exp / battles
+    win_rate, survival_rate = wins / battles, survived / battles
 
     a = math.asinh(0.0015 * avg_exp)
     b = 3700 * math.asinh(0.0006 * avg_damage) + math.tanh(0.002 * battles)
-    c = 3500 / (1 + math.e**16 - 31 * wins) + 1400 / (1 + math.e**8 - 27 * survived)
+    c = 3500 / (1 + math.exp(16 - 31 * win_rate)) + 1400 / (
+        1 + math.exp(8 - 27 * survival_rate)
+    )
     d = b + c * a
     e = math.tanh(0.00163 * battles**-0.37 * d)
     f = 540 * battles**0.37 * e
 
     return f
+
+
+def data_age(fetched_at: float) -> str:
+    """
+    Describes how long ago data was fetched, for embed footers.
+    """
+
+    minutes = int(time.time() - fetched_at) // 60
+
+    if minutes < 1:
+        return "Updated just now"
+    elif minutes < 60:
+        return f"Updated {minutes} min ago"
+    else:
+        return f"Updated {minutes // 60} h ago"
@@ -0,0 +1,178 @@
+from typing import Dict, List, Mapping, Optional, Tuple
+import os
+import struct
+import threading
+import time
+
+import cachetools
+import numpy as np
+
+import api
+
+_HISTORY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../assets/private/history"
+)
+
+MAGIC = b"TRKH"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")  # magic, version, column count
+
+FIELDS = [
+    "battles_count",
+    "wins",
+    "losses",
+    "survived",
+    "damage_dealt",
+    "frags",
+    "original_exp",
+    "planes_killed",
+    "ships_spotted",
+    "scouting_damage",
+]
+COLUMNS: List[Tuple[str, str]] = [
+    (index, field)
+    for type_data in api.BATTLE_TYPES.values()
+    for index in type_data["sizes"].values()
+    for field in FIELDS
+]
+RECORD_SIZE = 8 * (1 + len(COLUMNS))
+TAILS_SIZE = 10_000
+
+# path -> (file size, absolute values of the last record)
+_tails: cachetools.LRUCache = cachetools.LRUCache(TAILS_SIZE)
+_lock = threading.Lock()
+
+# Each file holds a header followed by fixed-width int64 records of a
+# timestamp and one value per column. The first record holds absolute values
+# and every following record the difference to the one before it, so the
+# absolute series is a cumulative sum. Unchanged snapshots are not written.
+#
+# The absolute values of the last record are kept in memory with the size of
+# the file they were read at, so appending only reads the whole file when it
+# was changed elsewhere or was not appended to recently. Functions here do
+# blocking I/O and are run in threads by the bot.
+
+
+def _path(region: str, player_id: int) -> str:
+    return os.path.join(_HISTORY_PATH, region, f"{player_id}.bin")
+
+
+def _encode(statistics: Mapping[str, Mapping[str, int]]) -> np.ndarray:
+    empty = {}
+    return np.fromiter(
+        (
+            statistics.get(battle_type, empty).get(field, 0)
+            for battle_type, field in COLUMNS
+        ),
+        np.int64,
+        len(COLUMNS),
+    )
+
+
+def load(region: str, player_id: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns the snapshot timestamps and a (snapshots, columns) array of
+    absolute values, or None if the player has no compatible history.
+    """
+
+    try:
+        with open(_path(region, player_id), "rb") as fp:
+            header = fp.read(HEADER.size)
+            body = fp.read()
+    except FileNotFoundError:
+        return None
+
+    if len(header) < HEADER.size:
+        return None
+    elif HEADER.unpack(header) != (MAGIC, VERSION, len(COLUMNS)):
+        return None
+
+    count = len(body) // RECORD_SIZE  # ignores a torn trailing record
+    records = np.frombuffer(body, dtype="<i8", count=count * (1 + len(COLUMNS)))
+    records = records.reshape(count, 1 + len(COLUMNS))
+
+    return records[:, 0], np.cumsum(records[:, 1:], axis=0)
+
+
+def append(
+    region: str,
+    player_id: int,
+    statistics: Mapping[str, Mapping[str, int]],
+    timestamp: Optional[float] = None,
+) -> bool:
+    """
+    Appends a snapshot, returning False if nothing changed since the last one.
+    """
+
+    values = _encode(statistics)
+    path = _path(region, player_id)
+
+    with _lock:
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            size = None
+
+        if (tail := _tails.get(path)) is not None and tail[0] == size:
+            last = tail[1]
+        elif (history := load(region, player_id)) is not None and len(history[0]):
+            last = history[1][-1]
+
+            # drop a record torn by an interrupted write before appending
+            expected = HEADER.size + len(history[0]) * RECORD_SIZE
+            if size != expected:
+                os.truncate(path, expected)
+                size = expected
+        else:
+            last = None
+            size = 0  # missing or incompatible, start over
+
+        if last is not None:
+            delta = values - last
+            if not delta.any():
+                _tails[path] = (size, last)
+                return False
+            mode = "ab"
+        else:
+            delta = values
+            mode = "wb"
+
+        record = np.empty(1 + len(COLUMNS), dtype="<i8")
+        record[0] = int(timestamp if timestamp is not None else time.time())
+        record[1:] = delta
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _tails.pop(path, None)  # unknown until the write completes
+        with open(path, mode) as fp:
+            if mode == "wb":
+                fp.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS)))
+                size = HEADER.size
+            fp.write(record.tobytes())
+
+        _tails[path] = (size + RECORD_SIZE, values)
+
+    return True
+
+
+def delta(
+    region: str, player_id: int, since: float
+) -> Optional[Tuple[int, int, Dict[str, Dict[str, int]]]]:
+    """
+    Returns the change from the last snapshot at or before `since` to the
+    latest one, as (start, end, {battle_type: {field: value}}).
+
+    If there is no snapshot that old, the change since the first one is used.
+    """
+
+    if (history := load(region, player_id)) is None or not len(history[0]):
+        return None
+
+    timestamps, values = history
+    start = max(int(np.searchsorted(timestamps, since, side="right")) - 1, 0)
+    change = values[-1] - values[start]
+
+    result: Dict[str, Dict[str, int]] = {}
+    for (battle_type, field), value in zip(COLUMNS, change.tolist()):
+        result.setdefault(battle_type, {})[field] = value
+
+    return int(timestamps[start]), int(timestamps[-1]), result
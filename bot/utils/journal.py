@@ -0,0 +1,140 @@
+from typing import Any, IO, Iterable, List, Optional
+import fcntl
+import json
+import os
+
+from bot.utils.logs import logger
+from config import cfg
+
+_JOURNALS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../assets/private/journals"
+)
+
+# Append-only journals of JSON entries, one per line, for state that changes a
+# little at a time. Appending costs I/O in proportion to the entry, instead of
+# rewriting the whole state. Each append is flushed to the OS before it
+# returns, so entries survive the process crashing. A line torn by a crash
+# mid-write is dropped when replaying.
+#
+# The owner of a journal periodically compacts it, atomically replacing its
+# entries with a snapshot of the current state.
+#
+# Journals belong to one process: they are kept per cfg.process.name, and a
+# journal open in one process cannot be opened by another.
+
+
+class JournalLockedError(Exception):
+    pass
+
+
+class Journal:
+    def __init__(self, name: str):
+        # unique among processes sharing the database, e.g. for checkpoints
+        self.name: str = f"{cfg.process.name}/{name}"
+        self.directory: str = os.path.join(_JOURNALS_PATH, cfg.process.name)
+        self.path: str = os.path.join(self.directory, f"{name}.jsonl")
+        self.entries: int = 0  # since the last compaction
+        self._fp: Optional[IO[bytes]] = None
+        self._lock_fp: Optional[IO[bytes]] = None
+
+    @staticmethod
+    def _encode(entry: Any) -> bytes:
+        return json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def replay(self) -> List[Any]:
+        """
+        Returns every entry in order, and opens the journal for appending.
+        """
+
+        self._lock()
+
+        entries = []
+        end = 0  # of the last complete line
+        try:
+            with open(self.path, "rb") as fp:
+                for number, line in enumerate(fp, start=1):
+                    if not line.endswith(b"\n"):
+                        logger.warning(f"Dropped torn line {number} of {self.path}")
+                        break
+
+                    end += len(line)
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipped invalid line {number} of {self.path}")
+
+            # or the next entry would be appended to the torn line
+            if end != os.path.getsize(self.path):
+                os.truncate(self.path, end)
+        except FileNotFoundError:
+            pass
+
+        self.entries = len(entries)
+        self._open()
+        return entries
+
+    def _lock(self) -> None:
+        if self._lock_fp is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_fp = open(f"{self.path}.lock", "wb")
+        try:
+            fcntl.flock(self._lock_fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_fp.close()
+            self._lock_fp = None
+            raise JournalLockedError(
+                f"{self.path} is used by another process, "
+                "give each process its own PROCESS_NAME"
+            )
+
+    def _open(self) -> None:
+        self._lock()
+        if self._fp is None:
+            self._fp = open(self.path, "ab")
+
+    def append(self, entry: Any) -> None:
+        self.extend((entry,))
+
+    def extend(self, entries: Iterable[Any]) -> None:
+        data = b"".join(self._encode(entry) for entry in entries)
+        if not data:
+            return
+
+        self._open()
+        self._fp.write(data)
+        self._fp.flush()
+        self.entries += data.count(b"\n")
+
+    def compact(self, entries: Iterable[Any]) -> None:
+        """
+        Atomically replaces the journal with `entries`.
+        """
+
+        self._lock()
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+        count = 0
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as fp:
+            for entry in entries:
+                fp.write(self._encode(entry))
+                count += 1
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, self.path)
+
+        self.entries = count
+        self._open()
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+        if self._lock_fp is not None:
+            self._lock_fp.close()  # releases the lock
+            self._lock_fp = None
@@ -0,0 +1,108 @@
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import select
+
+from bot.utils import bus, db
+from bot.utils.logs import logger
+
+GLOBAL = "global"
+RECORD, COUNT = "record", "count"
+REBUILD_CHUNK = 1000
+
+# Guess leaderboards, kept as Redis sorted sets so that top-N and rank queries
+# cost O(log n) however many users have played. Every recorded guess updates
+# the global board and the board of the server it was made in.
+#
+# The global boards mirror the users table and are rebuilt from it when
+# missing. Server boards only exist in Redis, since results are not stored
+# per server in the database.
+
+Scope = Union[str, int]  # GLOBAL or a guild ID
+
+
+def _key(board: str, scope: Scope) -> str:
+    return f"track:guess:{board}:{scope}"
+
+
+async def add(guild_id: Optional[int], user_id: int, time: float) -> None:
+    """
+    Records a correct guess, keeping each user's best time per scope.
+    """
+
+    scopes = [GLOBAL] if guild_id is None else [GLOBAL, guild_id]
+
+    try:
+        async with bus.connection().pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                # LT only ever lowers an existing score, new members are added
+                pipe.zadd(_key(RECORD, scope), {user_id: time}, lt=True)
+                pipe.zincrby(_key(COUNT, scope), 1, user_id)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update guess leaderboards of {user_id}", exc_info=e)
+
+
+async def top(board: str, scope: Scope, count: int) -> List[Tuple[int, float]]:
+    """
+    Returns up to `count` (user ID, score) pairs, best first.
+    """
+
+    key = _key(board, scope)
+    if board == RECORD:
+        entries = await bus.connection().zrange(key, 0, count - 1, withscores=True)
+    else:
+        entries = await bus.connection().zrevrange(key, 0, count - 1, withscores=True)
+
+    return [(int(member), score) for member, score in entries]
+
+
+async def rank(board: str, scope: Scope, user_id: int) -> Optional[Tuple[int, float]]:
+    """
+    Returns the 1-based position and score of a user, or None if unranked.
+    """
+
+    key = _key(board, scope)
+    async with bus.connection().pipeline(transaction=False) as pipe:
+        if board == RECORD:
+            pipe.zrank(key, user_id)
+        else:
+            pipe.zrevrank(key, user_id)
+        pipe.zscore(key, user_id)
+        position, score = await pipe.execute()
+
+    if position is None:
+        return None
+    return position + 1, score
+
+
+async def rebuild() -> int:
+    """
+    Fills the global boards from the users table if they are missing,
+    returning the number of users added.
+    """
+
+    connection = bus.connection()
+    if await connection.exists(_key(RECORD, GLOBAL), _key(COUNT, GLOBAL)) == 2:
+        return 0
+
+    statement = select(db.User.id, db.User.guess_count, db.User.guess_record).where(
+        db.User.guess_count > 0
+    )
+    async with db.async_session() as session:
+        rows = (await session.execute(statement)).all()
+
+    for index in range(0, len(rows), REBUILD_CHUNK):
+        chunk = rows[index : index + REBUILD_CHUNK]
+        records = {
+            row.id: row.guess_record for row in chunk if row.guess_record is not None
+        }
+        counts = {row.id: row.guess_count for row in chunk}
+
+        # never overwrite guesses recorded while rebuilding
+        async with connection.pipeline(transaction=False) as pipe:
+            if records:
+                pipe.zadd(_key(RECORD, GLOBAL), records, lt=True)
+            pipe.zadd(_key(COUNT, GLOBAL), counts, gt=True)
+            await pipe.execute()
+
+    return len(rows)
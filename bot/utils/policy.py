@@ -0,0 +1,115 @@
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
+import json
+
+from sqlalchemy import select
+
+from bot.utils import bus, db
+
+SERVER = 0  # the channel ID standing in for a whole server
+
+# Snapshot of the user and guild settings the interaction gate needs, so that
+# it decides with set and dict lookups instead of queries. Loaded at startup,
+# and every write to the underlying columns must go through the setters below.
+# Writes from other processes arrive through the invalidation bus.
+
+blacklisted_users: Set[int] = set()
+blacklisted_guilds: Set[int] = set()
+disabled: Dict[int, Dict[str, FrozenSet[int]]] = {}  # guild -> target -> channels
+
+
+def _compile(data: Mapping[str, Iterable[int]]) -> Dict[str, FrozenSet[int]]:
+    return {
+        target: frozenset(channels) for target, channels in data.items() if channels
+    }
+
+
+async def load() -> None:
+    async with db.async_session() as session:
+        users = await session.execute(
+            select(db.User.id).where(db.User.is_blacklisted.is_(True))
+        )
+        guilds = (
+            await session.execute(
+                select(db.Guild.id, db.Guild.is_blacklisted, db.Guild.disabled)
+            )
+        ).all()
+
+    blacklisted_users.clear()
+    blacklisted_users.update(users.scalars())
+    blacklisted_guilds.clear()
+    disabled.clear()
+
+    for guild_id, is_blacklisted, data in guilds:
+        if is_blacklisted:
+            blacklisted_guilds.add(guild_id)
+        set_disabled(guild_id, json.loads(data) if data else {})
+
+
+async def reload_users(user_ids: List[int]) -> None:
+    async with db.async_session() as session:
+        statement = select(db.User.id).where(
+            db.User.id.in_(user_ids), db.User.is_blacklisted.is_(True)
+        )
+        blacklisted = set((await session.execute(statement)).scalars())
+
+    for user_id in user_ids:
+        set_user_blacklisted(user_id, user_id in blacklisted)
+
+
+async def reload_guilds(guild_ids: List[int]) -> None:
+    async with db.async_session() as session:
+        statement = select(
+            db.Guild.id, db.Guild.is_blacklisted, db.Guild.disabled
+        ).where(db.Guild.id.in_(guild_ids))
+        guilds = {row[0]: row[1:] for row in (await session.execute(statement))}
+
+    for guild_id in guild_ids:
+        is_blacklisted, data = guilds.get(guild_id, (False, None))
+        set_guild_blacklisted(guild_id, is_blacklisted)
+        set_disabled(guild_id, json.loads(data) if data else {})
+
+
+def _toggle(ids: Set[int], object_id: int, value: bool) -> None:
+    if value:
+        ids.add(object_id)
+    else:
+        ids.discard(object_id)
+
+
+def set_user_blacklisted(user_id: int, value: bool) -> None:
+    _toggle(blacklisted_users, user_id, value)
+
+
+def set_guild_blacklisted(guild_id: int, value: bool) -> None:
+    _toggle(blacklisted_guilds, guild_id, value)
+
+
+def set_disabled(guild_id: int, data: Mapping[str, List[int]]) -> None:
+    if compiled := _compile(data):
+        disabled[guild_id] = compiled
+    else:
+        disabled.pop(guild_id, None)
+
+
+def disabled_in(guild_id: int, channel_id: int, target: str) -> Optional[str]:
+    """
+    Returns "server" or "channel" if the command or category is disabled there.
+    """
+
+    if (targets := disabled.get(guild_id, None)) is None:
+        return None
+
+    if (channels := targets.get(target, None)) is None:
+        return None
+
+    if SERVER in channels:
+        return "server"
+    elif channel_id in channels:
+        return "channel"
+
+    return None
+
+
+bus.listen(db.User.__tablename__, reload_users)
+bus.listen(db.Guild.__tablename__, reload_guilds)
+bus.listen_reset(load)
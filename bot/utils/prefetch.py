@@ -0,0 +1,75 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import asyncio
+import functools
+
+import api
+from bot.utils.logs import logger
+
+# results, key, fetch: the result of fetch() is stored as results[key]
+Job = Tuple[Dict[Hashable, Any], Hashable, Callable[[], Awaitable[Any]]]
+
+
+class Prefetcher:
+    """
+    Fetches data a view is likely to need next, one request at a time.
+
+    Requests are only sent while the Vortex rate limiter is at most half full,
+    so prefetching never delays requests made on behalf of users.
+    """
+
+    IDLE_DELAY = 0.5  # seconds between rate limiter checks
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.current: Optional[Tuple[Hashable, asyncio.Task]] = None
+
+    def start(self, jobs: Iterable[Job]) -> None:
+        self.cancel()
+        self.task = asyncio.create_task(self._run(list(jobs)))
+
+    async def _run(self, jobs: Iterable[Job]) -> None:
+        headroom = api.vortex_limit.max_rate / 2
+
+        for results, key, fetch in jobs:
+            if key in results:
+                continue
+
+            while not api.vortex_limit.has_capacity(headroom):
+                await asyncio.sleep(self.IDLE_DELAY)
+
+            task = asyncio.create_task(fetch())
+            task.add_done_callback(functools.partial(self._store, results, key))
+            self.current = key, task
+
+            try:
+                await task
+            except Exception as e:
+                logger.debug(f'Failed to prefetch "{key}"', exc_info=e)
+            finally:
+                self.current = None
+
+    @staticmethod
+    def _store(results: Dict[Hashable, Any], key: Hashable, task: asyncio.Task):
+        # runs before any waiter resumes, so wait() always sees the result
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if (result := task.result()) is not None and key not in results:
+            results[key] = result
+
+    async def wait(self, key: Hashable) -> None:
+        """
+        Waits for the prefetch of `key` if it is in flight.
+        """
+
+        if self.current is not None and self.current[0] == key:
+            await asyncio.wait({self.current[1]})
+
+    def cancel(self) -> None:
+        if self.current is not None:
+            self.current[1].cancel()
+            self.current = None
+
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
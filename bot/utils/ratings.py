@@ -0,0 +1,69 @@
+from typing import Mapping
+
+import numpy as np
+
+import api
+
+
+def rating(
+    battles: np.ndarray,
+    wins: np.ndarray,
+    survived: np.ndarray,
+    damage: np.ndarray,
+    exp: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorised bot.utils.functions.rating, element-wise over equal-length arrays
+    of totals. Rows without battles are NaN.
+    """
+
+    battles = np.asarray(battles, dtype=np.float64)
+    played = battles > 0
+
+    result = np.full(battles.shape, np.nan)
+    battles = battles[played]
+
+    def average(values: np.ndarray) -> np.ndarray:
+        return np.asarray(values, dtype=np.float64)[played] / battles
+
+    win_rate, survival_rate = average(wins), average(survived)
+    avg_damage, avg_exp = average(damage), average(exp)
+
+    a = np.arcsinh(0.0015 * avg_exp)
+    b = 3700 * np.arcsinh(0.0006 * avg_damage) + np.tanh(0.002 * battles)
+    c = 3500 / (1 + np.exp(16 - 31 * win_rate)) + 1400 / (
+        1 + np.exp(8 - 27 * survival_rate)
+    )
+    d = b + c * a
+    e = np.tanh(0.00163 * battles**-0.37 * d)
+
+    result[played] = 540 * battles**0.37 * e
+    return result
+
+
+def block_rating(block: Mapping[str, int]) -> float:
+    """
+    Returns the rating of a single statistics block, NaN without battles.
+    """
+
+    return rating(
+        [block["battles_count"]],
+        [block["wins"]],
+        [block["survived"]],
+        [block["damage_dealt"]],
+        [block["original_exp"]],
+    )[0]
+
+
+def ship_ratings(statistics: api.ShipsStatistics) -> np.ndarray:
+    """
+    Returns the rating of every ship, aligned with statistics.ship_ids.
+    """
+
+    return rating(
+        statistics["battles_count"],
+        statistics["wins"],
+        statistics["survived"],
+        statistics["damage_dealt"],
+        statistics["original_exp"],
+    )
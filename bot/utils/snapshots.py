@@ -0,0 +1,71 @@
+from typing import Any, Optional
+import json
+import os
+import time
+import zlib
+
+from bot.utils.logs import logger
+
+_SNAPSHOTS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../assets/private/snapshots"
+)
+FORMAT_VERSION = 1
+
+
+def _path(name: str) -> str:
+    return os.path.join(_SNAPSHOTS_PATH, f"{name}.json.z")
+
+
+def save(name: str, version: int, data: Any) -> bool:
+    """
+    Atomically writes reference data as zlib-compressed JSON.
+
+    `version` identifies the layout of `data`. It should be bumped whenever
+    that layout changes, so that old snapshots are ignored instead of misread.
+    """
+
+    document = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "saved_at": time.time(),
+        "data": data,
+    }
+    payload = zlib.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"))
+
+    try:
+        os.makedirs(_SNAPSHOTS_PATH, exist_ok=True)
+
+        temp_path = f"{_path(name)}.tmp"
+        with open(temp_path, "wb") as fp:
+            fp.write(payload)
+        os.replace(temp_path, _path(name))
+    except OSError as e:
+        logger.warning(f'Failed to save snapshot "{name}"', exc_info=e)
+        return False
+
+    return True
+
+
+def load(name: str, version: int) -> Optional[Any]:
+    """
+    Reads a snapshot, returning None if it is missing, unreadable or outdated.
+    """
+
+    try:
+        with open(_path(name), "rb") as fp:
+            document = json.loads(zlib.decompress(fp.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, zlib.error) as e:
+        logger.warning(f'Failed to load snapshot "{name}"', exc_info=e)
+        return None
+
+    if (
+        document.get("format", None) != FORMAT_VERSION
+        or document.get("version", None) != version
+    ):
+        return None
+
+    age = (time.time() - document["saved_at"]) / 3600
+    logger.info(f'Loaded snapshot "{name}" ({age:.1f} hours old)')
+    return document["data"]
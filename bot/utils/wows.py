@@ -123,7 +123,7 @@ class Ship:
         user = await db.User.get_or_create(id=interaction.user.id)
 
         if user.locale:
-            return user.locale
+            return self.translations[user.locale]
 
         wows_locale = DISCORD_TO_WOWS.get(str(interaction.locale), "en")
         return self.translations[wows_locale]
@@ -161,6 +161,7 @@ def get_ships():
 
 
 ships: dict[str, Ship] = get_ships()
+ships_by_id: dict[int, Ship] = {ship.id: ship for ship in ships.values()}
 
 
 class ShipTransformer(app_commands.Transformer):
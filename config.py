@@ -2,7 +2,10 @@ import os
 
 import environ
 
-SECRETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "secrets.ini")
+SECRETS_PATH = os.environ.get(
+    "SECRETS_PATH",
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "secrets.ini"),
+)
 ENVIRONMENT = os.environ.get("ENVIRONMENT", default="testing")
 ini_secrets = environ.secrets.INISecrets.from_path(SECRETS_PATH, ENVIRONMENT)
 
@@ -19,11 +22,19 @@ class TrackConfig:
 
     discord = environ.group(Discord)
 
+    @environ.config(prefix="PROCESS")
+    class Process:
+        name = environ.var("main")  # unique and stable per bot process
+
+    process = environ.group(Process)
+
     @environ.config(prefix="REDIS")
     class Redis:
         port = 6379
         password = ini_secrets.secret(name="redis_password")
         host = ini_secrets.secret(name="redis_host")
+        socket_timeout = environ.var(0.5, converter=float)  # seconds per command
+        connect_timeout = environ.var(1.0, converter=float)  # seconds
 
     redis = environ.group(Redis)
 
@@ -45,11 +56,50 @@ class TrackConfig:
 
     twitter = environ.group(Twitter)
 
+    @environ.config(prefix="LADDER")
+    class Ladder:
+        max_age = environ.var(900, converter=int)  # seconds a position stays usable
+
+    ladder = environ.group(Ladder)
+
+    @environ.config(prefix="HISTORY")
+    class History:
+        budget = environ.var(120, converter=int)  # Vortex requests per hour
+        interval = environ.var(6 * 60 * 60, converter=int)  # seconds per player
+
+    history = environ.group(History)
+
+    @environ.config(prefix="STALE")
+    class Stale:
+        soft_ttl = environ.var(60, converter=int)  # seconds served without refetch
+        hard_ttl = environ.var(900, converter=int)  # seconds served at all
+
+    stale = environ.group(Stale)
+
+    @environ.config(prefix="DATABASE")
+    class Database:
+        synchronous = environ.var("NORMAL")  # safe with WAL, may lose last commits
+        cache_size = environ.var(-16000, converter=int)  # pages, or KiB if negative
+        mmap_size = environ.var(256 * 1024 * 1024, converter=int)  # bytes
+        busy_timeout = environ.var(5000, converter=int)  # milliseconds
+        commit_delay = environ.var(5, converter=int)  # milliseconds to group writes
+        max_batch = environ.var(500, converter=int)  # operations per transaction
+
+    database = environ.group(Database)
+
+    @environ.config(prefix="CACHE")
+    class Cache:
+        entity_ttl = environ.var(60 * 60, converter=int)  # seconds, users and guilds
+        local_bytes = environ.var(1024 * 1024, converter=int)  # per namespace
+
+    cache = environ.group(Cache)
+
 
 cfg: TrackConfig = TrackConfig.from_environ(
     environ={
         "CREATED": 1663989263,
         "DISCORD_OWNER_IDS": {212466672450142208, 113104128783159296},
         "CHANNELS_FAILED_RENDERS": 1010834704804614184,
+        "PROCESS_NAME": os.environ.get("PROCESS_NAME", default="main"),
     }
 )
@@ -0,0 +1,100 @@
+"""
+Measures user update throughput of separate commits against bot.utils.db.writer.
+
+Usage: python scripts/benchmarks/db.py [--writes N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(1, os.path.join(sys.path[0], "../.."))
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from bot.utils import db
+
+
+USERS = 1000
+
+
+async def prepare(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(db.Base.metadata.create_all)
+        await conn.execute(
+            insert(db.User.__table__),
+            [{**db.User.defaults(), "id": user_id} for user_id in range(USERS)],
+        )
+
+
+def statement(index: int):
+    table = db.User.__table__
+    return (
+        update(table)
+        .where(table.c.id == index % USERS)
+        .values(guess_count=table.c.guess_count + 1)
+    )
+
+
+async def separate(engine, writes: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def write(index: int):
+        async with semaphore:
+            async with engine.begin() as conn:
+                await conn.execute(statement(index))
+
+    await asyncio.gather(*(write(index) for index in range(writes)))
+
+
+async def batched(engine, writes: int, concurrency: int):
+    db.engine = engine
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def write(index: int):
+        async with semaphore:
+            await db.writer.submit(lambda conn: conn.execute(statement(index)))
+
+    await asyncio.gather(*(write(index) for index in range(writes)))
+    await db.writer.stop()
+
+
+async def measure(name: str, engine, function, writes: int, concurrency: int):
+    await prepare(engine)
+
+    start = time.perf_counter()
+    await function(engine, writes, concurrency)
+    elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+    print(f"{name:<28}{writes / elapsed:>12.0f}")
+
+
+async def main(writes: int, concurrency: int):
+    print(f"{'mode':<28}{'writes/s':>12}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "default.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        await measure(
+            "default, separate commits", engine, separate, writes, concurrency
+        )
+
+        engine = db.create_engine(os.path.join(directory, "tuned.db"))
+        await measure("tuned, separate commits", engine, separate, writes, concurrency)
+
+        engine = db.create_engine(os.path.join(directory, "writer.db"))
+        await measure("tuned, writer task", engine, batched, writes, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks database writes.")
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.writes, args.concurrency))
@@ -0,0 +1,130 @@
+"""
+Times parsing responses with json and orjson, and decoding them with api.decoders.
+
+If dacite is installed, also times the json + dacite path api.decoders replaced,
+as the "before" column. It is no longer a dependency: pip install dacite
+
+Usage: python scripts/benchmarks/decoders.py [--payloads DIR] [--number N]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(1, os.path.join(sys.path[0], "../.."))
+
+try:
+    import dacite
+except ImportError:
+    dacite = None
+
+from api import decoders, models, utils, vortex
+import payloads
+
+
+def player_data(raw: dict) -> dict:
+    # mirrors the dictionary assembled by api.vortex.get_player
+    player_id, data = next(iter(raw["data"].items()))
+
+    return {
+        "statistics": {
+            index: data["statistics"][index]
+            for battle_type, type_data in vortex.BATTLE_TYPES.items()
+            for size, index in type_data["sizes"].items()
+        },
+        **data["statistics"]["basic"],
+        "activated_at": data["activated_at"],
+        "is_empty": False,
+        "region": "eu",
+        "id": int(player_id),
+        "name": data["name"],
+        "hidden_profile": False,
+        "clan_role": None,
+        "used_access_code": None,
+    }
+
+
+def clan_view(raw: dict) -> dict:
+    view = raw["clanview"]
+    view["region"] = "eu"
+    return view
+
+
+CASES = {
+    "clan_members": lambda raw: decoders.decode_clan_members(raw["items"]),
+    "clan": lambda raw: decoders.decode_full_clan(clan_view(raw)),
+    "seasons": lambda raw: decoders.decode_seasons(raw),
+    "glossary": lambda raw: decoders.decode_buildings(raw["data"]),
+    "player": lambda raw: decoders.decode_player(player_data(raw)),
+}
+
+if dacite is not None:
+    # the config api.utils used before the hand-written decoders
+    config = dacite.Config(
+        type_hooks={
+            utils.SI: lambda x: int(x),
+            utils.IT: lambda x: datetime.datetime.fromtimestamp(x),
+            utils.ST: lambda x: datetime.datetime.fromisoformat(x),
+        },
+        check_types=False,
+    )
+
+    DACITE_CASES = {
+        "clan_members": lambda raw: [
+            dacite.from_dict(models.ClanMemberStatistics, data, config)
+            for data in raw["items"]
+        ],
+        "clan": lambda raw: dacite.from_dict(models.FullClan, clan_view(raw), config),
+        "seasons": lambda raw: dacite.from_dict(models.SeasonsData, raw, config),
+        "glossary": lambda raw: dacite.from_dict(
+            models.BuildingsData, raw["data"], config
+        ),
+        "player": lambda raw: dacite.from_dict(
+            models.FullPlayer, player_data(raw), config
+        ),
+    }
+
+
+def measure(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main(directory: str, number: int):
+    if dacite is None:
+        print("dacite is not installed, skipping the before column")
+
+    print(
+        f"{'payload':<14}{'bytes':>10}{'json (us)':>12}{'orjson (us)':>14}"
+        f"{'decode (us)':>14}{'before (us)':>14}{'after (us)':>14}"
+    )
+
+    for name, body in payloads.load(directory).items():
+        decode = CASES[name]
+
+        stdlib = measure(lambda: json.loads(body), number)
+        parse = measure(lambda: decoders.loads(body), number)
+        # decoders may modify the parsed response, so each run parses again
+        after = measure(lambda: decode(decoders.loads(body)), number)
+
+        if dacite is not None:
+            slow = DACITE_CASES[name]
+            before = f"{measure(lambda: slow(json.loads(body)), number):>14.1f}"
+        else:
+            before = f"{'-':>14}"
+
+        print(
+            f"{name:<14}{len(body):>10}{stdlib:>12.1f}{parse:>14.1f}"
+            f"{after - parse:>14.1f}{before}{after:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks API decoders.")
+    parser.add_argument("--payloads", help="Directory of recorded responses.")
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    main(args.payloads, args.number)
@@ -0,0 +1,86 @@
+"""
+Measures the memory retained per cached player, clan and clan roster.
+
+The baseline mirrors the previous models: regular dataclasses with a
+per-instance __dict__ and plain dictionaries for statistics blocks.
+
+Usage: python scripts/benchmarks/models.py [--payloads DIR] [--count N]
+"""
+
+import argparse
+import dataclasses
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(1, os.path.join(sys.path[0], "../.."))
+
+from api import decoders, models
+from decoders import clan_view, player_data
+import payloads
+
+
+_baseline_types = {}
+
+
+def baseline(obj):
+    if isinstance(obj, models.StatBlock):
+        return dict(obj)
+    elif dataclasses.is_dataclass(obj):
+        cls = type(obj)
+        if cls not in _baseline_types:
+            _baseline_types[cls] = type(cls.__name__, (), {})
+
+        copy = _baseline_types[cls]()
+        for field in dataclasses.fields(obj):
+            setattr(copy, field.name, baseline(getattr(obj, field.name)))
+        return copy
+    elif isinstance(obj, list):
+        return [baseline(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: baseline(value) for key, value in obj.items()}
+    else:
+        return obj
+
+
+CASES = {
+    "player": lambda body: decoders.decode_player(player_data(decoders.loads(body))),
+    "clan": lambda body: decoders.decode_full_clan(clan_view(decoders.loads(body))),
+    "clan_members": lambda body: decoders.decode_clan_members(
+        decoders.loads(body)["items"]
+    ),
+}
+
+
+def retained(build, bodies) -> float:
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(body) for body in bodies]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del objects
+    return size / len(bodies)
+
+
+def main(directory: str, count: int):
+    print(f"{'model':<14}{'before (B)':>12}{'after (B)':>12}{'saved':>8}")
+
+    for name, decode in CASES.items():
+        bodies = [payloads.load(directory, seed)[name] for seed in range(count)]
+
+        before = retained(lambda body: baseline(decode(body)), bodies)
+        after = retained(decode, bodies)
+
+        print(f"{name:<14}{before:>12.0f}{after:>12.0f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks API model memory.")
+    parser.add_argument("--payloads", help="Directory of recorded responses.")
+    parser.add_argument("--count", type=int, default=50)
+    args = parser.parse_args()
+
+    main(args.payloads, args.count)
@@ -0,0 +1,288 @@
+"""
+Representative API payloads for the benchmarks in this directory.
+
+Recorded responses can be used instead by saving them as JSON to a directory
+and passing it with --payloads. Expected files are:
+- clan_members.json: /api/members/{clan_id}/
+- clan.json: /api/clanbase/{clan_id}/claninfo/
+- seasons.json: /wows/clans/season/
+- glossary.json: /wows/clans/glossary/
+- player.json: /api/accounts/{player_id}/
+"""
+
+import json
+import os
+import random
+
+
+BATTLE_TYPES = [
+    "pvp",
+    "pvp_solo",
+    "pvp_div2",
+    "pvp_div3",
+    "pve",
+    "rank_solo",
+    "rank_old_solo",
+    "rank_old_div2",
+]
+ARMAMENTS = ["main", "atba", "tpd", "dbomb", "planes", "ram"]
+METRICS = [
+    "original_exp",
+    "damage_dealt",
+    "frags",
+    "planes_killed",
+    "ships_spotted",
+    "scouting_damage",
+    "art_agro",
+    "tpd_agro",
+]
+
+
+def stat_block(rng: random.Random) -> dict:
+    battles = rng.randint(100, 20_000)
+    block = {
+        "battles_count": battles,
+        "wins": battles // 2,
+        "losses": battles // 3,
+        "survived": battles // 3,
+        "exp": battles * 1_500,
+        "max_exp": 4_000,
+        "premium_exp": battles * 2_000,
+        "max_premium_exp": 6_000,
+        "control_captured_points": battles * 10,
+        "control_dropped_points": battles * 8,
+        "team_capture_points": battles * 40,
+        "team_dropped_capture_points": battles * 30,
+        "battles_count_0910": battles // 4,
+        "battles_count_078": battles // 8,
+        "battles_count_0711": battles // 2,
+        "battles_count_512": battles // 2,
+        "wins_by_tasks": battles // 40,
+        "dropped_capture_points": battles * 5,
+        "capture_points": battles * 6,
+        "max_total_agro": 3_000_000,
+        "max_ships_spotted_ship_id": 4_181_604_048,
+        "max_frags_ship_id": 4_181_604_048,
+        "max_damage_dealt_ship_id": 4_181_604_048,
+    }
+
+    for metric in METRICS:
+        block[metric] = rng.randint(0, battles * 60_000)
+        block[f"max_{metric}"] = rng.randint(0, 300_000)
+
+    for armament in ARMAMENTS:
+        block[f"frags_by_{armament}"] = rng.randint(0, battles)
+        block[f"max_frags_by_{armament}"] = rng.randint(0, 6)
+        block[f"hits_by_{armament}"] = rng.randint(0, battles * 50)
+        block[f"shots_by_{armament}"] = rng.randint(0, battles * 200)
+
+    return block
+
+
+def player(rng: random.Random) -> dict:
+    player_id = str(rng.randint(500_000_000, 600_000_000))
+
+    return {
+        "status": "ok",
+        "data": {
+            player_id: {
+                "name": "player_" + player_id,
+                "activated_at": 1_400_000_000,
+                "statistics": {
+                    "basic": {
+                        "created_at": 1_400_000_000,
+                        "last_battle_time": 1_700_000_000,
+                        "karma": 42,
+                        "leveling_points": 12_000,
+                        "leveling_tier": 15,
+                    },
+                    **{battle_type: stat_block(rng) for battle_type in BATTLE_TYPES},
+                },
+            }
+        },
+    }
+
+
+def clan_member(rng: random.Random) -> dict:
+    return {
+        "id": rng.randint(500_000_000, 600_000_000),
+        "name": f"member_{rng.randint(0, 10 ** 6)}",
+        "last_battle_time": 1_700_000_000,
+        "days_in_clan": rng.randint(0, 3_000),
+        "battles_count": rng.randint(0, 20_000),
+        "battles_per_day": rng.random() * 10,
+        "damage_per_battle": rng.random() * 100_000,
+        "frags_per_battle": rng.random() * 2,
+        "exp_per_battle": rng.random() * 2_000,
+        "wins_percentage": rng.random() * 100,
+        "role": "private",
+        "rank": 5,
+        "is_press": False,
+        "is_hidden_statistics": False,
+        "online_status": "offline",
+        "season_id": 22,
+        "abnormal_results": False,
+    }
+
+
+def clan_members(rng: random.Random, count: int = 50) -> dict:
+    return {"items": [clan_member(rng) for _ in range(count)]}
+
+
+def rating(team_number: int, season: int) -> dict:
+    return {
+        "team_number": team_number,
+        "league": 1,
+        "division": 2,
+        "season_number": season,
+        "status": "active",
+        "is_qualified": True,
+        "last_win_at": "2023-09-01T18:30:00+00:00",
+        "battles_count": 50,
+        "wins_count": 30,
+        "current_winning_streak": 2,
+        "longest_winning_streak": 7,
+        "initial_public_rating": 1_100,
+        "public_rating": 2_100,
+        "division_rating": 55,
+        "division_rating_max": 100,
+        "max_position": {
+            "division_rating": 80,
+            "public_rating": 2_200,
+            "league": 1,
+            "division": 1,
+        },
+        "id": 12_345,
+        "stage": None,
+        "realm": "eu",
+    }
+
+
+def clan(rng: random.Random) -> dict:
+    ladder = rating(1, 22)
+    ladder.update(
+        {
+            "color": "#cc9966",
+            "leading_team_number": 1,
+            "total_battles_count": 800,
+            "last_battle_at": "2023-09-01T18:30:00+00:00",
+            "ratings": [
+                rating(team, season) for team in (1, 2) for season in range(10, 23)
+            ],
+        }
+    )
+
+    return {
+        "clanview": {
+            "clan": {
+                "id": rng.randint(500_000_000, 600_000_000),
+                "name": "Benchmark Clan",
+                "tag": "BENCH",
+                "color": "#cc9966",
+                "description": "description " * 50,
+                "raw_description": "description " * 50,
+                "created_at": "2018-01-01T00:00:00+00:00",
+                "members_count": 50,
+                "max_members_count": 50,
+                "recruiting_policy": "restricted",
+                "recruiting_restrictions": {"battles_count": 1_000},
+            },
+            "wows_ladder": ladder,
+            "achievements": [{"count": 1, "cd": cd} for cd in range(40)],
+            "buildings": {
+                name: {
+                    "id": index,
+                    "name": name,
+                    "level": 2,
+                    "modifiers": [index * 10 + level for level in range(3)],
+                }
+                for index, name in enumerate(
+                    [
+                        "headquarters",
+                        "shipbuilding_factory",
+                        "coal_yard",
+                        "steel_yard",
+                        "university",
+                        "paragon_yard",
+                        "monument",
+                        "treasury",
+                        "dry_dock",
+                        "design_department",
+                    ]
+                )
+            },
+        }
+    }
+
+
+def seasons(rng: random.Random) -> dict:
+    return {
+        "status": "ok",
+        "data": {
+            str(season_id): {
+                "season_id": season_id,
+                "name": f"Season {season_id}",
+                "start_time": 1_500_000_000 + season_id * 1_000_000,
+                "finish_time": 1_500_500_000 + season_id * 1_000_000,
+                "ship_tier_min": 10,
+                "ship_tier_max": 10,
+                "division_points": 50,
+                "leagues": [
+                    {"name": name, "icon": f"{name}.png", "color": "#ffffff"}
+                    for name in ["Hurricane", "Typhoon", "Storm", "Gale", "Squall"]
+                ],
+            }
+            for season_id in [*range(1, 26), *range(101, 126)]
+        },
+    }
+
+
+def glossary(rng: random.Random) -> dict:
+    types = {
+        str(type_id): {"building_type_id": type_id, "name": f"type_{type_id}"}
+        for type_id in range(1, 13)
+    }
+    buildings = {
+        str(type_id * 100 + level): {
+            "building_id": type_id * 100 + level,
+            "building_type_id": type_id,
+            "name": f"building_{type_id}_{level}",
+            "cost": level * rng.randint(1_000, 10_000),
+        }
+        for type_id in range(1, 13)
+        for level in range(4)
+    }
+
+    return {
+        "status": "ok",
+        "data": {
+            "building_types": types,
+            "buildings": buildings,
+            "clans_roles": {"commander": "Commander", "private": "Private"},
+        },
+    }
+
+
+GENERATORS = {
+    "clan_members": clan_members,
+    "clan": clan,
+    "seasons": seasons,
+    "glossary": glossary,
+    "player": player,
+}
+
+
+def load(directory: str = None, seed: int = 0) -> dict[str, bytes]:
+    rng = random.Random(seed)
+    payloads = {}
+
+    for name, generator in GENERATORS.items():
+        path = os.path.join(directory, f"{name}.json") if directory else None
+
+        if path and os.path.exists(path):
+            with open(path, "rb") as fp:
+                payloads[name] = fp.read()
+        else:
+            payloads[name] = json.dumps(generator(rng)).encode("utf-8")
+
+    return payloads
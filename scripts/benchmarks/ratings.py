@@ -0,0 +1,70 @@
+"""
+Compares the scalar rating in bot.utils.functions with bot.utils.ratings.
+
+Usage: python scripts/benchmarks/ratings.py [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(1, os.path.join(sys.path[0], "../.."))
+
+import numpy as np
+
+from bot.utils import functions, ratings
+
+
+SIZES = {
+    "clan roster": 50,
+    "ship list": 500,
+    "leaderboard": 100_000,
+}
+
+
+def generate(count: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+
+    battles = rng.integers(1, 20_000, count)
+    wins = (battles * rng.uniform(0.4, 0.65, count)).astype(np.int64)
+    survived = (battles * rng.uniform(0.2, 0.5, count)).astype(np.int64)
+    damage = battles * rng.integers(20_000, 120_000, count)
+    exp = battles * rng.integers(800, 2_000, count)
+
+    return battles, wins, survived, damage, exp
+
+
+def scalar(columns: tuple) -> list:
+    return [functions.rating(*map(int, row)) for row in zip(*columns)]
+
+
+def measure(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e3
+
+
+def main(number: int):
+    print(
+        f"{'rows':<14}{'count':>8}{'scalar (ms)':>14}{'numpy (ms)':>14}{'speedup':>10}"
+    )
+
+    for name, count in SIZES.items():
+        columns = generate(count)
+
+        assert np.allclose(scalar(columns), ratings.rating(*columns))
+
+        before = measure(lambda: scalar(columns), number)
+        after = measure(lambda: ratings.rating(*columns), number)
+
+        print(
+            f"{name:<14}{count:>8}{before:>14.3f}{after:>14.3f}"
+            f"{before / after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks rating computation.")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args.number)
@@ -6,7 +6,7 @@ sys.path.insert(1, os.path.join(sys.path[0], ".."))
 
 from sqlalchemy import select
 
-from bot.utils import db
+from bot.utils import bus, db
 
 
 async def main():
@@ -29,6 +29,11 @@ async def main():
 
         await session.commit()
 
+    # running bot processes still cache the old rows
+    bus.enable()
+    await db.User.evict([user.id for (user,) in users])
+    await db.Guild.evict([guild.id for (guild,) in guilds])
+
 
 if __name__ == "__main__":
     asyncio.run(main())
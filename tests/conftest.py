@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(1, ROOT)
+
+# config reads its secrets on import, the empty template is enough for tests
+os.environ.setdefault("SECRETS_PATH", os.path.join(ROOT, "secrets_template.ini"))
+os.environ.setdefault("ENVIRONMENT", "testing")
@@ -0,0 +1,252 @@
+import asyncio
+import datetime
+import time
+
+import orjson
+import pytest
+
+from api import codec, decoders, models
+from bot.utils import bus, cache, db
+from config import cfg
+from test_decoders import full_clan, rating
+
+
+class FakeRedis:
+    """
+    The commands used by the shared tier, in memory.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.failing = False
+
+    def _check(self):
+        if self.failing:
+            raise ConnectionError("Redis is down")
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key, None)
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+
+    async def delete(self, key):
+        self._check()
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(bus, "enabled", True)
+    monkeypatch.setattr(bus, "connection", lambda: fake)
+    monkeypatch.setattr(cache, "_shared_down_until", 0)
+    return fake
+
+
+def text_cache(namespace: str, local_bytes: int = 1024) -> cache.TwoLevelCache:
+    return cache.TwoLevelCache(
+        namespace, 60, local_bytes, lambda value: value.encode(), bytes.decode
+    )
+
+
+def test_pack_round_trip_compresses_large_values():
+    small, large = b"x" * 10, b"x" * cache.COMPRESS_MIN
+
+    assert cache.pack(small) == cache.RAW + small
+    assert cache.pack(large)[:1] == cache.COMPRESSED
+    assert len(cache.pack(large)) < len(large)
+    assert cache.unpack(cache.pack(small)) == small
+    assert cache.unpack(cache.pack(large)) == large
+
+    with pytest.raises(ValueError):
+        cache.unpack(b"\x80\x04pickle")
+
+
+def test_local_tier_only_without_the_bus(monkeypatch):
+    monkeypatch.setattr(bus, "enabled", False)
+    texts = text_cache("test-local")
+
+    async def run():
+        assert await texts.get("a") is cache.MISSING
+        await texts.set("a", "value")
+        assert await texts.get("a") == "value"
+
+    asyncio.run(run())
+    assert texts.local_metrics.hits == 1 and texts.local_metrics.misses == 1
+
+
+def test_shared_tier_warms_other_processes(redis):
+    writer, reader = text_cache("test-shared"), text_cache("test-shared")
+
+    async def run():
+        await writer.set("a", "value")
+        assert reader.peek("a") is cache.MISSING
+        assert await reader.get("a") == "value"
+        assert reader.peek("a") == "value"  # now held locally
+
+        await writer.delete("a")
+        reader.discard("a")
+        assert await reader.get("a") is cache.MISSING
+
+    asyncio.run(run())
+    assert reader.shared_metrics.hits == 1 and reader.shared_metrics.misses == 1
+
+
+def test_values_larger_than_the_local_budget_stay_shared(redis):
+    texts = text_cache("test-budget", local_bytes=8)
+
+    async def run():
+        await texts.set("a", "too large for the local tier")
+        assert texts.peek("a") is cache.MISSING
+        assert await texts.get("a") == "too large for the local tier"
+
+    asyncio.run(run())
+
+
+def test_invalid_shared_entries_are_misses(redis):
+    texts = text_cache("test-invalid")
+    redis.data[texts._shared_key("a")] = b"\x80\x04pickle"
+    redis.data[texts._shared_key("b")] = cache.RAW + b"\xff"
+
+    async def run():
+        assert await texts.get("a") is cache.MISSING
+        assert await texts.get("b") is cache.MISSING
+
+    asyncio.run(run())
+    assert texts.shared_metrics.errors == 2
+
+
+def test_shared_tier_is_skipped_after_an_error(redis):
+    texts = text_cache("test-failure")
+    redis.failing = True
+
+    async def run():
+        await texts.set("a", "value")  # kept locally
+        assert await texts.get("a") == "value"
+
+        redis.failing = False
+        await texts.set("b", "value")
+
+    asyncio.run(run())
+    assert texts.shared_metrics.errors == 1
+    assert redis.data == {}  # skipped until SHARED_RETRY_DELAY passes
+
+
+def test_stalled_redis_times_out_like_an_error(monkeypatch):
+    monkeypatch.setattr(bus, "enabled", True)
+    monkeypatch.setattr(bus, "_redis", None)
+    monkeypatch.setattr(cache, "_shared_down_until", 0)
+    monkeypatch.setattr(cfg.redis, "socket_timeout", 0.2)
+    texts = text_cache("test-stalled")
+
+    async def run():
+        # accepts connections, never answers
+        server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1")
+        port = server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(bus, "_url", f"redis://127.0.0.1:{port}/")
+
+        start = time.monotonic()
+        assert await texts.get("a") is cache.MISSING
+        assert time.monotonic() - start < 2
+
+        server.close()
+        await bus.connection().aclose()
+
+    asyncio.run(run())
+    assert texts.shared_metrics.errors == 1
+
+
+def test_records_round_trip_and_reject_other_rows():
+    record = db.User.to_record(
+        {column.name: None for column in db.User.__table__.columns}
+        | {"id": 1, "guess_count": 3, "guess_record": 4.5, "locale": "de"}
+    )
+
+    copy = db.User.decode_record(db.User.encode_record(record))
+    assert copy.to_dict() == record.to_dict()
+    assert db.User.decode_record(db.User.encode_record(None)) is None
+
+    with pytest.raises(ValueError):
+        db.User.decode_record(orjson.dumps({"id": 1, "command": "rm -rf"}))
+
+
+def clan_role() -> models.ClanRole:
+    return decoders.decode_clan_role(
+        {
+            "clan": {"color": 1, "name": "Clan", "members_count": 40, "tag": "CLAN"},
+            "clan_id": 500,
+            "joined_at": "2021-05-01T12:00:00+00:00",
+            "role": "commander",
+        }
+    )
+
+
+def player_fields() -> dict:
+    return {
+        "region": "eu",
+        "id": 1,
+        "name": "player",
+        "hidden_profile": False,
+        "clan_role": clan_role(),
+        "is_empty": False,
+        "used_access_code": None,
+    }
+
+
+def test_api_models_round_trip():
+    member = models.ClanMemberStatistics(
+        id=1,
+        name="player",
+        last_battle_time=datetime.datetime.fromtimestamp(1_670_000_000),
+        days_in_clan=10,
+        battles_count=None,
+        battles_per_day=None,
+        damage_per_battle=None,
+        frags_per_battle=None,
+        exp_per_battle=None,
+        wins_percentage=None,
+    )
+    values = [
+        models.Player(**player_fields(), fetched_at=100.0),
+        models.Player(**{**player_fields(), "clan_role": None}),
+        models.PartialPlayer(**player_fields(), statistics={"pvp": member}),
+        models.FullPlayer(
+            **player_fields(),
+            statistics={"pvp": models.StatBlock({"battles_count": 10, "wins": 6})},
+            activated_at=datetime.datetime.fromtimestamp(1_500_000_000),
+            created_at=datetime.datetime.fromtimestamp(1_400_000_000),
+            last_battle_time=datetime.datetime.fromtimestamp(1_670_000_000),
+            karma=5,
+            leveling_points=100,
+            leveling_tier=15,
+        ),
+        decoders.decode_full_clan(full_clan(None)),
+        decoders.decode_full_clan(
+            full_clan(
+                rating(
+                    color=255,
+                    leading_team_number=1,
+                    total_battles_count=30,
+                    last_battle_at="2022-12-01T20:00:00+00:00",
+                    ratings=[rating()],
+                )
+            )
+        ),
+    ]
+
+    for value in values:
+        copy = codec.decode(codec.encode(value))
+        assert type(copy) is type(value)
+        assert copy == value
+        assert copy.fetched_at == value.fetched_at
+
+
+def test_codec_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        codec.encode({"type": "player"})
+
+    with pytest.raises(KeyError):
+        codec.decode(orjson.dumps({"type": "os.system", "data": {}}))
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from bot.utils import db
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    engine = db.engine
+    monkeypatch.setattr(db, "engine", db.create_engine(str(tmp_path / "test.db")))
+    # bound to the event loop of the test that used it
+    monkeypatch.setattr(db, "writer", db.Writer())
+    db.async_session.configure(bind=db.engine)
+    db.User.cache.clear()
+
+    async def create():
+        async with db.engine.begin() as conn:
+            await conn.run_sync(db.Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield
+    db.async_session.configure(bind=engine)
+    db.User.cache.clear()
+
+
+def test_update_caches_the_committed_row_without_reading_it():
+    statements = []
+    event.listen(
+        db.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    async def test():
+        try:
+            created = await db.User.update(1, locale="de")
+            assert (created.id, created.locale, created.guess_count) == (1, "de", 0)
+
+            updated = await db.User.update(1, guess_count=3)
+            assert (updated.locale, updated.guess_count) == ("de", 3)
+            assert db.User.cache.peek(db._key(id=1)) is updated
+
+            assert statements and not any(
+                s.lstrip().upper().startswith("SELECT") for s in statements
+            )
+            assert (await db.User.get(id=1)).guess_count == 3
+        finally:
+            await db.writer.stop()
+
+    asyncio.run(test())
@@ -0,0 +1,192 @@
+import datetime
+
+import orjson
+import pytest
+
+from api import decoders, models
+
+
+def clan_member(**overrides) -> dict:
+    return {
+        "id": 1,
+        "name": "member",
+        "last_battle_time": 1_670_000_000,
+        "days_in_clan": 30,
+        "battles_count": 1000,
+        "battles_per_day": 2.5,
+        "damage_per_battle": 45_000.5,
+        "frags_per_battle": 0.9,
+        "exp_per_battle": 1_200.0,
+        "wins_percentage": 55.5,
+        "role": "commander",  # not in the model
+        **overrides,
+    }
+
+
+def rating(**overrides) -> dict:
+    return {
+        "team_number": 1,
+        "league": 2,
+        "division": 3,
+        "season_number": 20,
+        "status": "active",
+        "is_qualified": True,
+        "last_win_at": "2022-12-01T18:00:00+00:00",
+        "battles_count": 10,
+        "wins_count": 6,
+        "current_winning_streak": 2,
+        "longest_winning_streak": 4,
+        "initial_public_rating": 1000,
+        "public_rating": 1100,
+        "division_rating": 50,
+        "division_rating_max": 100,
+        "max_position": {
+            "division_rating": 60,
+            "public_rating": 1150,
+            "league": 2,
+            "division": 2,
+        },
+        **overrides,
+    }
+
+
+def full_clan(wows_ladder) -> dict:
+    return {
+        "region": "eu",
+        "wows_ladder": wows_ladder,
+        "achievements": [{"count": 2, "cd": 5}],
+        "buildings": {
+            "headquarters": {
+                "id": 3,
+                "name": "headquarters",
+                "level": 2,
+                "modifiers": [7],
+            }
+        },
+        "clan": {
+            "id": 500,
+            "name": "Clan",
+            "tag": "CLAN",
+            "color": 13_421_772,
+            "description": "description",
+            "raw_description": "raw description",
+            "created_at": "2020-01-01T00:00:00+00:00",
+            "members_count": 40,
+            "max_members_count": 50,
+            "recruiting_policy": "open",
+            "recruiting_restrictions": {},
+        },
+    }
+
+
+def test_clan_member_converts_timestamps_and_ignores_unknown_keys():
+    member = decoders.decode_clan_member(clan_member())
+
+    assert member == models.ClanMemberStatistics(
+        id=1,
+        name="member",
+        last_battle_time=datetime.datetime.fromtimestamp(1_670_000_000),
+        days_in_clan=30,
+        battles_count=1000,
+        battles_per_day=2.5,
+        damage_per_battle=45_000.5,
+        frags_per_battle=0.9,
+        exp_per_battle=1_200.0,
+        wins_percentage=55.5,
+    )
+
+
+def test_clan_member_missing_optional_keys_are_none():
+    data = {"id": 2, "name": "hidden", "days_in_clan": 1}
+    member = decoders.decode_clan_member(data)
+
+    assert member.last_battle_time is None
+    assert member.battles_count is None
+    assert member.wins_percentage is None
+
+
+def test_clan_member_requires_mandatory_keys():
+    with pytest.raises(KeyError):
+        decoders.decode_clan_member({"id": 3, "name": "broken"})
+
+
+def test_full_clan_with_ladder():
+    master = rating(
+        color=255,
+        leading_team_number=1,
+        total_battles_count=30,
+        last_battle_at=None,
+        ratings=[rating(), rating(team_number=2, last_win_at=None)],
+    )
+    clan = decoders.decode_full_clan(full_clan(master))
+
+    assert clan.clan.created_at == datetime.datetime.fromisoformat(
+        "2020-01-01T00:00:00+00:00"
+    )
+    assert clan.buildings["headquarters"].modifiers == [7]
+    assert clan.achievements == [models.ClanAchievement(count=2, cd=5)]
+
+    ladder = clan.wows_ladder
+    assert ladder.last_battle_at is None
+    assert ladder.max_position.public_rating == 1150
+    assert [r.team_number for r in ladder.ratings] == [1, 2]
+    assert ladder.ratings[0].last_win_at.year == 2022
+    assert ladder.ratings[1].last_win_at is None
+
+
+def test_full_clan_without_ladder():
+    assert decoders.decode_full_clan(full_clan(None)).wows_ladder is None
+
+
+def test_seasons_keys_become_integers():
+    body = orjson.dumps(
+        {
+            "data": {
+                "101": {
+                    "season_id": 101,
+                    "name": "Ranked",
+                    "start_time": 1_600_000_000,
+                    "finish_time": 1_610_000_000,
+                    "ship_tier_min": 10,
+                    "ship_tier_max": 10,
+                    "division_points": 100,
+                    "leagues": [],
+                },
+                "20": {
+                    "season_id": 20,
+                    "name": "Clan Battles",
+                    "start_time": 1_670_000_000,
+                    "finish_time": 1_680_000_000,
+                    "ship_tier_min": 10,
+                    "ship_tier_max": 10,
+                    "division_points": 50,
+                    "leagues": [{"name": "Hurricane", "icon": "", "color": "#fff"}],
+                },
+            }
+        }
+    )
+    seasons = decoders.decode_seasons(decoders.loads(body))
+
+    assert set(seasons.data) == {20, 101}
+    assert seasons.last_clan_season == 20
+    assert seasons.data[20].start_time == datetime.datetime.fromtimestamp(1_670_000_000)
+    assert seasons.data[20].leagues[0].name == "Hurricane"
+
+
+def test_buildings_keys_become_integers_and_build_indexes():
+    data = {
+        "building_types": {"1": {"building_type_id": 1, "name": "dry_dock"}},
+        "buildings": {
+            "10": {"building_id": 10, "building_type_id": 1, "name": "a", "cost": 0},
+            "11": {"building_id": 11, "building_type_id": 1, "name": "b", "cost": 500},
+            "12": {"building_id": 12, "building_type_id": 9, "name": "c", "cost": 100},
+        },
+        "clans_roles": {"commander": "Commander"},
+    }
+    buildings = decoders.decode_buildings(data)
+
+    assert set(buildings.buildings) == {10, 11, 12}
+    assert buildings.type_of(11).name == "dry_dock"
+    assert buildings.type_of(12) is None
+    assert buildings.upgrades_count(buildings.building_types[1]) == 1
+    assert buildings.remaining_cost([11]) == 100
@@ -0,0 +1,182 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from bot.extensions import guess
+from bot.utils import db, journal
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    engine = db.engine
+    monkeypatch.setattr(journal, "_JOURNALS_PATH", str(tmp_path))
+    monkeypatch.setattr(db, "engine", db.create_engine(str(tmp_path / "test.db")))
+    # bound to the event loop of the test that used it
+    monkeypatch.setattr(db, "writer", db.Writer())
+    db.async_session.configure(bind=db.engine)
+    db.User.cache.clear()
+
+    async def create():
+        async with db.engine.begin() as conn:
+            await conn.run_sync(db.Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield
+    db.async_session.configure(bind=engine)
+    db.User.cache.clear()
+
+
+def run(test):
+    async def wrapper():
+        try:
+            await test()
+        finally:
+            await db.writer.stop()
+
+    asyncio.run(wrapper())
+
+
+async def stored(user_id: int):
+    async with db.async_session() as session:
+        statement = select(db.User.guess_count, db.User.guess_record).where(
+            db.User.id == user_id
+        )
+        return (await session.execute(statement)).one_or_none()
+
+
+async def loaded() -> guess.GuessResults:
+    results = guess.GuessResults()
+    await results.load()
+    return results
+
+
+def test_results_are_written_once():
+    async def test():
+        results = await loaded()
+        assert await results.record(1, 5.0)
+        assert not await results.record(1, 6.0)
+        assert await results.record(2, 7.0)
+
+        assert await results.flush() == 2
+        assert await results.flush() == 0
+        assert tuple(await stored(1)) == (2, 5.0)
+        assert tuple(await stored(2)) == (1, 7.0)
+
+        # the user's cached row was dropped, so records compare with the write
+        assert not await results.record(1, 5.5)
+        assert await results.record(1, 4.0)
+        await results.flush()
+        results.journal.close()
+
+        assert tuple(await stored(1)) == (4, 4.0)
+        assert (await loaded()).pending == {}
+
+    run(test)
+
+
+def test_unwritten_results_are_replayed_after_a_crash():
+    async def test():
+        results = await loaded()
+        await results.record(1, 5.0)
+        await results.flush()
+
+        await results.record(1, 4.0)
+        await results.record(1, 8.0)
+        results.journal.close()  # crashed before the next flush
+
+        results = await loaded()
+        assert results.pending == {1: [2, 4.0]}
+        await results.flush()
+        results.journal.close()
+
+        assert tuple(await stored(1)) == (3, 4.0)
+
+    run(test)
+
+
+def test_replay_skips_results_already_written():
+    async def test():
+        results = await loaded()
+        await results.record(1, 5.0)
+        await results.record(1, 6.0)
+
+        # crashed after the batch was committed, before the journal was compacted
+        compact = results.journal.compact
+        results.journal.compact = lambda entries: None
+        await results.flush()
+        results.journal.compact = compact
+        results.journal.close()
+
+        results = await loaded()
+        assert results.pending == {}
+        assert await results.flush() == 0
+        results.journal.close()
+
+        assert tuple(await stored(1)) == (2, 5.0)
+
+    run(test)
+
+
+def test_interrupted_flush_is_never_applied_twice():
+    async def test():
+        results = await loaded()
+        await results.record(1, 5.0)
+        await results.record(1, 6.0)
+
+        flush = asyncio.create_task(results.flush())
+        while not db.writer.operations:
+            await asyncio.sleep(0)
+        flush.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush
+
+        # the writer commits the batch regardless
+        await db.writer.stop()
+        assert tuple(await stored(1)) == (2, 5.0)
+        assert results.batch is not None
+
+        await results.record(1, 4.0)
+        await results.flush()  # retries the committed batch, which is skipped
+        assert results.batch is None
+        await results.flush()
+        results.journal.close()
+
+        assert tuple(await stored(1)) == (3, 4.0)
+        assert (await loaded()).pending == {}
+
+    run(test)
+
+
+def test_results_are_recorded_while_a_batch_is_written(monkeypatch):
+    async def test():
+        results = await loaded()
+        await results.record(1, 5.0)
+
+        committed = asyncio.Event()
+        submit = db.writer.submit
+
+        async def delayed(operation):
+            await committed.wait()
+            return await submit(operation)
+
+        monkeypatch.setattr(db.writer, "submit", delayed)
+        flush = asyncio.create_task(results.flush())
+        while results.batch is None:
+            await asyncio.sleep(0)
+
+        # compared with the batch being written
+        assert not await asyncio.wait_for(results.record(1, 6.0), 1)
+        assert await asyncio.wait_for(results.record(2, 7.0), 1)
+        assert not flush.done()
+
+        committed.set()
+        assert await flush == 1
+        assert results.pending == {1: [1, 6.0], 2: [1, 7.0]}
+        await results.flush()
+        results.journal.close()
+
+        assert tuple(await stored(1)) == (2, 5.0)
+        assert (await loaded()).pending == {}
+
+    run(test)
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from bot.utils import history
+
+BATTLES = history.COLUMNS.index(("pvp", "battles_count"))
+
+
+@pytest.fixture(autouse=True)
+def directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "_HISTORY_PATH", str(tmp_path))
+    history._tails.clear()
+    yield tmp_path
+    history._tails.clear()
+
+
+def statistics(battles: int) -> dict:
+    return {"pvp": {"battles_count": battles, "wins": battles // 2}}
+
+
+def size(records: int) -> int:
+    return history.HEADER.size + records * history.RECORD_SIZE
+
+
+def test_records_are_deltas_of_the_absolute_values():
+    assert history.append("eu", 1, statistics(10), 100)
+    assert history.append("eu", 1, statistics(15), 200)
+
+    with open(history._path("eu", 1), "rb") as fp:
+        header = history.HEADER.unpack(fp.read(history.HEADER.size))
+        body = fp.read()
+
+    assert header == (history.MAGIC, history.VERSION, len(history.COLUMNS))
+    assert len(body) == 2 * history.RECORD_SIZE
+
+    timestamps, values = history.load("eu", 1)
+    assert timestamps.tolist() == [100, 200]
+    assert values[:, BATTLES].tolist() == [10, 15]
+
+
+def test_unchanged_snapshots_are_not_written():
+    assert history.append("eu", 1, statistics(10), 100)
+    assert not history.append("eu", 1, statistics(10), 200)
+
+    assert os.path.getsize(history._path("eu", 1)) == size(1)
+
+
+def test_torn_record_is_ignored_and_replaced():
+    history.append("eu", 1, statistics(10), 100)
+    with open(history._path("eu", 1), "ab") as fp:
+        fp.write(b"torn")
+
+    assert history.load("eu", 1)[0].tolist() == [100]
+
+    history._tails.clear()
+    assert history.append("eu", 1, statistics(12), 200)
+    assert os.path.getsize(history._path("eu", 1)) == size(2)
+    assert history.load("eu", 1)[1][:, BATTLES].tolist() == [10, 12]
+
+
+def test_incompatible_history_starts_over():
+    path = history._path("eu", 1)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as fp:
+        fp.write(history.HEADER.pack(history.MAGIC, history.VERSION + 1, 1))
+
+    assert history.load("eu", 1) is None
+    assert history.append("eu", 1, statistics(10), 100)
+    assert history.load("eu", 1)[1][:, BATTLES].tolist() == [10]
+
+
+def test_append_rereads_files_changed_elsewhere():
+    history.append("eu", 1, statistics(10), 100)
+    history.append("eu", 1, statistics(20), 200)
+
+    # another writer appended 30 since the last record was cached
+    path = history._path("eu", 1)
+    cached = history._tails[path]
+    history._tails.clear()
+    history.append("eu", 1, statistics(30), 300)
+    history._tails[path] = cached
+
+    assert not history.append("eu", 1, statistics(30), 400)
+    assert history.append("eu", 1, statistics(35), 500)
+    assert history.load("eu", 1)[1][:, BATTLES].tolist() == [10, 20, 30, 35]
+
+
+def test_delta_since_the_last_snapshot_before_a_time():
+    for timestamp, battles in [(100, 10), (200, 15), (300, 40)]:
+        history.append("eu", 1, statistics(battles), timestamp)
+
+    start, end, change = history.delta("eu", 1, 250)
+    assert (start, end) == (200, 300)
+    assert change["pvp"]["battles_count"] == 25
+    assert change["pve"]["battles_count"] == 0
+
+    # older than every snapshot, uses the first one
+    assert history.delta("eu", 1, 50)[2]["pvp"]["battles_count"] == 30
+    assert history.delta("eu", 2, 50) is None
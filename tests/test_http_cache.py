@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+from api.http_cache import HTTPCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(str(tmp_path / "http_cache.db"))
+    yield cache
+    cache.close()
+
+
+def resolve(cache: HTTPCache, status: int, body: bytes, etag: str):
+    key = cache.key("GET", "https://example.com")
+    entry = cache._get(key)
+    return cache._resolve(key, "https://example.com", entry, status, body, (etag, None))
+
+
+def test_unchanged_bodies_only_update_the_validators(cache):
+    assert resolve(cache, 200, b"body", "a").modified
+
+    statements = []
+    cache.connection.set_trace_callback(statements.append)
+    response = resolve(cache, 200, b"body", "b")
+
+    assert not response.modified and response.body == b"body"
+    assert any("UPDATE" in statement for statement in statements)
+    assert not any("INSERT" in statement for statement in statements)
+    assert cache._get(cache.key("GET", "https://example.com")).etag == "b"
+
+    response = resolve(cache, 200, b"changed", "c")
+    assert response.modified and response.body == b"changed"
+    assert cache.peek("GET", "https://example.com") == b"changed"
+
+
+def test_entries_stored_without_a_digest_are_rewritten_once(cache):
+    connection = sqlite3.connect(cache.path)
+    connection.execute(
+        "CREATE TABLE responses (key TEXT PRIMARY KEY, url TEXT NOT NULL, "
+        "etag TEXT, last_modified TEXT, body BLOB NOT NULL, fetched_at REAL NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO responses VALUES (?, ?, ?, ?, ?, strftime('%s'))",
+        (
+            cache.key("GET", "https://example.com"),
+            "https://example.com",
+            "a",
+            None,
+            b"body",
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+    assert cache._get(cache.key("GET", "https://example.com")).digest is None
+    assert not resolve(cache, 200, b"body", "a").modified
+    assert cache._get(cache.key("GET", "https://example.com")).digest is not None
@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+
+from api import index
+
+
+@pytest.fixture(autouse=True)
+def indexes(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, "INDEX_PATH", str(tmp_path / "index.pickle"))
+    monkeypatch.setattr(index, "players", {"eu": index.NameIndex()})
+    monkeypatch.setattr(index, "clans", {"eu": index.ClanIndex()})
+
+
+def reloaded(clans: index.ClanIndex) -> index.ClanIndex:
+    index.clans["eu"] = clans
+    assert index.save(force=True)
+    index.load()
+    return index.clans["eu"]
+
+
+def test_reused_name_belongs_to_the_last_id():
+    players = index.NameIndex()
+    players.add(1, "Player")
+    assert players.add(2, "player") == 1
+
+    assert players.get("PLAYER") == 2
+    assert players.ids == {2: "player"}
+    assert players.search("pl", 10) == [(2, "player")]
+
+
+def test_clans_with_a_reused_tag_round_trip():
+    clans = index.ClanIndex()
+    clans.add(1, "ABC", "Alpha")
+    clans.add(2, "ABC", "Bravo")
+
+    clans = reloaded(clans)
+    assert clans.get("abc") == 2
+    assert clans.get("alpha") == 1
+    assert index.prune() == 0
+
+    # renaming the clan that lost the tag keeps the other's entry
+    clans.add(1, "XYZ", "Alpha")
+    assert clans.get("ABC") == 2
+    assert clans.get("XYZ") == 1
+    assert clans.search("", 10) == [(2, "ABC", "Bravo"), (1, "XYZ", "Alpha")]
+
+
+def test_clans_no_longer_indexed_are_dropped():
+    clans = index.ClanIndex()
+    clans.add(1, "ABC", "Alpha")
+    clans.add(2, "ABC", "Alpha")
+
+    assert len(clans) == 1
+    assert len(reloaded(clans)) == 1
+
+
+def test_previous_versions_keep_the_clan_seen_last():
+    with open(index.INDEX_PATH, "wb") as fp:
+        pickle.dump(
+            {
+                "version": 2,
+                "players": {"eu": [(1, "player", 10)]},
+                "clans": {"eu": [(2, "ABC", "Bravo", 20), (1, "ABC", "Alpha", 10)]},
+            },
+            fp,
+        )
+
+    index.load()
+    clans = index.clans["eu"]
+    assert clans.get("ABC") == 2
+    assert clans.get("Alpha") == 1
+    assert index.players["eu"].get("player") == 1
+
+    # every entry is old enough to expire
+    assert index.prune() == 3
+    assert len(clans) == 0
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from bot.utils import journal
+from config import cfg
+
+
+@pytest.fixture(autouse=True)
+def directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "_JOURNALS_PATH", str(tmp_path))
+    return tmp_path
+
+
+def test_replay_returns_appended_entries_in_order():
+    log = journal.Journal("test")
+    assert log.replay() == []
+
+    log.append(["add", 1])
+    log.extend([["add", 2], ["remove", 1]])
+    log.close()
+
+    log = journal.Journal("test")
+    assert log.replay() == [["add", 1], ["add", 2], ["remove", 1]]
+    assert log.entries == 3
+    log.close()
+
+
+def test_replay_skips_torn_lines():
+    log = journal.Journal("test")
+    log.append([1])
+    log._fp.write(b'[2, "torn')
+    log._fp.flush()
+    log.close()
+
+    log = journal.Journal("test")
+    assert log.replay() == [[1]]
+
+    # appending after a torn line starts a new line
+    log.append([3])
+    log.close()
+
+    log = journal.Journal("test")
+    assert log.replay() == [[1], [3]]
+    log.close()
+
+
+def test_compact_replaces_every_entry():
+    log = journal.Journal("test")
+    log.replay()
+    log.extend([[1], [2], [3]])
+    log.compact([["snapshot", 6]])
+    log.append([4])
+    log.close()
+
+    log = journal.Journal("test")
+    assert log.replay() == [["snapshot", 6], [4]]
+    assert log.entries == 2
+    assert not os.path.exists(f"{log.path}.tmp")
+    log.close()
+
+
+def test_journal_is_locked_to_one_user():
+    first = journal.Journal("test")
+    first.replay()
+
+    second = journal.Journal("test")
+    with pytest.raises(journal.JournalLockedError):
+        second.replay()
+
+    first.close()
+    assert second.replay() == []
+    second.close()
+
+
+def test_journals_are_kept_per_process(monkeypatch):
+    first = journal.Journal("test")
+    first.replay()
+    first.append(["first"])
+
+    monkeypatch.setattr(cfg.process, "name", "other")
+    second = journal.Journal("test")
+
+    assert second.name != first.name
+    assert second.replay() == []  # neither shared nor locked
+    first.close()
+    second.close()
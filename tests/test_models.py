@@ -0,0 +1,40 @@
+import pickle
+
+from api.models import StatBlock
+
+
+def test_stat_block_is_a_read_only_mapping():
+    block = StatBlock({"battles_count": 10, "wins": 6})
+
+    assert dict(block) == {"battles_count": 10, "wins": 6}
+    assert list(block) == ["battles_count", "wins"]
+    assert len(block) == 2
+    assert block["wins"] == 6
+    assert "wins" in block and "losses" not in block
+    assert block.get("losses", 0) == 0
+    assert block == {"battles_count": 10, "wins": 6}
+
+
+def test_stat_blocks_with_the_same_keys_share_a_layout():
+    first = StatBlock({"battles_count": 1, "wins": 0})
+    second = StatBlock({"battles_count": 5, "wins": 3})
+    other = StatBlock({"wins": 3, "battles_count": 5})
+
+    assert first._layout is second._layout
+    assert other._layout is not first._layout
+    assert dict(other) == dict(second)
+
+
+def test_stat_block_keeps_values_that_are_not_64_bit_integers():
+    data = {"battles_count": 2**63, "ratio": 0.5, "name": None}
+    block = StatBlock(data)
+
+    assert dict(block) == data
+
+
+def test_stat_block_pickles_by_value():
+    block = StatBlock({"battles_count": 10, "wins": 6})
+    copy = pickle.loads(pickle.dumps(block))
+
+    assert copy == block
+    assert copy._layout is block._layout